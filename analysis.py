@@ -1,15 +1,192 @@
+from functools import wraps
+import inspect
+import numpy as np
 import pandas as pd
-from api import API
+import kernels
+
+
+def cached(method):
+    """
+    Memoize indicator results per instance,
+    keyed by method name and arguments with
+    defaults applied, so that sma() and
+    sma(10) share a single computation.
+    """
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__, *list(bound.arguments.values())[1:])
+        if key not in self._cache:
+            self._cache[key] = method(self, *args, **kwargs)
+        return self._cache[key]
+    return wrapper
+
+
+def _vote(a, b):
+    """
+    Vote of a rule comparing two indicators:
+    1 where a > b, -1 where a <= b and 0
+    where any of them is undefined (nan)
+    """
+    return np.where(a > b, 1, np.where(a <= b, -1, 0))
+
+
+def get_score(close, sma, ema, rsi, macd, signal, k, d, warmup=None):
+    """
+    Get total score of the trading rules listed
+    in Analysis.get_signal. Works element-wise,
+    so the arguments can be scalars or arrays
+    of the same shape.
+
+    Parameters
+    ----------
+    close : float or array_like
+        Closing price
+    sma : float or array_like
+        Simple moving average
+    ema : float or array_like
+        Exponential moving average
+    rsi : float or array_like
+        Relative strength index
+    macd : float or array_like
+        MACD line
+    signal : float or array_like
+        MACD signal line
+    k : float or array_like
+        Stochastic %K
+    d : float or array_like
+        Stochastic %D
+    warmup : bool or array_like or None
+        Bars of the indicators warm-up, which
+        are scored 0. If None, bars along the
+        first axis until all indicators are
+        defined for the first time, or a scalar
+        bar with any indicator undefined.
+
+    Returns
+    -------
+    numpy.ndarray
+        Score from -6 to 6
+    """
+    score = _vote(macd, signal)
+    score += np.where(rsi < 30, 1, np.where(rsi > 70, -1, 0))
+    score += _vote(k, d)
+    score += _vote(sma, ema)
+    score += _vote(sma, close)
+    score += _vote(ema, close)
+    if warmup is None:
+        warmup = np.isnan(close)
+        for values in [sma, ema, rsi, macd, signal, k, d]:
+            warmup = warmup | np.isnan(values)
+        warmup = np.asarray(warmup)
+        if warmup.ndim:
+            warmup = np.logical_and.accumulate(warmup, axis=0)
+    return np.where(warmup, 0, score)
+
+
+def score_to_signal(score):
+    """
+    Convert score of the trading rules
+    to 'buy', 'sell' or 'neutral'
+
+    Parameters
+    ----------
+    score : int or array_like
+        Score from get_score
+
+    Returns
+    -------
+    numpy.ndarray
+        Signal for trading
+    """
+    return np.where(score > 1, 'buy',
+                    np.where(score < -1, 'sell', 'neutral'))
 
 
 class Analysis:
 
-    def __init__(self, symbol, interval='day'):
-        self.api = API()
+    def __init__(self, symbol, interval='day', api=None):
+        if api is None:
+            from api import API
+            api = API()
+        self.api = api
         self.symbol = symbol
+        self.interval = interval
         self.data = self.api.get_historical(symbol, interval)
         self.signal = self.get_signal()
 
+    @classmethod
+    def from_store(cls, store, symbol, interval='day'):
+        """
+        Create analysis of bars opened from
+        a bar store as read-only memory maps,
+        without downloading or copying them
+
+        Parameters
+        ----------
+        store : BarStore
+            Store with the bars
+        symbol : str
+            Symbol to analyze
+        interval : str
+            Interval of the data
+
+        Returns
+        -------
+        Analysis
+            Analysis of the stored bars
+            indexed by date
+        """
+        data = store.load(symbol, interval)
+        if data is None:
+            raise ValueError('Symbol not found')
+        analysis = object.__new__(cls)
+        analysis.api = None
+        analysis.symbol = symbol
+        analysis.interval = interval
+        analysis.data = data
+        analysis.signal = analysis.get_signal()
+        return analysis
+
+    @property
+    def data(self):
+        """
+        Historical data used by the indicators.
+        Assigning new data clears cached results.
+        """
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._cache = {}
+
+    def clear_cache(self):
+        """
+        Clear cached indicator results,
+        needed after modifying data in place
+        """
+        self._cache = {}
+
+    def memory_usage(self) -> int:
+        """
+        Get memory used by the data and
+        cached indicator results
+
+        Returns
+        -------
+        int
+            Size in bytes
+        """
+        size = self.data.memory_usage(deep=True).sum()
+        for value in self._cache.values():
+            if isinstance(value, (pd.Series, pd.DataFrame)):
+                size += np.sum(value.memory_usage(deep=True))
+        return int(size)
+
     def get_signal(self) -> str:
         """
         Get signal for trading based on technical
@@ -28,6 +205,12 @@ class Analysis:
         - Buy when EMA is above price
         - Sell when EMA is below price
 
+        A rule with an undefined indicator, e.g.
+        RSI of a flat window or stochastic when
+        high equals low, votes neither way. Until
+        all indicators are defined for the first
+        time (warm-up), the signal is neutral.
+
         Returns
         -------
         str
@@ -38,38 +221,63 @@ class Analysis:
         rsi = self.rsi()
         macd = self.macd()
         stoch = self.stochastic()
-        total_signal = 0
-        if macd['MACD'].iloc[-1] > macd['Signal'].iloc[-1]:
-            total_signal += 1
-        else:
-            total_signal -= 1
-        if rsi.iloc[-1] < 30:
-            total_signal += 1
-        elif rsi.iloc[-1] > 70:
-            total_signal -= 1
-        if stoch['%K'].iloc[-1] > stoch['%D'].iloc[-1]:
-            total_signal += 1
-        else:
-            total_signal -= 1
-        if sma.iloc[-1] > ema.iloc[-1]:
-            total_signal += 1
-        else:
-            total_signal -= 1
-        if sma.iloc[-1] > self.data['close'].iloc[-1]:
-            total_signal += 1
-        else:
-            total_signal -= 1
-        if ema.iloc[-1] > self.data['close'].iloc[-1]:
-            total_signal += 1
-        else:
-            total_signal -= 1
-        if total_signal > 1:
-            return 'buy'
-        elif total_signal < -1:
-            return 'sell'
-        else:
-            return 'neutral'
+        score = get_score(self.data['close'], sma, ema, rsi, macd['MACD'],
+                          macd['Signal'], stoch['%K'], stoch['%D'])
+        return str(score_to_signal(score[-1]))
+
+    def get_scores(self, sma: int = 10, ema: int = 10, rsi: int = 14,
+                   macd: tuple = (9, 12, 26),
+                   stochastic: tuple = (14, 3, 3)) -> pd.Series:
+        """
+        Get score of the trading rules listed in
+        get_signal at every bar in a single
+        vectorized pass, using given periods
+        of the indicators.
+
+        Parameters
+        ----------
+        sma : int
+            Number of periods for SMA
+        ema : int
+            Number of periods for EMA
+        rsi : int
+            Number of periods for RSI
+        macd : tuple of int
+            Signal, fast and slow periods for MACD
+        stochastic : tuple of int
+            Periods of %K, %D and its SMA
+
+        Returns
+        -------
+        pandas.Series
+            Score from -6 to 6 for every bar
+        """
+        macd = self.macd(*macd)
+        stoch = self.stochastic(*stochastic)
+        score = get_score(self.data['close'], self.sma(sma), self.ema(ema),
+                          self.rsi(rsi), macd['MACD'], macd['Signal'],
+                          stoch['%K'], stoch['%D'])
+        return pd.Series(score, index=self.data.index)
+
+    def get_signals(self, **periods) -> pd.Series:
+        """
+        Get signal for trading at every bar,
+        see get_signal and get_scores
 
+        Parameters
+        ----------
+        **periods
+            Periods of the indicators
+
+        Returns
+        -------
+        pandas.Series
+            Signal for trading for every bar
+        """
+        scores = self.get_scores(**periods)
+        return pd.Series(score_to_signal(scores), index=scores.index)
+
+    @cached
     def sma(self, period: int = 10) -> pd.DataFrame:
         """
         Simple Moving Average (SMA) is the most basic
@@ -87,8 +295,10 @@ class Analysis:
         pandas.DataFrame
             Dataframe with SMA
         """
-        return self.data['close'].rolling(period).mean()
+        close = self.data['close']
+        return pd.Series(kernels.sma(close, period), index=close.index)
 
+    @cached
     def ema(self, period: int = 10) -> pd.DataFrame:
         """
         Exponential Moving Average (EMA) is a type of
@@ -109,9 +319,10 @@ class Analysis:
         pandas.DataFrame
             Dataframe with EMA
         """
-        return self.data['close'].ewm(
-            span=period, adjust=False).mean()
+        close = self.data['close']
+        return pd.Series(kernels.ema(close, period), index=close.index)
 
+    @cached
     def bollinger(self, period: int = 20, std: int = 2) -> pd.DataFrame:
         """
         Bollinger Bands are volatility bands placed above
@@ -143,32 +354,35 @@ class Analysis:
             'lower': lower
         })
 
-    def rsi(self, period: int = 14) -> pd.DataFrame:
+    @cached
+    def rsi(self, period: int = 14, method: str = 'sma') -> pd.DataFrame:
         """
         Relative Strength Index (RSI) is a momentum
         indicator that measures the magnitude of recent
         price changes to evaluate overbought or
         oversold conditions in the price of a stock
-        or other asset.
+        or other asset. Average gains and losses are
+        simple moving averages or Wilder's smoothing
+        of the original definition.
 
         Parameters
         ----------
         period : int
             Number of periods to calculate RSI
+        method : str
+            Averaging of gains and losses:
+            'sma' or 'wilder'
 
         Returns
         -------
         pandas.DataFrame
             Dataframe with RSI
         """
-        delta = self.data['close'].diff()
-        up = delta.clip(lower=0)
-        down = -1 * delta.clip(upper=0)
-        roll_up = up.rolling(period).mean()
-        roll_down = down.abs().rolling(period).mean()
-        rs = roll_up / roll_down
-        return 100 - (100 / (1 + rs))
+        close = self.data['close']
+        return pd.Series(kernels.rsi(close, period, method),
+                         index=close.index)
 
+    @cached
     def macd(self, signal_period: int = 9, fast_period: int = 12,
              slow_period: int = 26) -> pd.DataFrame:
         """
@@ -191,16 +405,60 @@ class Analysis:
         pandas.DataFrame
             Dataframe with MACD
         """
-        diff = self.ema(fast_period) - self.ema(slow_period)
-        signal = diff.ewm(span=signal_period, adjust=False).mean()
-        hist = diff - signal
-        return pd.DataFrame({
-            'MACD': diff,
-            'Signal': signal,
-            'Histogram': hist
-        })
+        values = kernels.macd(self.data['close'], signal_period,
+                              fast_period, slow_period)
+        return pd.DataFrame(values.T, index=self.data.index,
+                            columns=['MACD', 'Signal', 'Histogram'])
 
+    @cached
+    def atr(self, period: int = 14) -> pd.DataFrame:
+        """
+        Average True Range (ATR) is a volatility
+        indicator: Wilder's smoothing of the true
+        range, the greatest of the range of a bar
+        and the gaps from the previous close.
+
+        Parameters
+        ----------
+        period : int
+            Number of periods to calculate ATR
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with ATR
+        """
+        data = self.data
+        return pd.Series(kernels.atr(data['high'], data['low'],
+                                     data['close'], period),
+                         index=data.index)
+
+    @cached
+    def adx(self, period: int = 14) -> pd.DataFrame:
+        """
+        Average Directional Index (ADX) measures the
+        strength of a trend, regardless of its
+        direction, which is given by the positive
+        and negative directional indicators (+DI
+        and -DI) of the Directional Movement System.
 
+        Parameters
+        ----------
+        period : int
+            Number of periods to calculate ADX
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with +DI, -DI and ADX
+        """
+        data = self.data
+        values = kernels.adx(data['high'], data['low'], data['close'],
+                             period)
+        return pd.DataFrame(values.T, index=data.index,
+                            columns=['+DI', '-DI', 'ADX'])
+
+    @cached
     def stochastic(self, period_k: int = 14, period_d: int = 3,
                    period_s: int = 3) -> pd.DataFrame:
         """
@@ -222,8 +480,8 @@ class Analysis:
         pandas.DataFrame
             Dataframe with stochastic
         """
-        high = self.data['high'].rolling(period_k).max()
-        low = self.data['low'].rolling(period_k).min()
+        channel = self.donchian(period_k)
+        high, low = channel['upper'], channel['lower']
         k = 100 * (self.data['close'] - low) / (high - low)
         d = k.rolling(period_d).mean()
         return pd.DataFrame({
@@ -231,6 +489,7 @@ class Analysis:
             '%D': d.rolling(period_s).mean()
         })
 
+    @cached
     def williams(self, period: int = 14) -> pd.DataFrame:
         """
         Williams %R is a momentum indicator that is the
@@ -249,9 +508,34 @@ class Analysis:
         pandas.DataFrame
             Dataframe with Williams %R
         """
-        high = self.data['high']
-        low = self.data['low']
+        channel = self.donchian(period)
+        highest_high, lowest_low = channel['upper'], channel['lower']
         close = self.data['close']
-        highest_high = high.rolling(period).max()
-        lowest_low = low.rolling(period).min()
         return 100 * (highest_high - close) / (highest_high - lowest_low)
+
+    @cached
+    def donchian(self, period: int = 20) -> pd.DataFrame:
+        """
+        Donchian Channels are formed by the highest high
+        and the lowest low of the last n periods. Both
+        extrema are computed in a single pass and the
+        result is shared by the stochastic oscillator
+        and Williams %R with the same period.
+
+        Parameters
+        ----------
+        period : int
+            Number of periods to calculate Donchian Channels
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with Donchian Channels
+        """
+        upper, lower = kernels.rolling_extrema(self.data['high'],
+                                               self.data['low'], period)
+        return pd.DataFrame({
+            'upper': upper,
+            'middle': (upper + lower) / 2,
+            'lower': lower
+        }, index=self.data.index)
@@ -1,25 +1,191 @@
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from ratelimit import RateLimiter
+from threading import Lock
 import pandas as pd
-import requests
+import time
 import os
 
-load_dotenv()
-API_URL = 'https://financialmodelingprep.com/api/'
+# HTTP libraries and .env file are loaded when the first API object is
+# created, so importing this module (e.g. through analysis) stays cheap
+API_URL = os.environ.get('API_URL', 'https://financialmodelingprep.com/api/')
 API_KEY = os.environ.get('API_KEY')
 
 INTERVALS = ['1min', '5min', '15min', '30min', '1hour', '4hour', 'day']
 OUTPUT_TYPES = ['json', 'pandas']
 
+POOL_SIZE = 10
+TIMEOUT = (3.05, 30)
+RETRIES = 3
+BACKOFF = 0.5
+RATE_LIMIT = 300
+STATS = ['requests', 'throttled', 'retried', 'bytes']
+# Number of resampled symbols and intervals kept in memory
+RESAMPLED = 32
+
+
+def load_api_key():
+    """
+    Get API key from the environment,
+    reading the .env file on first use
+
+    Returns
+    -------
+    str or None
+        API key or None if not set
+    """
+    global API_KEY
+    if API_KEY is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        API_KEY = os.environ.get('API_KEY')
+    return API_KEY
+
+
 class API:
 
-    def __init__(self, output='pandas'):
+    def __init__(self, output='pandas', cache=None, pool_size=POOL_SIZE,
+                 timeout=TIMEOUT, retries=RETRIES, backoff=BACKOFF,
+                 rate_limit=RATE_LIMIT, resample=False, resampled=RESAMPLED,
+                 base_url=None):
         if output not in OUTPUT_TYPES:
             raise ValueError('Invalid output type')
-        if API_KEY is None:
+        if load_api_key() is None:
             raise ValueError('API key not found')
         self.output = output
+        # Base URL can point to a local server, e.g. mock_server.MockServer
+        self.base_url = base_url or API_URL
+        self.cache = cache
+        self.resample = resample
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.session = self._create_session(pool_size, retries, backoff)
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        self._stats = dict.fromkeys(STATS, 0)
+        self._stats_lock = Lock()
+        # Least recently used resampled bars keyed by (symbol, interval)
+        self._resampled = OrderedDict()
+        self._resampled_size = resampled
+        self._resampled_lock = Lock()
+
+    @property
+    def stats(self):
+        """
+        Counters of requests made, responses
+        throttled with 429, retries and
+        bytes received (compressed) since
+        creation
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, name, value=1):
+        """
+        Increase a statistics counter
+        """
+        with self._stats_lock:
+            self._stats[name] += value
+
+    @staticmethod
+    def _received(response):
+        """
+        Size of a response body as sent by the
+        server, i.e. compressed if it was
+        """
+        content = response.content
+        try:
+            return response.raw.tell()
+        except AttributeError:
+            return len(content)
+
+    @staticmethod
+    def _create_session(pool_size, retries, backoff):
+        """
+        Create HTTP session reusing keep-alive
+        connections, requesting compressed
+        responses and retrying failed requests
+
+        Parameters
+        ----------
+        pool_size : int
+            Maximum number of pooled connections
+        retries : int
+            Number of retries for failed requests
+        backoff : float
+            Backoff factor between retries in seconds
+
+        Returns
+        -------
+        requests.Session
+            Configured session
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        import requests
+
+        retry = Retry(total=retries, backoff_factor=backoff,
+                      status_forcelist=[500, 502, 503, 504],
+                      allowed_methods=['GET'], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        return session
+
+    def _request(self, url):
+        """
+        Send GET request respecting the rate
+        limit. Responses with status 429 are
+        retried after the time given in the
+        Retry-After header and hold back
+        all other requests in the meantime.
+        Other error responses, e.g. an invalid
+        API key, raise requests.HTTPError.
+
+        Parameters
+        ----------
+        url : str
+            Full URL of the request
+
+        Returns
+        -------
+        requests.Response
+            Response of the server
+        """
+        for attempt in range(self.retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            response = self.session.get(url, timeout=self.timeout)
+            self._count('requests')
+            retries = getattr(response.raw, 'retries', None)
+            self._count('retried', len(getattr(retries, 'history', ())))
+            if response.status_code != 429:
+                self._count('bytes', self._received(response))
+                response.raise_for_status()
+                return response
+            self._count('throttled')
+            if attempt == self.retries:
+                break
+            try:
+                wait = float(response.headers['Retry-After'])
+            except (KeyError, ValueError):
+                wait = self.backoff * 2 ** attempt
+            if self.limiter:
+                self.limiter.pause(wait)
+            else:
+                time.sleep(wait)
+            self._count('retried')
+        response.raise_for_status()
 
-    def _get_data(self, url, key=None):
+    def _get_data(self, url, key=None, **params):
         """
         Get Pandas DataFrame or JSON from API
         for a given URL
@@ -31,16 +197,26 @@ class API:
         key : str or None
             Evaluate item from JSON
             or return full JSON if None
+        **params
+            Additional query parameters
 
         Returns
         -------
         pandas.DataFrame or dict
             Dataframe or JSON
         """
-        url = API_URL + url + '?apikey=' + API_KEY
-        json = requests.get(url).json()
-        if key:
-            json = json[key]
+        url = self.base_url + url + '?apikey=' + API_KEY
+        for name, value in params.items():
+            url += f'&{name}={value}'
+        json = self._request(url).json()
+        if isinstance(json, dict) and 'Error Message' in json:
+            # Some errors, e.g. an exceeded plan, come with status 200
+            raise ValueError(json['Error Message'])
+        if not isinstance(json, (dict, list)):
+            raise ValueError('Invalid response')
+        if key and isinstance(json, dict):
+            # Endpoints omit the key when there are no rows
+            json = json.get(key, [])
         if self.output == 'pandas':
             return pd.DataFrame(json)
         return json
@@ -71,23 +247,242 @@ class API:
             raise ValueError('Invalid category')
         return self._get_data(url)
 
-    def get_historical(self, symbol, interval='day'):
+    def get_historical(self, symbol, interval='day', refresh=False):
         """
         Get historical prices and volume for
         a specific stock, cryptocurrency,
         forex or commodity symbol and
-        a given interval
+        a given interval. If the cache is
+        enabled, only bars newer than the
+        last cached date are downloaded,
+        unless refresh is True or the cache
+        is older than its max_age. Then the
+        full history is downloaded again,
+        so prices adjusted after a split or
+        dividend replace the cached ones.
+        If resampling is enabled, intraday
+        intervals are built locally from
+        1-minute bars, which share one
+        download and cache. Bars resampled
+        before are kept for the recently used
+        symbols, so only 1-minute bars since
+        the last of them are aggregated again.
+        Note that 1-minute history covers
+        a shorter period than the coarser
+        intervals of the API, so resampling
+        is disabled by default.
         """
         if interval not in INTERVALS:
             raise ValueError('Invalid interval')
+        if self.resample and interval not in ('1min', 'day') \
+                and self.output == 'pandas':
+            data = self.get_historical(symbol, '1min', refresh)
+            if data.empty:
+                return data
+            if refresh:
+                # Adjusted prices replace the bars resampled before
+                self._put_resampled(symbol, interval, None)
+            return self._update_resampled(symbol, interval, data)
+        if self.cache is None or self.output != 'pandas':
+            return self._fetch_historical(symbol, interval)
+        from bars import normalize, denormalize
+        full = refresh or self.cache.expired(symbol, interval)
+        cached = None if full else self.cache.load(symbol, interval)
+        if cached is None or cached.empty:
+            data = self._fetch_historical(symbol, interval)
+            if data.empty:
+                return data
+            bars = normalize(data)
+            full = True
+        else:
+            # Refetch the last cached day as its bars may be incomplete
+            start = cached.index.max().strftime('%Y-%m-%d')
+            new = self._fetch_historical(symbol, interval, start)
+            bars = cached
+            if not new.empty:
+                bars = pd.concat([cached, normalize(new)])
+                bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+        # Bars are cached in the compact schema of bars.normalize
+        self.cache.save(symbol, interval, bars, full)
+        return denormalize(bars, interval)
+
+    def get_updates(self, symbol, interval, since):
+        """
+        Get bars of a specific symbol and
+        interval from a given date, e.g. the
+        last bar of live data, which may be
+        incomplete. Only the day of the date
+        is downloaded, without the cache.
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol to get data for
+        interval : str
+            Interval of the data
+        since : str
+            Date of the first bar to return
+
+        Returns
+        -------
+        pandas.DataFrame
+            Bars sorted by date
+        """
+        if interval not in INTERVALS:
+            raise ValueError('Invalid interval')
+        if self.resample and interval not in ('1min', 'day'):
+            from resample import resample
+            bars = self._get_resampled(symbol, interval)
+            if bars is None:
+                data = self._fetch_historical(symbol, '1min', since[:10])
+                data = resample(data, interval)
+            else:
+                # Bars since the last resampled one are merged into it
+                start = min(since, bars['date'].iloc[-1])
+                data = self._fetch_historical(symbol, '1min', start[:10])
+                if not data.empty:
+                    data = self._update_resampled(symbol, interval, data)
+        else:
+            data = self._fetch_historical(symbol, interval, since[:10])
+        if data.empty:
+            return data
+        return data[data['date'] >= since]
+
+    def _update_resampled(self, symbol, interval, data):
+        """
+        Merge 1-minute bars into the bars of
+        a symbol resampled before, only bars
+        since the last of them are aggregated
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol of the data
+        interval : str
+            Interval to resample to
+        data : pandas.DataFrame
+            1-minute bars, including every bar
+            since the last resampled one
+
+        Returns
+        -------
+        pandas.DataFrame
+            Resampled bars
+        """
+        from resample import update
+        bars = self._get_resampled(symbol, interval)
+        if bars is None:
+            bars = pd.DataFrame()
+        bars = update(bars, data, interval)
+        self._put_resampled(symbol, interval, bars)
+        # Callers may modify the bars in place
+        return bars.copy()
+
+    def _get_resampled(self, symbol, interval):
+        """
+        Get bars of a symbol resampled before
+        and mark them as recently used, None
+        if they are missing or evicted
+        """
+        key = (symbol, interval)
+        with self._resampled_lock:
+            bars = self._resampled.get(key)
+            if bars is not None:
+                self._resampled.move_to_end(key)
+        return bars
+
+    def _put_resampled(self, symbol, interval, bars):
+        """
+        Store resampled bars of a symbol, or
+        remove them if None, and evict the
+        least recently used ones above the
+        limit of resampled symbols
+        """
+        key = (symbol, interval)
+        with self._resampled_lock:
+            self._resampled.pop(key, None)
+            if bars is not None:
+                self._resampled[key] = bars
+            while len(self._resampled) > self._resampled_size:
+                self._resampled.popitem(last=False)
+
+    def _fetch_historical(self, symbol, interval, start=None):
+        """
+        Download historical prices and volume
+        for a given symbol and interval,
+        optionally starting from a given date
+        """
+        params = {'from': start} if start else {}
         if interval == 'day':
             url = f'v3/historical-price-full/{symbol}'
-            data = self._get_data(url, 'historical')
-            return data.sort_values('date')
-        url = f'v3/historical-chart/{interval}/{symbol}'
-        data = self._get_data(url)
+            data = self._get_data(url, 'historical', **params)
+        else:
+            url = f'v3/historical-chart/{interval}/{symbol}'
+            data = self._get_data(url, **params)
+        if data.empty:
+            return data
         return data.sort_values('date')
 
+    def get_bars(self, symbol, interval='day', float32=False):
+        """
+        Get historical bars for a specific symbol
+        and a given interval in the compact schema
+        of bars.normalize: datetime index, float
+        prices, integer volume and no other columns
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol to get data for
+        interval : str
+            Interval of the data
+        float32 : bool
+            Store prices as float32
+
+        Returns
+        -------
+        pandas.DataFrame
+            Bars indexed by date
+        """
+        from bars import normalize
+        return normalize(self.get_historical(symbol, interval), float32)
+
+    def get_historical_many(self, symbols, interval='day', workers=None):
+        """
+        Get historical prices and volume for
+        multiple symbols concurrently. Errors
+        are collected per symbol instead of
+        failing the whole batch.
+
+        Parameters
+        ----------
+        symbols : list of str
+            Symbols to get data for
+        interval : str
+            Interval of the data
+        workers : int or None
+            Maximum number of concurrent requests,
+            defaults to the connection pool size
+
+        Returns
+        -------
+        tuple of dict
+            Data and exceptions keyed by symbol
+        """
+        if interval not in INTERVALS:
+            raise ValueError('Invalid interval')
+        data, errors = {}, {}
+        with ThreadPoolExecutor(workers or self.pool_size) as executor:
+            futures = {symbol: executor.submit(self.get_historical,
+                                               symbol, interval)
+                       for symbol in dict.fromkeys(symbols)}
+            for symbol, future in futures.items():
+                try:
+                    data[symbol] = future.result()
+                except Exception as e:
+                    errors[symbol] = e
+        return data, errors
+
     def get_historical_capitalization(self, symbol):
         """
         Get historical capitalization for
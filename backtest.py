@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+FEE = 0.001
+SLIPPAGE = 0.0005
+PERIODS_PER_YEAR = {
+    '1min': 252 * 390,
+    '5min': 252 * 78,
+    '15min': 252 * 26,
+    '30min': 252 * 13,
+    '1hour': 252 * 7,
+    '4hour': 252 * 2,
+    'day': 252
+}
+
+
+class Backtest:
+    """
+    Vectorized simulation of trading on signals.
+    A position is opened at the close of the bar
+    with a 'buy' signal (or 'sell' when short
+    selling is allowed), held through 'neutral'
+    bars and closed or reversed on the opposite
+    signal. Fee and slippage are charged as
+    a fraction of the traded value.
+    """
+
+    def __init__(self, close, signals, fee=FEE, slippage=SLIPPAGE,
+                 short=False, periods_per_year=PERIODS_PER_YEAR['day']):
+        """
+        Parameters
+        ----------
+        close : pandas.Series or pandas.DataFrame
+            Closing prices, one column per symbol
+        signals : pandas.Series or pandas.DataFrame
+            Signals 'buy', 'sell' or 'neutral'
+            with the shape of close
+        fee : float
+            Fee as a fraction of the traded value
+        slippage : float
+            Slippage as a fraction of the price
+        short : bool
+            Whether 'sell' opens a short position
+        periods_per_year : int
+            Number of bars in a year for Sharpe ratio
+        """
+        self.close = close
+        self.signals = signals
+        self.fee = fee
+        self.slippage = slippage
+        self.short = short
+        self.periods_per_year = periods_per_year
+        self.positions = self._positions()
+        self.returns = self._returns()
+        self.equity = (1 + self.returns).cumprod()
+        self.drawdown = self.equity / self.equity.cummax() - 1
+
+    @classmethod
+    def from_analysis(cls, analysis, interval='day', **kwargs):
+        """
+        Backtest signals of a single symbol
+
+        Parameters
+        ----------
+        analysis : Analysis
+            Analysis with historical data
+        interval : str
+            Interval of the data
+        **kwargs
+            Arguments of Backtest
+
+        Returns
+        -------
+        Backtest
+            Finished backtest
+        """
+        data = analysis.data
+        signals = analysis.get_signals()
+        close = data['close']
+        if 'date' in data:
+            close = pd.Series(close.to_numpy(), index=data['date'])
+            signals = pd.Series(signals.to_numpy(), index=data['date'])
+        kwargs.setdefault('periods_per_year', PERIODS_PER_YEAR[interval])
+        return cls(close, signals, **kwargs)
+
+    @classmethod
+    def from_panel(cls, panel, interval='day', **kwargs):
+        """
+        Backtest signals of every symbol of a panel
+
+        Parameters
+        ----------
+        panel : Panel
+            Panel with historical data
+        interval : str
+            Interval of the data
+        **kwargs
+            Arguments of Backtest
+
+        Returns
+        -------
+        Backtest
+            Finished backtest
+        """
+        kwargs.setdefault('periods_per_year', PERIODS_PER_YEAR[interval])
+        return cls(panel.data['close'], panel.get_signals(), **kwargs)
+
+    def _positions(self):
+        """
+        Get position held after every bar:
+        1 for long, -1 for short and 0 for none
+        """
+        signals = np.asarray(self.signals)
+        positions = np.where(signals == 'buy', 1.0, np.nan)
+        positions[signals == 'sell'] = -1.0 if self.short else 0.0
+        positions = pd.DataFrame(positions).ffill().fillna(0).to_numpy()
+        if np.ndim(self.close) == 1:
+            return pd.Series(positions[:, 0], index=self.close.index)
+        return pd.DataFrame(positions, index=self.close.index,
+                            columns=self.close.columns)
+
+    def _returns(self):
+        """
+        Get return of the strategy at every bar
+        including fee and slippage
+        """
+        change = self.close.pct_change().fillna(0)
+        held = self.positions.shift(1).fillna(0)
+        traded = (self.positions - held).abs()
+        return held * change - traded * (self.fee + self.slippage)
+
+    def trades(self, symbol=None) -> pd.DataFrame:
+        """
+        Get list of trades. A trade that is
+        still open has no exit and is valued
+        at the last closing price.
+
+        Parameters
+        ----------
+        symbol : str or None
+            Column of a multi-symbol backtest
+
+        Returns
+        -------
+        pandas.DataFrame
+            Entry and exit of every trade with its
+            direction and return net of costs
+        """
+        positions, close = self.positions, self.close
+        if symbol is not None:
+            positions, close = positions[symbol], close[symbol]
+        values = positions.to_numpy()
+        prices = close.to_numpy(dtype=float)
+        # Every change of the position starts a new run
+        starts = np.flatnonzero(np.diff(values, prepend=0))
+        ends = np.append(starts[1:], len(values) - 1)
+        closed = np.arange(len(starts)) < len(starts) - 1
+        held = values[starts] != 0
+        starts, ends, closed = starts[held], ends[held], closed[held]
+        direction = values[starts]
+        cost = (self.fee + self.slippage) * (1 + closed)
+        index = positions.index
+        return pd.DataFrame({
+            'entry': index[starts],
+            'exit': np.where(closed, index[ends], None),
+            'direction': np.where(direction > 0, 'long', 'short'),
+            'return': direction * (prices[ends] / prices[starts] - 1) - cost
+        }, columns=['entry', 'exit', 'direction', 'return'])
+
+    def sharpe(self):
+        """
+        Get annualized Sharpe ratio
+        with zero risk-free rate
+
+        Returns
+        -------
+        float or pandas.Series
+            Sharpe ratio, nan when returns
+            do not vary
+        """
+        std = self.returns.std()
+        # Flat returns (no position held) have no risk to compare with
+        if np.ndim(std):
+            std = std.where(std > 0)
+        elif not std > 0:
+            std = np.nan
+        return self.returns.mean() / std * np.sqrt(self.periods_per_year)
+
+    def summary(self):
+        """
+        Get summary of the backtest
+
+        Returns
+        -------
+        pandas.Series or pandas.DataFrame
+            Total return, maximum drawdown, Sharpe
+            ratio, number of trades and hit rate
+        """
+        if np.ndim(self.close) == 1:
+            trades = {None: self.trades()}
+        else:
+            trades = {symbol: self.trades(symbol)
+                      for symbol in self.close.columns}
+        summary = pd.DataFrame({
+            'return': self.equity.iloc[-1] - 1,
+            'max_drawdown': self.drawdown.min(),
+            'sharpe': self.sharpe(),
+            'trades': [len(t) for t in trades.values()],
+            'hit_rate': [(t['return'] > 0).mean() if len(t) else np.nan
+                         for t in trades.values()]
+        }, index=list(trades))
+        if np.ndim(self.close) == 1:
+            return summary.iloc[0]
+        return summary
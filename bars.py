@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+PRICES = ['open', 'high', 'low', 'close']
+COLUMNS = PRICES + ['volume']
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+DAY_FORMAT = '%Y-%m-%d'
+
+
+def normalize(data, float32=False):
+    """
+    Convert bars returned by the API to a compact
+    schema: datetime index named 'date', float
+    open, high, low and close columns, integer
+    volume and no other columns (label, vwap,
+    changeOverTime, ...).
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Bars with 'date' column of strings
+    float32 : bool
+        Store prices as float32 instead of float64,
+        halving the memory used by them
+
+    Returns
+    -------
+    pandas.DataFrame
+        Bars sorted by date, of repeated
+        dates only the last bar is kept
+    """
+    dtype = np.float32 if float32 else np.float64
+    index = pd.DatetimeIndex(pd.to_datetime(data['date'].to_numpy()),
+                             name='date')
+    columns = {name: data[name].to_numpy(dtype=dtype) for name in PRICES}
+    # Fractional volumes (e.g. of cryptocurrencies) are rounded
+    columns['volume'] = data['volume'].fillna(0).round().to_numpy(np.int64)
+    bars = pd.DataFrame(columns, index=index, columns=COLUMNS)
+    if not bars.index.is_monotonic_increasing:
+        bars = bars.sort_index(kind='stable')
+    if not bars.index.is_unique:
+        bars = bars[~bars.index.duplicated(keep='last')]
+    return bars
+
+
+def denormalize(bars, interval='day'):
+    """
+    Convert normalized bars back to the format
+    of API.get_historical: 'date' column of
+    strings, oldest bar first and index 0 at
+    the newest bar
+
+    Parameters
+    ----------
+    bars : pandas.DataFrame
+        Bars returned by normalize
+    interval : str
+        Interval of the bars, daily dates
+        have no time
+
+    Returns
+    -------
+    pandas.DataFrame
+        Bars with 'date' and COLUMNS
+    """
+    date_format = DAY_FORMAT if interval == 'day' else DATE_FORMAT
+    data = pd.DataFrame({'date': bars.index.strftime(date_format)})
+    for name in COLUMNS:
+        data[name] = bars[name].to_numpy()
+    data.index = np.arange(len(data) - 1, -1, -1)
+    return data
@@ -0,0 +1,274 @@
+"""
+Performance benchmarks of indicators, signals, API parsing and plotting.
+
+Every case runs on synthetic OHLCV data of the given sizes and reports
+the best time of several runs, throughput in bars per second and peak
+memory allocated during one run. Results can be saved as a baseline
+and later runs are compared against it:
+
+    python benchmarks/bench.py --bars 1000 100000 --symbols 1 100 --save
+    python benchmarks/bench.py --bars 1000 100000 --symbols 1 100
+
+The exit code is 1 when any case is slower than the baseline by more
+than the tolerance and 2 when there is no baseline. The committed
+benchmarks/baseline.json holds the default sizes, measured on one
+machine: save a new baseline before comparing on other hardware.
+"""
+from unittest.mock import patch
+import tracemalloc
+import argparse
+import fnmatch
+import json
+import time
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+import api as api_module
+from analysis import Analysis
+from panel import Panel
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+INDICATORS = ['sma', 'ema', 'bollinger', 'rsi', 'macd',
+              'stochastic', 'williams', 'donchian']
+
+
+def make_frame(bars, seed=0):
+    """
+    Create random historical data in the
+    format of API.get_historical
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(rng.normal(0, 0.01, bars).cumsum())
+    spread = close * rng.uniform(0, 0.01, bars)
+    dates = pd.date_range('2000-01-01', periods=bars, freq='1min')
+    frame = pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'open': close + rng.uniform(-1, 1, bars) * spread,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(100, 10000, bars)
+    })
+    # Index 0 at the newest bar, like API responses
+    frame.index = np.arange(bars - 1, -1, -1)
+    return frame
+
+
+def analysis_cases(bars):
+    """
+    Cases of a single symbol Analysis
+    """
+    analysis = object.__new__(Analysis)
+    analysis.data = make_frame(bars)
+    cases = {}
+    for name in INDICATORS + ['atr', 'adx', 'get_signal', 'get_scores']:
+        method = getattr(analysis, name)
+
+        def run(method=method):
+            analysis.clear_cache()
+            method()
+        cases[f'analysis.{name}'] = run
+    return cases
+
+
+def panel_cases(bars, symbols):
+    """
+    Cases of a Panel of many symbols
+    """
+    frames = {f'S{i}': make_frame(bars, i) for i in range(symbols)}
+    panel = Panel.from_frames(frames)
+    cases = {'panel.combine': lambda: Panel.combine(frames)}
+    for name in INDICATORS + ['get_signal']:
+        method = getattr(panel, name)
+
+        def run(method=method):
+            panel._cache = {}
+            method()
+        cases[f'panel.{name}'] = run
+    return cases
+
+
+def api_cases(bars):
+    """
+    Cases of converting JSON responses
+    to dataframes in API._get_data
+    """
+    api_module.API_KEY = api_module.API_KEY or 'benchmark'
+    api = api_module.API(rate_limit=None)
+    payload = {'historical': make_frame(bars).to_dict('records')}
+    response = patch.object(api, '_request').start().return_value
+    response.json.return_value = payload
+    return {'api._get_data': lambda: api._get_data('url', 'historical')}
+
+
+def plot_cases(bars):
+    """
+    Cases of drawing the chart of the GUI,
+    skipped when PyQt5 is not available
+    """
+    try:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        from tiles import render_tile
+        import ui
+    except ImportError:
+        return {}
+    api_module.API_KEY = api_module.API_KEY or 'benchmark'
+    app = QApplication.instance() or QApplication([])
+    window = ui.Application()
+    window.analysis = object.__new__(Analysis)
+    window.analysis.data = make_frame(bars)
+    for checkbox in window.indicators.values():
+        checkbox.setChecked(False)
+    window.indicators['sma'].setChecked(True)
+    window.indicators['rsi'].setChecked(True)
+    chart = window.chart
+    # Keep the application alive while the cases run
+    window.app = app
+
+    def draw():
+        window.draw_plot(window.analysis.data)
+        window.canvas.draw()
+
+    def toggle():
+        checkbox = window.indicators['ema']
+        checkbox.setChecked(not checkbox.isChecked())
+
+    def pan():
+        left, right = chart.ax.get_xlim()
+        shift = (right - left) / 10
+        chart.set_view(left - shift - 1, right - shift - 1)
+        window.canvas.draw()
+
+    def zoom_out():
+        chart.set_view(0, bars)
+        window.canvas.draw()
+        chart.show_last(window.bins)
+
+    def tile():
+        render_tile(window.analysis.data)
+    draw()
+    return {'ui.draw_plot': draw, 'ui.toggle_indicator': toggle,
+            'ui.pan': pan, 'ui.zoom_out': zoom_out, 'ui.render_tile': tile}
+
+
+def measure(function, repeat):
+    """
+    Get the best time of several runs
+    and peak memory of one more run
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def run(args):
+    """
+    Run all selected cases and
+    return their results
+    """
+    results = {}
+    for bars in args.bars:
+        # Groups of cases with the number of symbols and processed bars
+        groups = [(1, bars, api_cases(bars)),
+                  (1, bars, plot_cases(bars))]
+        for symbols in args.symbols:
+            if bars * symbols > args.max_cells:
+                continue
+            if symbols == 1:
+                groups.append((1, bars, analysis_cases(bars)))
+            else:
+                groups.append((symbols, bars * symbols,
+                               panel_cases(bars, symbols)))
+        for symbols, processed, cases in groups:
+            for name, function in cases.items():
+                if args.only and not fnmatch.fnmatch(name, args.only):
+                    continue
+                key = f'{name}[bars={bars},symbols={symbols}]'
+                seconds, peak = measure(function, args.repeat)
+                results[key] = {
+                    'seconds': seconds,
+                    'bars_per_second': processed / seconds,
+                    'peak_memory': peak
+                }
+                print(f'{key:<55}{seconds * 1000:>11.3f} ms'
+                      f'{processed / seconds:>14.0f} bars/s'
+                      f'{peak / 2 ** 20:>10.1f} MiB', flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Print cases slower than the baseline
+    and return their number
+    """
+    regressions = 0
+    for key, result in results.items():
+        if key not in baseline:
+            print(f'NEW {key}: not in the baseline')
+            continue
+        ratio = result['seconds'] / baseline[key]['seconds']
+        if ratio > 1 + tolerance:
+            regressions += 1
+            print(f'REGRESSION {key}: {ratio:.2f}x slower than baseline')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Performance benchmarks',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__)
+    parser.add_argument('-b', '--bars', type=int, nargs='+',
+                        default=[1000, 100000], help='numbers of bars')
+    parser.add_argument('-s', '--symbols', type=int, nargs='+',
+                        default=[1, 100], help='numbers of symbols')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='number of timed runs of every case')
+    parser.add_argument('--only', help='run only cases matching pattern, '
+                                       'e.g. "analysis.*"')
+    parser.add_argument('--max-cells', type=float, default=5e7,
+                        help='skip sizes with more bars x symbols')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='path to the baseline file')
+    parser.add_argument('--save', action='store_true',
+                        help='save results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown relative to the baseline')
+    args = parser.parse_args(argv)
+    args.baseline = os.path.abspath(args.baseline)
+    # The GUI reads the lists of symbols relative to the project root
+    os.chdir(ROOT)
+    results = run(args)
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}, run with --save to create '
+              'one', file=sys.stderr)
+        return 2
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    return 1 if compare(results, baseline, args.tolerance) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Startup time benchmark.
+
+Measures the time needed to import the modules of the
+application in a fresh interpreter and the time until
+the first window of the GUI is shown:
+
+    python benchmarks/startup.py [--repeat N]
+"""
+import subprocess
+import argparse
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['api', 'analysis', 'panel', 'screener', 'ui']
+
+FIRST_WINDOW = """
+import time
+start = time.perf_counter()
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+import ui
+app = QApplication([])
+window = ui.Application()
+window.show()
+def shown():
+    print(time.perf_counter() - start)
+    app.quit()
+QTimer.singleShot(0, shown)
+app.exec_()
+"""
+
+
+def run(code):
+    """
+    Run code in a fresh interpreter and
+    return the wall time it printed
+    """
+    env = dict(os.environ, API_KEY=os.environ.get('API_KEY', 'benchmark'),
+               QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    output = subprocess.run([sys.executable, '-c', code], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def measure(code, repeat):
+    """
+    Get the best time of several runs
+    """
+    return min(run(code) for _ in range(repeat))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='number of runs, the best one is reported')
+    args = parser.parse_args(argv)
+    print(f'{"target":<20}{"seconds":>10}')
+    for module in MODULES:
+        code = ('import time; start = time.perf_counter(); '
+                f'import {module}; print(time.perf_counter() - start)')
+        print(f'{"import " + module:<20}{measure(code, args.repeat):>10.3f}')
+    print(f'{"first window":<20}{measure(FIRST_WINDOW, args.repeat):>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+from bars import normalize
+import pandas as pd
+import tempfile
+import time
+import os
+
+CACHE_DIR = 'cache'
+# Key of the file metadata with the time of the last full download
+REFRESHED = b'refreshed'
+
+
+class Cache:
+    """
+    Local cache of historical bars, kept as
+    Parquet files per interval and symbol in
+    the compact schema of bars.normalize.
+    Cached bars are only topped up with new
+    ones, so after a split or dividend older
+    prices are adjusted again only when the
+    full history is downloaded, i.e. when
+    the cache is older than max_age or
+    API.get_historical is called with
+    refresh=True.
+
+    Parameters
+    ----------
+    directory : str
+        Directory of the cache files
+    max_age : float or None
+        Seconds after the last full download
+        when bars expire, never if None
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_age=None):
+        self.directory = directory
+        self.max_age = max_age
+
+    def _path(self, symbol, interval):
+        """
+        Get path of the cache file for
+        a given symbol and interval
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol of the cached data
+        interval : str
+            Interval of the cached data
+
+        Returns
+        -------
+        str
+            Path to the Parquet file
+        """
+        return os.path.join(self.directory, interval, symbol + '.parquet')
+
+    def load(self, symbol, interval):
+        """
+        Load cached bars for a given
+        symbol and interval
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol of the cached data
+        interval : str
+            Interval of the cached data
+
+        Returns
+        -------
+        pandas.DataFrame or None
+            Cached bars in the schema of
+            bars.normalize or None if
+            nothing is cached yet
+        """
+        path = self._path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        data = pd.read_parquet(path)
+        if not pd.api.types.is_datetime64_any_dtype(data['date']):
+            # Files written before the compact schema keep raw columns
+            return normalize(data)
+        return data.set_index('date')
+
+    def refreshed(self, symbol, interval):
+        """
+        Get time of the last full download
+        of cached bars, read from the file
+        metadata without loading the bars
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol of the cached data
+        interval : str
+            Interval of the cached data
+
+        Returns
+        -------
+        float or None
+            Unix time or None if nothing is
+            cached or the time is unknown
+        """
+        import pyarrow.parquet as pq
+        path = self._path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        metadata = pq.read_schema(path).metadata or {}
+        if REFRESHED not in metadata:
+            return None
+        return float(metadata[REFRESHED])
+
+    def expired(self, symbol, interval):
+        """
+        Check whether cached bars are older
+        than max_age and have to be fully
+        downloaded again
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol of the cached data
+        interval : str
+            Interval of the cached data
+
+        Returns
+        -------
+        bool
+            True if the bars expired
+        """
+        if self.max_age is None:
+            return False
+        refreshed = self.refreshed(symbol, interval)
+        return refreshed is None or time.time() - refreshed > self.max_age
+
+    def save(self, symbol, interval, data, full=False):
+        """
+        Save bars for a given symbol and
+        interval, replacing the previous
+        cache file atomically
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol of the data
+        interval : str
+            Interval of the data
+        data : pandas.DataFrame
+            Bars returned by bars.normalize
+        full : bool
+            Bars are the full history, so the
+            time of the last full download is
+            set to now instead of kept
+        """
+        import pyarrow.parquet as pq
+        import pyarrow as pa
+        path = self._path(symbol, interval)
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        refreshed = time.time() if full else self.refreshed(symbol, interval)
+        table = pa.Table.from_pandas(data.reset_index(), preserve_index=False)
+        if refreshed is not None:
+            table = table.replace_schema_metadata({
+                **table.schema.metadata, REFRESHED: str(refreshed).encode()})
+        # Every writer has its own temporary file
+        handle, temp = tempfile.mkstemp(dir=folder, prefix=symbol + '.',
+                                        suffix='.tmp')
+        os.close(handle)
+        try:
+            pq.write_table(table, temp)
+            os.replace(temp, path)
+        except BaseException:
+            os.remove(temp)
+            raise
+
+    def clear(self, symbol=None, interval=None):
+        """
+        Remove cached bars. If symbol or
+        interval is None, all matching
+        files are removed.
+
+        Parameters
+        ----------
+        symbol : str or None
+            Symbol to remove
+        interval : str or None
+            Interval to remove
+        """
+        if not os.path.isdir(self.directory):
+            return
+        intervals = [interval] if interval else os.listdir(self.directory)
+        for name in intervals:
+            folder = os.path.join(self.directory, name)
+            if not os.path.isdir(folder):
+                continue
+            for file in os.listdir(folder):
+                if symbol is None or file == symbol + '.parquet':
+                    os.remove(os.path.join(folder, file))
@@ -0,0 +1,605 @@
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib import ticker
+import numpy as np
+
+UP = '#2BA59A'
+DOWN = '#EF5350'
+OSCILLATORS = ['rsi', 'stochastic', 'williams']
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# Columns of indicators in the order of their artists
+SERIES = {
+    'sma': None,
+    'ema': None,
+    'bollinger': ['upper', 'lower'],
+    'rsi': None,
+    'stochastic': ['%K', '%D'],
+    'williams': None,
+    'macd': ['MACD', 'Signal', 'Histogram']
+}
+VIEW = 50
+MIN_BARS = 10
+MIN_PIXELS = 2
+ZOOM = 1.25
+
+
+def rectangles(left, right, bottom, top):
+    """
+    Get vertices of rectangles for PolyCollection
+
+    Parameters
+    ----------
+    left, right, bottom, top : numpy.ndarray
+        Coordinates of the edges
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (n, 4, 2)
+    """
+    return np.stack([np.column_stack([left, bottom]),
+                     np.column_stack([left, top]),
+                     np.column_stack([right, top]),
+                     np.column_stack([right, bottom])], axis=1)
+
+
+def add_candles(ax):
+    """
+    Add empty collections of candle
+    bodies, wicks and volume to axes
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axes to add the collections to
+
+    Returns
+    -------
+    tuple
+        Bodies, wicks and volume
+    """
+    bodies = ax.add_collection(PolyCollection([]))
+    wicks = ax.add_collection(LineCollection([], linewidths=1))
+    # Volume in axes coordinates, up to 1 / 6.18 of the height
+    volume = ax.add_collection(PolyCollection(
+        [], edgecolors='none', alpha=0.5,
+        transform=ax.get_xaxis_transform()))
+    return bodies, wicks, volume
+
+
+def draw_candles(artists, bars, first, step=1, scale=0):
+    """
+    Set candles of bars in collections
+    of add_candles. Candle i is at
+    x = (first + i) * step + 1.
+
+    Parameters
+    ----------
+    artists : tuple
+        Bodies, wicks and volume
+    bars : numpy.ndarray
+        Open, high, low, close and volume
+        of (aggregated) bars
+    first : int
+        Position of the first bar
+    step : int
+        Number of bars in a group
+    scale : float
+        Volume of the full height of
+        volume bars, hidden if 0
+    """
+    bodies, wicks, volume = artists
+    o, h, l, c, v = bars.T
+    x = (np.arange(len(bars)) + first) * step + 1.0
+    colors = np.where(c >= o, UP, DOWN)
+    bodies.set_verts(rectangles(x, x + 0.618 * step, o, c))
+    bodies.set_facecolor(colors)
+    bodies.set_edgecolor(colors)
+    wicks.set_segments(np.stack([
+        np.column_stack([x + 0.309 * step, l]),
+        np.column_stack([x + 0.309 * step, h])], axis=1))
+    wicks.set_color(colors)
+    top = v / scale / 6.18 if scale else np.zeros(len(v))
+    volume.set_verts(rectangles(x - 0.191 * step, x + 0.809 * step,
+                                np.zeros(len(v)), top))
+    volume.set_facecolor(colors)
+
+
+class Chart:
+    """
+    Candlestick chart with indicators kept
+    between updates. Axes and artists are
+    created once and only their data is
+    replaced. Indicators are animated artists
+    drawn over a cached background, so showing
+    or hiding one blits a single image instead
+    of redrawing the whole figure, and so does
+    a revision of the last candle. The whole
+    history can be browsed by zooming with the
+    mouse wheel and panning by dragging, bars
+    are aggregated to fit the pixel columns.
+
+    Parameters
+    ----------
+    figure : matplotlib.figure.Figure
+        Figure to draw on, its canvas
+        has to support blitting
+    """
+
+    def __init__(self, figure):
+        self.figure = figure
+        self.canvas = figure.canvas
+        self.dates = np.array([])
+        self.visible = set()
+        self.background = None
+        self.ax = ax = figure.add_subplot(111)
+        ax.set_facecolor('#131722')
+        ax.tick_params(axis='x', colors='#F0F0F0')
+        ax.tick_params(axis='y', colors='#F0F0F0')
+        ax.grid(True, color='#38414E', linestyle='--', linewidth=0.5)
+        ax.set_axisbelow(True)
+        ax.xaxis.set_major_locator(ticker.MaxNLocator(nbins=10))
+        ax.yaxis.set_major_locator(ticker.MaxNLocator(nbins=20))
+        # Label only the ticks chosen by the locator, candle i is at i + 1
+        ax.xaxis.set_major_formatter(ticker.FuncFormatter(self._format_date))
+
+        # Oscillators and MACD share the right y-axis
+        self.ax_oscillators = ax.twinx()
+        self.ax_oscillators.set_ylim([0, 100])
+        self.ax_oscillators.set_yticks([0, 20, 40, 60, 80, 100])
+        self.ax_macd = ax.twinx()
+        for twin in [self.ax_oscillators, self.ax_macd]:
+            twin.tick_params(axis='y', colors='#F0F0F0')
+            twin.set_visible(False)
+
+        self.bodies, self.wicks, self.volume = add_candles(ax)
+        # The newest candle changes with live data and is blitted
+        self.live = add_candles(ax)
+        for artist in self.live:
+            artist.set_animated(True)
+
+        line = self._line
+        self.series = {
+            'sma': [line(ax, '#F9A825', 'SMA')],
+            'ema': [line(ax, '#42A5F5', 'EMA')],
+            'bollinger': [
+                line(ax, '#66BB6A', 'Bollinger Bands'),
+                line(ax, '#66BB6A'),
+                ax.add_collection(PolyCollection(
+                    [], facecolors='#66BB6A', edgecolors='none', alpha=0.2))
+            ],
+            'rsi': [line(self.ax_oscillators, '#9C27B0', 'RSI')],
+            'stochastic': [
+                line(self.ax_oscillators, '#0094FF', 'Stochastic %K'),
+                line(self.ax_oscillators, '#FF6A00', 'Stochastic %D')
+            ],
+            'williams': [line(self.ax_oscillators, '#F44336', 'Williams %R')],
+            'macd': [
+                line(self.ax_macd, '#F44336', 'MACD'),
+                line(self.ax_macd, '#4CAF50', 'Signal'),
+                self.ax_macd.add_collection(PolyCollection(
+                    [], facecolors='#F44336', edgecolors='none', alpha=0.2,
+                    label='Histogram'))
+            ]
+        }
+        for artists in self.series.values():
+            for artist in artists:
+                artist.set_animated(True)
+                artist.set_visible(False)
+        self.legends = []
+        self.bars = np.empty((0, len(COLUMNS)))
+        self.values = {}
+        self.levels = {}
+        self.window = None
+        self.scale = 0
+        self.drag = None
+        ax.callbacks.connect('xlim_changed', self.refresh)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('resize_event', self.refresh)
+        self.canvas.mpl_connect('scroll_event', self._on_scroll)
+        self.canvas.mpl_connect('button_press_event', self._on_press)
+        self.canvas.mpl_connect('motion_notify_event', self._on_motion)
+        self.canvas.mpl_connect('button_release_event', self._on_release)
+
+    @staticmethod
+    def _line(ax, color, label=None):
+        """
+        Add an empty line to the axes
+        """
+        return ax.plot([], [], color=color, label=label)[0]
+
+    def _format_date(self, x, pos=None):
+        """
+        Get the date of the candle at x
+        """
+        i = int(round(x)) - 1
+        return self.dates[i] if 0 <= i < len(self.dates) else ''
+
+    def set_data(self, data, indicators, bars=VIEW):
+        """
+        Replace the bars and indicators
+        and show the latest bars
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Bars to plot, can be the whole history
+        indicators : dict
+            Indicators keyed by name,
+            aligned with data
+        bars : int
+            Number of the latest bars to show
+        """
+        self.bars = data[COLUMNS].to_numpy(dtype=float)
+        self.dates = data['date'].to_numpy()
+        self.values = self._values(indicators, len(data))
+        self.levels = {}
+        self.show_last(bars)
+
+    @staticmethod
+    def _values(indicators, n):
+        """
+        Get arrays of the last n values
+        of indicators in the order of artists
+        """
+        arrays = {}
+        for name, values in indicators.items():
+            values = values[SERIES[name]] if SERIES[name] else values
+            values = values.to_numpy(dtype=float)
+            arrays[name] = values.reshape(len(values), -1)[len(values) - n:]
+        return arrays
+
+    def update(self, data, indicators):
+        """
+        Revise the last bar and append new ones,
+        e.g. polled live data. A revision of the
+        last bar redraws only its candle and the
+        indicators over the cached background,
+        unless it leaves the y-axis. If the
+        latest bars are shown, the view follows
+        appended bars.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Bars from the date of the last bar
+        indicators : dict
+            Indicators keyed by name,
+            aligned with data
+        """
+        if not len(self.bars):
+            return self.set_data(data, indicators)
+        bars = data[COLUMNS].to_numpy(dtype=float)
+        dates = data['date'].to_numpy()
+        values = self._values(indicators, len(data))
+        if len(dates) and dates[0] == self.dates[-1]:
+            self.bars[-1] = bars[0]
+            for name in self.values:
+                self.values[name][-1] = values[name][0]
+            bars, dates = bars[1:], dates[1:]
+            values = {name: values[1:] for name, values in values.items()}
+        if len(bars):
+            n = len(self.bars)
+            self.bars = np.concatenate([self.bars, bars])
+            self.dates = np.concatenate([self.dates, dates])
+            for name in self.values:
+                self.values[name] = np.concatenate(
+                    [self.values[name], values[name]])
+            self.levels = {}
+            left, right = self.ax.get_xlim()
+            if right >= n + 1:
+                self.set_view(left - 1 + len(bars), right - 1 + len(bars))
+            else:
+                self.refresh()
+            return
+        self._revise_levels()
+        if self.window is None:
+            return
+        step, first, last = self.window
+        grouped, values = self.level(step)
+        if last < len(grouped):
+            # The last bar is not shown
+            return
+        o, h, l, c, v = grouped[-1]
+        bottom, top = self.ax.get_ylim()
+        if not bottom <= l <= h <= top or v > self.scale \
+                or not self._fits(self.ax_macd, values.get('macd')):
+            return self.refresh()
+        draw_candles(self.live, grouped[-1:], len(grouped) - 1, step,
+                     self.scale)
+        self._draw_indicators(values, first, last, step)
+        if self.background is None:
+            self.canvas.draw_idle()
+        else:
+            self.blit()
+
+    @staticmethod
+    def _fits(ax, values):
+        """
+        Check whether the last values
+        are within the y-axis
+        """
+        if values is None:
+            return True
+        bottom, top = ax.get_ylim()
+        last = values[-1][np.isfinite(values[-1])]
+        return bool(np.all((bottom <= last) & (last <= top)))
+
+    def _revise_levels(self):
+        """
+        Aggregate the last group of every
+        level again after a revision
+        of the last bar
+        """
+        end = len(self.bars) - 1
+        for step, (grouped, values) in self.levels.items():
+            group = self.bars[end // step * step:]
+            grouped[-1] = [group[0, 0], np.fmax.reduce(group[:, 1]),
+                           np.fmin.reduce(group[:, 2]), group[-1, 3],
+                           np.nansum(group[:, 4])]
+            for name in values:
+                values[name][-1] = self.values[name][end]
+
+    def show_last(self, bars):
+        """
+        Show a given number of the latest bars
+
+        Parameters
+        ----------
+        bars : int
+            Number of bars to show
+        """
+        self.set_view(len(self.bars) - bars, len(self.bars))
+
+    def set_view(self, start, stop):
+        """
+        Show bars from start to stop
+        (positions in data, stop excluded),
+        limited to the available history
+
+        Parameters
+        ----------
+        start : float
+            Position of the first bar
+        stop : float
+            Position after the last bar
+        """
+        n = len(self.bars)
+        if not n:
+            return
+        width = min(max(stop - start, MIN_BARS), n)
+        start = min(max(start, 0), n - width)
+        # Changing the limits refreshes the chart
+        self.ax.set_xlim(start + 1, start + width + 1)
+
+    def level(self, step):
+        """
+        Get bars and indicators aggregated
+        by a given number of bars: open of
+        the first bar, the highest high, the
+        lowest low, close of the last bar,
+        total volume and indicators at the
+        last bar. Levels are computed once
+        per data.
+
+        Parameters
+        ----------
+        step : int
+            Number of bars in a group
+
+        Returns
+        -------
+        tuple
+            Array of aggregated bars and
+            dictionary of indicator arrays
+        """
+        if step not in self.levels:
+            bars = self.bars
+            starts = np.arange(0, len(bars), step)
+            ends = np.minimum(starts + step, len(bars)) - 1
+            grouped = np.column_stack([
+                bars[starts, 0],
+                np.fmax.reduceat(bars[:, 1], starts),
+                np.fmin.reduceat(bars[:, 2], starts),
+                bars[ends, 3],
+                np.add.reduceat(np.nan_to_num(bars[:, 4]), starts)
+            ]) if step > 1 else bars
+            values = {name: values[ends]
+                      for name, values in self.values.items()}
+            self.levels[step] = grouped, values
+        return self.levels[step]
+
+    def refresh(self, *args):
+        """
+        Draw the bars in the current limits
+        of the x-axis. When there are more
+        bars than pixel columns, they are
+        aggregated by powers of two, keeping
+        the true high and low of every group.
+        """
+        n = len(self.bars)
+        if not n:
+            return
+        self.background = None
+        left, right = self.ax.get_xlim()
+        start = min(max(int(np.floor(left)) - 1, 0), n)
+        stop = min(max(int(np.ceil(right)) - 1, start), n)
+        columns = max(self.ax.get_window_extent().width / MIN_PIXELS, 1)
+        step = 1
+        while (stop - start) / step > columns:
+            step *= 2
+        bars, values = self.level(step)
+        # One more group on each side continues the lines to the edges
+        first = max(start // step - 1, 0)
+        last = min(-(-stop // step) + 1, len(bars))
+        self.window = step, first, last
+        shown = bars[first:last]
+        highest = np.nanmax(shown[:, 4]) if len(shown) else 0
+        self.scale = highest if highest > 0 else 0
+        # The last bar is drawn by animated artists, so it can change alone
+        live = int(last == len(bars))
+        draw_candles((self.bodies, self.wicks, self.volume),
+                     bars[first:last - live], first, step, self.scale)
+        draw_candles(self.live, bars[last - live:last], last - live, step,
+                     self.scale)
+        self._set_ylim(self.ax, shown[:, 1:3].ravel(), bottom=0.0)
+        self._draw_indicators(values, first, last, step)
+        self.canvas.draw_idle()
+
+    def _draw_indicators(self, values, first, last, step):
+        """
+        Set lines of aggregated indicators
+        from the first to the last group
+        """
+        x = np.arange(first, last) * step + 1.0 + 0.309 * step
+        for name, values in values.items():
+            values = values[first:last]
+            artists = self.series[name]
+            if name == 'bollinger':
+                band = np.column_stack([x, values])
+                band = band[np.isfinite(band).all(axis=1)]
+                artists[2].set_verts([np.concatenate([
+                    band[:, [0, 2]], band[::-1, [0, 1]]])])
+            if name == 'macd':
+                hist = np.nan_to_num(values[:, 2])
+                artists[2].set_verts(rectangles(
+                    x - 0.309 * step, x + 0.309 * step,
+                    np.zeros(len(x)), hist))
+                self._set_ylim(self.ax_macd, values)
+            for artist, column in zip(artists, values.T):
+                if hasattr(artist, 'set_data'):
+                    artist.set_data(x, column)
+
+    @staticmethod
+    def _set_ylim(ax, values, bottom=None):
+        """
+        Fit the y-axis to given values with
+        a margin, not going below bottom
+        """
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        lowest, highest = values.min(), values.max()
+        margin = 0.05 * (highest - lowest) or 0.05 * abs(highest) or 1
+        lowest, highest = lowest - margin, highest + margin
+        if bottom is not None:
+            lowest = max(lowest, bottom)
+        ax.set_ylim(lowest, highest)
+
+    def _on_scroll(self, event):
+        """
+        Zoom in or out around the cursor
+        """
+        if event.inaxes is None or not len(self.bars):
+            return
+        factor = ZOOM ** -event.step
+        left, right = self.ax.get_xlim()
+        x = event.xdata
+        self.set_view(x - (x - left) * factor - 1,
+                      x + (right - x) * factor - 1)
+
+    def _on_press(self, event):
+        """
+        Start panning with the left button
+        """
+        if event.inaxes is not None and event.button == 1:
+            self.drag = event.x, self.ax.get_xlim()
+
+    def _on_motion(self, event):
+        """
+        Pan by the distance from the press
+        """
+        if self.drag is None:
+            return
+        x, (left, right) = self.drag
+        shift = (event.x - x) / self.ax.get_window_extent().width \
+            * (right - left)
+        self.set_view(left - shift - 1, right - shift - 1)
+
+    def _on_release(self, event):
+        """
+        Stop panning
+        """
+        self.drag = None
+
+    def set_visible(self, names):
+        """
+        Show only given indicators. The figure
+        is redrawn only if the right y-axis
+        changes, otherwise indicators are
+        blitted over the cached background.
+
+        Parameters
+        ----------
+        names : iterable of str
+            Indicators to show
+        """
+        visible = set(names)
+        # Bollinger Bands include the SMA
+        if 'bollinger' in visible:
+            visible.add('sma')
+        for name, artists in self.series.items():
+            for artist in artists:
+                artist.set_visible(name in visible)
+        oscillators = bool(visible & set(OSCILLATORS))
+        macd = 'macd' in visible and not oscillators
+        axes_changed = oscillators != self.ax_oscillators.get_visible() \
+            or macd != self.ax_macd.get_visible()
+        self.ax_oscillators.set_visible(oscillators)
+        self.ax_macd.set_visible(macd)
+        self.visible = visible
+        self._update_legends()
+        if axes_changed or self.background is None:
+            self.canvas.draw_idle()
+        else:
+            self.blit()
+
+    def _update_legends(self):
+        """
+        Create legends of visible indicators
+        """
+        for legend in self.legends:
+            legend.remove()
+        self.legends = []
+        for ax, loc in [(self.ax, 'upper left'),
+                        (self.ax_oscillators, 'lower left'),
+                        (self.ax_macd, 'lower left')]:
+            handles = [artist for name in self.series
+                       if name in self.visible
+                       for artist in self.series[name]
+                       if artist.axes is ax
+                       and not artist.get_label().startswith('_')]
+            if handles and ax.get_visible():
+                self.legends.append(ax.legend(handles=handles, loc=loc))
+        for legend in self.legends:
+            legend.set_animated(True)
+
+    def _on_draw(self, event):
+        """
+        Cache the background after a full
+        draw and add animated artists on top
+        """
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        """
+        Draw the last candle, visible
+        indicators and legends
+        """
+        for artist in self.live:
+            self.ax.draw_artist(artist)
+        for artists in self.series.values():
+            for artist in artists:
+                if artist.get_visible() and artist.axes.get_visible():
+                    artist.axes.draw_artist(artist)
+        for legend in self.legends:
+            legend.axes.draw_artist(legend)
+
+    def blit(self):
+        """
+        Restore the cached background, draw
+        indicators over it and show the result
+        """
+        self.canvas.restore_region(self.background)
+        self._draw_animated()
+        self.canvas.blit(self.figure.bbox)
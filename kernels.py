@@ -0,0 +1,621 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Length of blocks of the vectorized exponential smoothing
+BLOCK = 16
+RSI_METHODS = ['sma', 'wilder']
+
+
+def _output(out, shape):
+    """
+    Get preallocated output array
+    or allocate a new one
+    """
+    if out is None:
+        return np.empty(shape)
+    if out.shape != tuple(shape):
+        raise ValueError('Invalid output shape')
+    return out
+
+
+def _by_column(function, values, out, *args):
+    """
+    Apply a kernel of 1-D arrays to every
+    column (symbol) of a 2-D array, the
+    columns are copied to contiguous rows
+    """
+    rows = np.array(values.T, order='C')
+    for j, row in enumerate(rows):
+        out[:, j] = function(row, *args, row)
+    return out
+
+
+def _blocks(values, period, fill):
+    """
+    Split values into blocks of the window
+    size padded with a fill value, see
+    rolling_max and rolling_sum
+    """
+    length = len(values)
+    blocks = -(-length // period)
+    padding = np.full((blocks * period - length,) + values.shape[1:], fill)
+    padded = np.concatenate([values, padding])
+    return padded.reshape((blocks, period) + values.shape[1:]), padded.shape
+
+
+def rolling_max(values, period):
+    """
+    Maximum over a sliding window along the
+    first axis in O(n) regardless of the window
+    size (van Herk/Gil-Werman algorithm).
+    Like pandas rolling(period).max(), the
+    first period - 1 values are nan and
+    windows containing nan give nan.
+
+    Parameters
+    ----------
+    values : array_like
+        1-D or 2-D array (time x symbol)
+    period : int
+        Size of the window
+
+    Returns
+    -------
+    numpy.ndarray
+        Rolling maximum with the shape of values
+    """
+    if period < 0:
+        raise ValueError('Invalid period')
+    values = np.asarray(values, dtype=float)
+    length = len(values)
+    result = np.full(values.shape, np.nan)
+    if period == 0 or length < period:
+        return result
+    # Split into blocks of the window size and take running maxima
+    # from the left and from the right inside each block. Every
+    # window spans at most two blocks, so its maximum is the suffix
+    # maximum of its first element and the prefix maximum of its last.
+    shaped, shape = _blocks(values, period, -np.inf)
+    prefix = np.maximum.accumulate(shaped, axis=1).reshape(shape)
+    suffix = np.maximum.accumulate(shaped[:, ::-1], axis=1)[:, ::-1]
+    suffix = suffix.reshape(shape)
+    np.maximum(suffix[:length - period + 1], prefix[period - 1:length],
+               out=result[period - 1:])
+    return result
+
+
+def rolling_extrema(high, low, period):
+    """
+    Highest high and lowest low over a sliding
+    window computed together in a single pass
+    of rolling_max. Shared by the stochastic
+    oscillator, Williams %R and Donchian channels.
+
+    Parameters
+    ----------
+    high : array_like
+        High prices, 1-D or 2-D (time x symbol)
+    low : array_like
+        Low prices with the shape of high
+    period : int
+        Size of the window
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Highest high and lowest low
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    result = rolling_max(np.stack([high, -low], axis=-1), period)
+    return result[..., 0], -result[..., 1]
+
+
+def rolling_sum(values, period, out=None):
+    """
+    Sum over a sliding window in O(n) with
+    the blocks of rolling_max. Unlike the
+    difference of cumulative sums, the error
+    does not grow with the length of values
+    and windows of zeros sum to exactly 0.
+    Like pandas rolling(period).sum(), the
+    first period - 1 values are nan and
+    windows containing nan give nan.
+
+    Parameters
+    ----------
+    values : array_like
+        1-D or 2-D array (time x symbol)
+    period : int
+        Size of the window
+    out : numpy.ndarray or None
+        Preallocated output with the shape
+        of values, can be values itself
+
+    Returns
+    -------
+    numpy.ndarray
+        Rolling sum with the shape of values
+    """
+    if period < 0:
+        raise ValueError('Invalid period')
+    values = np.asarray(values, dtype=float)
+    length = len(values)
+    if period == 0 or length < period:
+        result = _output(out, values.shape)
+        result.fill(np.nan)
+        return result
+    shaped, shape = _blocks(values, period, 0.0)
+    prefix = np.cumsum(shaped, axis=1).reshape(shape)
+    suffix = np.cumsum(shaped[:, ::-1], axis=1)[:, ::-1].reshape(shape)
+    # Window starting at a block is its suffix, other windows span
+    # the suffix of one block and the prefix of the next one
+    prefix[period - 1::period] = 0
+    result = _output(out, values.shape)
+    result[:period - 1] = np.nan
+    np.add(suffix[:length - period + 1], prefix[period - 1:length],
+           out=result[period - 1:])
+    return result
+
+
+def sma(values, period, out=None):
+    """
+    Simple moving average, see rolling_sum
+
+    Parameters
+    ----------
+    values : array_like
+        1-D or 2-D array (time x symbol)
+    period : int
+        Size of the window
+    out : numpy.ndarray or None
+        Preallocated output, can be values
+
+    Returns
+    -------
+    numpy.ndarray
+        Moving average with the shape of values
+    """
+    result = rolling_sum(values, period, out)
+    if period:
+        result /= period
+    return result
+
+
+def _linear(values, decay, out):
+    """
+    Solve the recurrence s[t] = decay * s[t - 1]
+    + values[t] with s[-1] = 0 along the last
+    axis in blocks: every block is a product with
+    a matrix of powers of decay and states between
+    blocks are the same recurrence of block ends,
+    solved recursively
+    """
+    length = values.shape[-1]
+    rest = values.shape[:-1]
+    size = min(length, BLOCK)
+    powers = decay ** np.arange(size + 1)
+    lag = np.subtract.outer(np.arange(size), np.arange(size))
+    matrix = np.where(lag >= 0, powers[np.maximum(lag, 0)], 0.0)
+    blocks = length // size
+    full = blocks * size
+    shaped = out[..., :full].reshape(rest + (blocks, size))
+    np.matmul(values[..., :full].reshape(shaped.shape), matrix.T, out=shaped)
+    tail = length - full
+    if tail:
+        np.matmul(values[..., full:], matrix[:tail, :tail].T,
+                  out=out[..., full:])
+    if blocks + (tail > 0) == 1:
+        return out
+    # States after every block but the last one
+    ends = blocks - (tail == 0)
+    carry = _linear(out[..., size - 1:full:size][..., :ends].copy(),
+                    powers[-1], np.empty(rest + (ends,)))
+    shaped[..., 1:, :] += carry[..., :blocks - 1, None] * powers[1:]
+    if tail:
+        out[..., full:] += carry[..., -1:] * powers[1:tail + 1]
+    return out
+
+
+def _ewm_numpy(values, alpha, out):
+    """
+    Vectorized exponential smoothing, see ewm
+    """
+    valid = ~np.isnan(values)
+    start = valid.argmax()
+    if not valid[start]:
+        out.fill(np.nan)
+        return out
+    result = out
+    if valid[start:].all():
+        # Leading nan values only, e.g. of differences or warm-up
+        out[:start] = np.nan
+        values, out = values[start:], out[start:]
+        positions = None
+        selected = values
+    else:
+        positions = np.flatnonzero(valid)
+        selected = values[positions]
+    # Values are centered at the first one, so the smoothing
+    # starts at exactly that value and sums stay small
+    first = selected[0]
+    centered = np.subtract(selected, first)
+    centered *= alpha
+    if positions is None:
+        _linear(centered, 1 - alpha, out)
+        out += first
+        return result
+    smooth = _linear(centered, 1 - alpha, centered.copy())
+    smooth += first
+    # Hold the last value over gaps
+    last = np.zeros(len(values), dtype=np.intp)
+    last[positions] = np.arange(len(positions))
+    np.maximum.accumulate(last, out=last)
+    np.take(smooth, last, out=out)
+    out[:positions[0]] = np.nan
+    return out
+
+
+def _ewm_columns(values, alpha, out):
+    """
+    Vectorized exponential smoothing of the
+    columns of a 2-D array, as contiguous rows.
+    Columns with nan values only before the
+    first value (e.g. symbols listed later)
+    are smoothed at once, others one at a time.
+    """
+    rows = np.array(values.T, order='C')
+    missing = np.isnan(rows)
+    length = rows.shape[1]
+    starts = (~missing).argmax(axis=1)
+    counts = length - missing.sum(axis=1)
+    leading = (counts > 0) & (counts == length - starts)
+    if leading.all():
+        selected, gaps = rows, missing
+    else:
+        selected, gaps = rows[leading], missing[leading]
+    if len(selected):
+        # Centered values are 0 before the first value of a row,
+        # so its smoothing starts at exactly that value
+        first = selected[np.arange(len(selected)), starts[leading], None]
+        selected -= first
+        delayed = counts[leading].min() < length
+        if delayed:
+            np.copyto(selected, 0, where=gaps)
+        selected *= alpha
+        smooth = _linear(selected, 1 - alpha, np.empty(selected.shape))
+        smooth += first
+        if delayed:
+            np.copyto(smooth, np.nan, where=gaps)
+        if selected is rows:
+            out[...] = smooth.T
+        else:
+            out[:, leading] = smooth.T
+    for column in np.flatnonzero(~leading):
+        _ewm_numpy(rows[column], alpha, out[:, column])
+    return out
+
+
+def _ewm_loop(values, alpha, out):
+    """
+    Exponential smoothing in a single loop,
+    compiled with numba if it is installed
+    """
+    state = np.nan
+    for i in range(len(values)):
+        value = values[i]
+        if not np.isnan(value):
+            if np.isnan(state):
+                state = value
+            else:
+                state += alpha * (value - state)
+        out[i] = state
+    return out
+
+
+_ewm_compiled = njit(cache=True)(_ewm_loop) if njit else None
+
+
+def ewm(values, alpha, out=None):
+    """
+    Exponential smoothing starting with the
+    first value that is not nan, like pandas
+    ewm(alpha=alpha, adjust=False, ignore_na=True)
+    .mean(): nan values are skipped and the last
+    value is held over them. Runs a compiled
+    loop if numba is installed, otherwise the
+    recurrence is vectorized in blocks.
+
+    Parameters
+    ----------
+    values : array_like
+        1-D or 2-D array (time x symbol)
+    alpha : float
+        Smoothing factor from 0 to 1
+    out : numpy.ndarray or None
+        Preallocated output, can be values
+
+    Returns
+    -------
+    numpy.ndarray
+        Smoothed values
+    """
+    if not 0 < alpha <= 1:
+        raise ValueError('Invalid alpha')
+    values = np.asarray(values, dtype=float)
+    out = _output(out, values.shape)
+    if _ewm_compiled is not None:
+        if values.ndim > 1:
+            return _by_column(ewm, values, out, alpha)
+        return _ewm_compiled(values, alpha, out)
+    if values.ndim > 1:
+        return _ewm_columns(values, alpha, out)
+    return _ewm_numpy(values, alpha, out)
+
+
+def ema(values, period, out=None):
+    """
+    Exponential moving average with span
+    of a given period, see ewm
+
+    Parameters
+    ----------
+    values : array_like
+        1-D or 2-D array (time x symbol)
+    period : int
+        Span of the average
+    out : numpy.ndarray or None
+        Preallocated output, can be values
+
+    Returns
+    -------
+    numpy.ndarray
+        Moving average
+    """
+    if period < 1:
+        raise ValueError('Invalid period')
+    return ewm(values, 2 / (period + 1), out)
+
+
+def wilder(values, period, out=None):
+    """
+    Wilder's smoothing: average of the first
+    period values, then exponential smoothing
+    with alpha = 1 / period. Used by Wilder's
+    RSI, ATR and ADX.
+
+    Parameters
+    ----------
+    values : array_like
+        1-D or 2-D array (time x symbol)
+    period : int
+        Number of periods
+    out : numpy.ndarray or None
+        Preallocated output, can be values
+
+    Returns
+    -------
+    numpy.ndarray
+        Smoothed values, nan before
+        the first full window
+    """
+    if period < 1:
+        raise ValueError('Invalid period')
+    values = np.asarray(values, dtype=float)
+    out = _output(out, values.shape)
+    if values.ndim > 1:
+        return _by_column(wilder, values, out, period)
+    valid = ~np.isnan(values)
+    first = valid.argmax()
+    if valid[first:first + period].all() and len(values) >= first + period:
+        start = first + period - 1
+        seed = values[first:start + 1].sum() / period
+    else:
+        # Gaps before the first full window
+        seeds = sma(values, period)
+        start = np.flatnonzero(~np.isnan(seeds))
+        if not len(start):
+            out.fill(np.nan)
+            return out
+        start = start[0]
+        seed = seeds[start]
+    if out is not values:
+        out[start + 1:] = values[start + 1:]
+    out[:start] = np.nan
+    out[start] = seed
+    return ewm(out, 1 / period, out)
+
+
+def macd(close, signal_period=9, fast_period=12, slow_period=26, out=None):
+    """
+    Moving Average Convergence Divergence:
+    difference of fast and slow EMA, its
+    EMA (signal line) and their difference
+    (histogram)
+
+    Parameters
+    ----------
+    close : array_like
+        1-D or 2-D array of closing
+        prices (time x symbol)
+    signal_period : int
+        Number of periods for signal EMA
+    fast_period : int
+        Number of periods for fast EMA
+    slow_period : int
+        Number of periods for slow EMA
+    out : numpy.ndarray or None
+        Preallocated output of shape
+        (3,) + close.shape
+
+    Returns
+    -------
+    numpy.ndarray
+        MACD, signal and histogram rows
+    """
+    close = np.asarray(close, dtype=float)
+    out = _output(out, (3,) + close.shape)
+    line, signal, histogram = out
+    ema(close, fast_period, line)
+    line -= ema(close, slow_period, histogram)
+    ema(line, signal_period, signal)
+    np.subtract(line, signal, out=histogram)
+    return out
+
+
+def rsi(close, period=14, method='sma', out=None):
+    """
+    Relative Strength Index from average gains
+    and losses: simple moving averages (Cutler)
+    or Wilder's smoothing. Gains and losses are
+    computed into two buffers, one of them the
+    output.
+
+    Parameters
+    ----------
+    close : array_like
+        1-D or 2-D array of closing
+        prices (time x symbol)
+    period : int
+        Number of periods
+    method : str
+        Averaging: 'sma' or 'wilder'
+    out : numpy.ndarray or None
+        Preallocated output
+
+    Returns
+    -------
+    numpy.ndarray
+        RSI from 0 to 100, nan for
+        the first period values
+    """
+    if method not in RSI_METHODS:
+        raise ValueError('Invalid method')
+    close = np.asarray(close, dtype=float)
+    out = _output(out, close.shape)
+    gain = np.empty(close.shape)
+    gain[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=gain[1:])
+    loss = np.negative(gain, out=out)
+    np.maximum(gain, 0, out=gain)
+    np.maximum(loss, 0, out=loss)
+    smooth = sma if method == 'sma' else wilder
+    smooth(gain, period, gain)
+    smooth(loss, period, loss)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.divide(gain, loss, out=out)
+    rs += 1
+    np.divide(100, rs, out=out)
+    return np.subtract(100, out, out=out)
+
+
+def true_range(high, low, close, out=None):
+    """
+    True range: the greatest of high - low and
+    distances of high and low from the previous
+    close, nan for the first bar
+
+    Parameters
+    ----------
+    high, low, close : array_like
+        1-D arrays of prices
+    out : numpy.ndarray or None
+        Preallocated output
+
+    Returns
+    -------
+    numpy.ndarray
+        True range
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    out = _output(out, close.shape)
+    np.subtract(high, low, out=out)
+    out[:1] = np.nan
+    distance = np.empty(max(len(close) - 1, 0))
+    for prices in [high, low]:
+        np.subtract(prices[1:], close[:-1], out=distance)
+        np.abs(distance, out=distance)
+        np.maximum(out[1:], distance, out=out[1:])
+    return out
+
+
+def atr(high, low, close, period=14, out=None):
+    """
+    Average True Range: Wilder's
+    smoothing of the true range
+
+    Parameters
+    ----------
+    high, low, close : array_like
+        1-D arrays of prices
+    period : int
+        Number of periods
+    out : numpy.ndarray or None
+        Preallocated output
+
+    Returns
+    -------
+    numpy.ndarray
+        ATR, nan for the first period values
+    """
+    return wilder(true_range(high, low, close, out), period, out)
+
+
+def adx(high, low, close, period=14, out=None):
+    """
+    Directional Movement Index: positive and
+    negative directional indicators (+DI, -DI)
+    and Average Directional Index (ADX), all
+    with Wilder's smoothing
+
+    Parameters
+    ----------
+    high, low, close : array_like
+        1-D arrays of prices
+    period : int
+        Number of periods
+    out : numpy.ndarray or None
+        Preallocated output of shape (3, n)
+
+    Returns
+    -------
+    numpy.ndarray
+        +DI, -DI and ADX rows, DI are nan for
+        the first period values and ADX for
+        the first 2 * period - 1 values
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    out = _output(out, (3,) + high.shape)
+    plus, minus, index = out
+    range_ = atr(high, low, close, period)
+    plus[:1] = minus[:1] = np.nan
+    up = np.subtract(high[1:], high[:-1], out=plus[1:])
+    down = np.subtract(low[:-1], low[1:], out=minus[1:])
+    # Only the greater positive move counts, nan stays nan
+    up_wins = (up > down) & (up > 0)
+    down_wins = (down > up) & (down > 0)
+    up *= up_wins
+    down *= down_wins
+    # Bars without any range have no direction
+    flat = range_ == 0
+    for values in [plus, minus]:
+        wilder(values, period, values)
+        with np.errstate(invalid='ignore'):
+            values /= range_
+        values[flat] = 0
+        values *= 100
+    with np.errstate(invalid='ignore'):
+        np.subtract(plus, minus, out=index)
+        np.abs(index, out=index)
+        index /= plus + minus
+    index[(plus + minus) == 0] = 0
+    index *= 100
+    wilder(index, period, index)
+    return out
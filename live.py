@@ -0,0 +1,236 @@
+from stream import Stream
+import numpy as np
+import pandas as pd
+import copy
+import time
+
+# Enough bars for exponential averages to forget their starting value
+WARMUP = 1000
+BOLLINGER = (20, 2)
+PERIODS = {
+    '1min': 60,
+    '5min': 300,
+    '15min': 900,
+    '30min': 1800,
+    '1hour': 3600,
+    '4hour': 14400,
+    'day': 86400
+}
+MAX_PERIOD = 300
+DELAY = 5
+SPREAD = 30
+GOLDEN = 0.618033988749895
+
+
+def poll_period(interval):
+    """
+    Get time between polls of live data,
+    once per bar but at least every
+    few minutes, as the last bar changes
+    until it is complete
+
+    Parameters
+    ----------
+    interval : str
+        Interval of the data
+
+    Returns
+    -------
+    float
+        Period in seconds
+    """
+    if interval not in PERIODS:
+        raise ValueError('Invalid interval')
+    return min(PERIODS[interval], MAX_PERIOD)
+
+
+class LiveFeed:
+    """
+    Keeps an analysis current with polled bars.
+    New bars are appended and the last one,
+    which changes until it is complete, is
+    replaced. Indicators are updated with
+    a Stream instead of recomputing the history:
+    the state of the stream before the last bar
+    is kept, so revisions of the last bar are
+    processed in constant time.
+
+    Parameters
+    ----------
+    analysis : Analysis
+        Analysis with historical data
+    """
+
+    def __init__(self, analysis):
+        self.analysis = analysis
+        data = analysis.data
+        # Stream and closes before the last bar, which may still change
+        self.base = Stream.from_data(data.iloc[-WARMUP - 1:-1])
+        self.closes = data['close'].to_numpy(dtype=float)[:-1]
+        self.closes = self.closes[-BOLLINGER[0]:]
+        self.stream = copy.deepcopy(self.base)
+        self.stream.update(data.iloc[-1])
+
+    @property
+    def since(self):
+        """
+        Date of the last bar,
+        the first one to poll
+        """
+        return self.analysis.data['date'].iloc[-1]
+
+    def apply(self, bars):
+        """
+        Merge polled bars into the analysis
+
+        Parameters
+        ----------
+        bars : pandas.DataFrame
+            Bars from the date of the last bar
+
+        Returns
+        -------
+        tuple or None
+            Changed bars (the last bar if it was
+            revised and new ones) and indicators
+            at them keyed like Analysis methods,
+            None if nothing changed
+        """
+        data = self.analysis.data
+        bars = bars[bars['date'] >= self.since].sort_values('date')
+        columns = list(data.columns.intersection(bars.columns))
+        bars = bars[columns]
+        last = data[columns].iloc[-1]
+        if bars.empty or len(bars) == 1 \
+                and bars.iloc[0].astype(str).equals(last.astype(str)):
+            return None
+        if bars['date'].iloc[0] == last['date']:
+            data = data.iloc[:-1]
+        else:
+            # The last bar is complete, continue after it
+            self.base = self.stream
+            self.closes = np.append(self.closes, last['close'])
+            self.closes = self.closes[-BOLLINGER[0]:]
+
+        rows = []
+        stream, closes = self.base, self.closes
+        for i, (_, bar) in enumerate(bars.iterrows()):
+            stream = copy.deepcopy(stream)
+            values = stream.update(bar)
+            closes = np.append(closes, values['close'])[-BOLLINGER[0]:]
+            rows.append(self._values(values, closes))
+            if i < len(bars) - 1:
+                # Only the last polled bar may change again
+                self.base, self.closes = stream, closes
+        self.stream = stream
+
+        data = pd.concat([data, bars])
+        data.index = np.arange(len(data) - 1, -1, -1)
+        self.analysis.data = data
+        self.analysis.signal = stream.get_signal()
+        indicators = pd.DataFrame(rows, index=bars.index)
+        return bars, {
+            'sma': indicators['sma'],
+            'ema': indicators['ema'],
+            'bollinger': indicators[['upper', 'middle', 'lower']],
+            'rsi': indicators['rsi'],
+            'macd': indicators[['MACD', 'Signal', 'Histogram']],
+            'stochastic': indicators[['%K', '%D']],
+            'williams': indicators['williams']
+        }
+
+    @staticmethod
+    def _values(values, closes):
+        """
+        Add Bollinger Bands of the last
+        closes to values of a stream
+        """
+        period, std = BOLLINGER
+        values = dict(values)
+        if len(closes) < period:
+            middle = deviation = np.nan
+        else:
+            middle = closes.mean()
+            deviation = closes.std(ddof=1)
+        values['upper'] = middle + std * deviation
+        values['middle'] = middle
+        values['lower'] = middle - std * deviation
+        return values
+
+
+class Scheduler:
+    """
+    Times of polling live data of many keys
+    (e.g. symbol and interval). Polls follow
+    the end of every bar with a short delay and
+    keys are spread over a few seconds, so the
+    requests do not come in bursts.
+
+    Parameters
+    ----------
+    clock : callable
+        Function returning the current time
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.periods = {}
+        self.offsets = {}
+        self.times = {}
+        self.added = 0
+
+    def __contains__(self, key):
+        return key in self.periods
+
+    def __len__(self):
+        return len(self.periods)
+
+    def add(self, key, period):
+        """
+        Start polling a key
+
+        Parameters
+        ----------
+        key : hashable
+            Key to poll
+        period : float
+            Time between polls in seconds
+        """
+        self.periods[key] = period
+        self.offsets[key] = DELAY + (self.added * GOLDEN % 1) \
+            * min(SPREAD, period / 2)
+        self.added += 1
+        self.times[key] = self._next(key, self.clock())
+
+    def remove(self, key):
+        """
+        Stop polling a key
+        """
+        for values in [self.periods, self.offsets, self.times]:
+            values.pop(key, None)
+
+    def due(self):
+        """
+        Get keys to poll now and schedule
+        their next polls
+
+        Returns
+        -------
+        list
+            Keys to poll
+        """
+        now = self.clock()
+        keys = [key for key, when in self.times.items() if when <= now]
+        for key in keys:
+            self.times[key] = self._next(key, now)
+        return keys
+
+    def _next(self, key, now):
+        """
+        Get time of the next poll of a key:
+        the end of the current period
+        (aligned to the clock) plus offset
+        """
+        period = self.periods[key]
+        return (now - self.offsets[key]) // period * period + period \
+            + self.offsets[key]
@@ -1,3 +1,10 @@
+import sys
+
+# Command line arguments run the headless screener instead of the GUI
+if len(sys.argv) > 1:
+    from screener import main
+    sys.exit(main())
+
 from ui import main
 
 main()
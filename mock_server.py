@@ -0,0 +1,433 @@
+"""
+Local stand-in for the Financial Modeling Prep endpoints used by API.
+
+The server answers with recorded responses from a directory or with
+synthetic, deterministic data, optionally delayed, failing or throttled
+with 429 Too Many Requests. It allows testing the client at scale
+without network access and without using up the quota of the API key:
+
+    python mock_server.py --port 8000 --latency 0.05 --rate-limit 300
+    API_URL=http://127.0.0.1:8000/ python main.py --category stocks
+
+Recorded responses are JSON files named after the endpoint path,
+e.g. data/v3/historical-price-full/AAPL.json. With an upstream URL
+missing files are downloaded once and saved, so later runs replay them.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, quote
+from urllib.request import urlopen
+from urllib.error import HTTPError
+from ratelimit import RateLimiter
+from functools import lru_cache
+from threading import Lock, Thread
+import numpy as np
+import pandas as pd
+import argparse
+import random
+import gzip
+import json
+import math
+import time
+import zlib
+import csv
+import sys
+import os
+
+BARS = 1000
+SYMBOLS_DIR = 'symbols'
+STEPS = {
+    '1min': pd.Timedelta(minutes=1),
+    '5min': pd.Timedelta(minutes=5),
+    '15min': pd.Timedelta(minutes=15),
+    '30min': pd.Timedelta(minutes=30),
+    '1hour': pd.Timedelta(hours=1),
+    '4hour': pd.Timedelta(hours=4),
+    'day': pd.Timedelta(days=1)
+}
+LISTS = {
+    'v3/stock/list': 'stocks',
+    'v3/symbol/available-cryptocurrencies': 'crypto',
+    'v3/symbol/available-forex-currency-pairs': 'forex'
+}
+STATS = ['requests', 'errors', 'throttled', 'bytes']
+
+
+def make_bars(symbol, interval, bars=BARS, end=None, seed=0):
+    """
+    Create random but deterministic bars
+    of a given symbol and interval
+
+    Parameters
+    ----------
+    symbol : str
+        Symbol of the data
+    interval : str
+        Interval of the data
+    bars : int
+        Number of bars
+    end : str or None
+        Date of the newest bar, today if None
+    seed : int
+        Seed added to the hash of the symbol
+
+    Returns
+    -------
+    pandas.DataFrame
+        Bars with 'date' strings, newest first
+        like the responses of the API
+    """
+    step = STEPS[interval]
+    end = pd.Timestamp(end or 'today')
+    if interval == 'day':
+        dates = pd.bdate_range(end=end.normalize(), periods=bars)
+        dates = dates.strftime('%Y-%m-%d')
+    else:
+        dates = pd.date_range(end=end.floor(step), periods=bars, freq=step)
+        dates = dates.strftime('%Y-%m-%d %H:%M:%S')
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()) + seed)
+    close = 100 * np.exp(rng.normal(0, 0.01, bars).cumsum())
+    open_ = np.r_[close[0], close[:-1]]
+    spread = close * rng.uniform(0, 0.01, bars)
+    data = pd.DataFrame({
+        'date': dates,
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.integers(1000, 1000000, bars)
+    }).round(4)
+    return data.iloc[::-1]
+
+
+def filter_dates(payload, start=None, stop=None):
+    """
+    Keep bars between the 'from' and 'to'
+    query parameters, both inclusive
+    """
+    if not start and not stop:
+        return payload
+    if isinstance(payload, dict):
+        if 'historical' not in payload:
+            return payload
+        return dict(payload, historical=filter_dates(
+            payload['historical'], start, stop))
+    # Dates of intraday bars are compared by the day of 'to' only
+    return [row for row in payload
+            if (not start or row.get('date', '') >= start)
+            and (not stop or row.get('date', '')[:len(stop)] <= stop)]
+
+
+class MockServer:
+    """
+    Threaded HTTP server mimicking the API.
+    Set the base URL of API to its url to
+    send all requests to it.
+
+    Parameters
+    ----------
+    host : str
+        Address to listen on
+    port : int
+        Port to listen on, 0 picks a free one
+    latency : float
+        Delay of every response in seconds
+    jitter : float
+        Maximum random delay added to latency
+    error_rate : float
+        Fraction of requests answered with
+        status 500, 502 or 503
+    rate_limit : int or None
+        Requests allowed per minute, more
+        are answered with status 429
+    api_key : str or None
+        Accepted API key, any if None
+    data : str or None
+        Directory with recorded responses
+    upstream : str or None
+        Base URL of the real API, used to
+        record responses missing in data
+    bars : int
+        Number of synthetic bars per response
+    end : str or None
+        Date of the newest synthetic bar
+    seed : int
+        Seed of synthetic data and failures
+    verbose : bool
+        Log every request to stderr
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, rate_limit=None, api_key=None, data=None,
+                 upstream=None, bars=BARS, end=None, seed=0,
+                 verbose=False):
+        if not 0 <= error_rate <= 1:
+            raise ValueError('Invalid error rate')
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.api_key = api_key
+        self.data = data
+        self.upstream = upstream
+        self.bars = bars
+        self.end = end
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.lock = Lock()
+        self._stats = dict.fromkeys(STATS, 0)
+        # Responses are built once, so the server is not the bottleneck
+        self.payload = lru_cache(maxsize=256)(self._payload)
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self.httpd.verbose = verbose
+        self.thread = None
+
+    @property
+    def url(self):
+        """
+        Base URL of the server
+        """
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    @property
+    def stats(self):
+        """
+        Counters of requests received, errors
+        and 429 responses sent and bytes sent
+        """
+        with self.lock:
+            return dict(self._stats)
+
+    def _count(self, name, value=1):
+        """
+        Increase a statistics counter
+        """
+        with self.lock:
+            self._stats[name] += value
+
+    def start(self):
+        """
+        Serve requests in a background thread
+        """
+        self.thread = Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the socket
+        """
+        if self.thread:
+            self.httpd.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def respond(self, path, query):
+        """
+        Get response to a request
+
+        Parameters
+        ----------
+        path : str
+            Endpoint path without the leading
+            slash, e.g. 'v3/stock/list'
+        query : dict
+            Query parameters
+
+        Returns
+        -------
+        tuple
+            Status code, headers and body
+        """
+        self._count('requests')
+        with self.lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if self.api_key and query.get('apikey') != self.api_key:
+            return 401, {}, json.dumps({
+                'Error Message': 'Invalid API KEY. Please retry or visit '
+                                 'our documentation to create one FREE '
+                                 'https://financialmodelingprep.com/'
+                                 'developer/docs'}).encode()
+        if self.limiter:
+            wait = self.limiter.try_acquire()
+            if wait:
+                self._count('throttled')
+                headers = {'Retry-After': str(math.ceil(wait))}
+                return 429, headers, b'{"Error Message": "Limit Reach"}'
+        if failed:
+            self._count('errors')
+            with self.lock:
+                status = self.random.choice([500, 502, 503])
+            return status, {}, b'{"Error Message": "Server error"}'
+        body = self.payload(path, query.get('apikey'),
+                            query.get('from'), query.get('to'))
+        if body is None:
+            return 404, {}, b'{}'
+        return 200, {}, body
+
+    def _payload(self, path, api_key=None, start=None, stop=None):
+        """
+        Get JSON body of an endpoint from
+        recorded or synthetic responses
+        """
+        payload = self.recorded(path, api_key)
+        if payload is None:
+            payload = self.synthetic(path)
+        if payload is None:
+            return None
+        return json.dumps(filter_dates(payload, start, stop)).encode()
+
+    def recorded(self, path, api_key=None):
+        """
+        Load recorded response of an endpoint,
+        downloading it from upstream if missing
+        """
+        if not self.data:
+            return None
+        file = os.path.join(self.data, *path.split('/')) + '.json'
+        if not os.path.exists(file):
+            if not self.upstream:
+                return None
+            url = f'{self.upstream}{quote(path)}?apikey={api_key}'
+            try:
+                with urlopen(url, timeout=30) as response:
+                    content = response.read()
+            except HTTPError:
+                return None
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            with open(file, 'wb') as f:
+                f.write(content)
+        with open(file, 'rb') as f:
+            return json.load(f)
+
+    def synthetic(self, path):
+        """
+        Create synthetic response of an endpoint
+        """
+        parts = path.split('/')
+        if path in LISTS:
+            return self.symbols(LISTS[path])
+        if parts[:2] == ['v3', 'historical-price-full'] and len(parts) == 3:
+            data = make_bars(parts[2], 'day', self.bars, self.end, self.seed)
+            data['adjClose'] = data['close']
+            data['label'] = pd.to_datetime(data['date']) \
+                .dt.strftime('%B %d, %y')
+            return {'symbol': parts[2], 'historical': data.to_dict('records')}
+        if parts[:2] == ['v3', 'historical-chart'] and len(parts) == 4 \
+                and parts[2] in STEPS:
+            return make_bars(parts[3], parts[2], self.bars, self.end,
+                             self.seed).to_dict('records')
+        if parts[:2] == ['v3', 'historical-market-capitalization'] \
+                and len(parts) == 3:
+            data = make_bars(parts[2], 'day', self.bars, self.end, self.seed)
+            return [{'symbol': parts[2], 'date': date,
+                     'marketCap': int(close * 1e7)}
+                    for date, close in zip(data['date'], data['close'])]
+        return None
+
+    @staticmethod
+    def symbols(category):
+        """
+        List symbols of a category from
+        the symbols directory
+        """
+        path = os.path.join(SYMBOLS_DIR, f'{category}.csv')
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as f:
+            return [{'symbol': row[0], 'name': row[-1]}
+                    for row in csv.reader(f) if row]
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Request handler passing GET
+    requests to MockServer.respond
+    """
+    # Keep-alive connections like the real API
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {name: values[-1]
+                 for name, values in parse_qs(url.query).items()}
+        mock = self.server.mock
+        status, headers, body = mock.respond(url.path.strip('/'), query)
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, 1)
+            headers['Content-Encoding'] = 'gzip'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        mock._count('bytes', len(body))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description='Serve mock Financial Modeling Prep API locally',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('-p', '--port', type=int, default=8000)
+    parser.add_argument('-l', '--latency', type=float, default=0.0,
+                        help='delay of every response in seconds')
+    parser.add_argument('-j', '--jitter', type=float, default=0.0,
+                        help='maximum random delay added to latency')
+    parser.add_argument('-e', '--error-rate', type=float, default=0.0,
+                        help='fraction of requests failing with 5xx')
+    parser.add_argument('-r', '--rate-limit', type=int,
+                        help='requests per minute before responding 429')
+    parser.add_argument('-k', '--api-key', help='accepted API key '
+                                                '(default: any)')
+    parser.add_argument('-d', '--data',
+                        help='directory with recorded responses')
+    parser.add_argument('-u', '--upstream',
+                        help='real API URL to record missing responses from')
+    parser.add_argument('-b', '--bars', type=int, default=BARS,
+                        help='number of synthetic bars per response')
+    parser.add_argument('--end', help='date of the newest synthetic bar')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='log every request')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = MockServer(**vars(args))
+    print(f'Serving at {server.url}, set API_URL to use it', file=sys.stderr)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(server.stats, file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
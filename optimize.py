@@ -0,0 +1,228 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from backtest import Backtest, PERIODS_PER_YEAR
+from analysis import Analysis
+from store import BarStore
+import itertools
+import random
+import numpy as np
+import pandas as pd
+import os
+
+COLUMNS = ['close', 'high', 'low']
+SPACE = {
+    'sma': [5, 10, 20, 50],
+    'ema': [5, 10, 20, 50],
+    'rsi': [7, 14, 21],
+    'macd': [(9, 12, 26), (9, 8, 17), (5, 5, 35)],
+    'stochastic': [(14, 3, 3), (5, 3, 3), (21, 5, 5)]
+}
+
+# State of a worker process, set by _init_worker
+_worker = {}
+
+
+def grid(space=SPACE):
+    """
+    Get every combination of parameters
+
+    Parameters
+    ----------
+    space : dict
+        Candidate values keyed by parameter
+
+    Returns
+    -------
+    list of dict
+        Parameters of Analysis.get_scores
+    """
+    names = list(space)
+    return [dict(zip(names, values))
+            for values in itertools.product(*space.values())]
+
+
+def sample(space=SPACE, count=100, seed=None):
+    """
+    Get random combinations of parameters
+    without repetition
+
+    Parameters
+    ----------
+    space : dict
+        Candidate values keyed by parameter
+    count : int
+        Number of combinations
+    seed : int or None
+        Seed of the random generator
+
+    Returns
+    -------
+    list of dict
+        Parameters of Analysis.get_scores
+    """
+    combinations = grid(space)
+    count = min(count, len(combinations))
+    return random.Random(seed).sample(combinations, count)
+
+
+def _init_worker(name, shape, index, kwargs):
+    """
+    Attach price arrays from shared memory
+    and create Analysis reused by all tasks
+    of the worker, so indicators with the
+    same period are computed only once
+    """
+    memory = shared_memory.SharedMemory(name=name)
+    prices = np.ndarray(shape, dtype=float, buffer=memory.buf)
+    _load(prices, index, kwargs)
+    _worker['memory'] = memory
+
+
+def _open_store(directory, symbol, interval, kwargs):
+    """
+    Open bars from the store as memory maps,
+    so all workers share them in the page cache
+    """
+    _set_data(BarStore(directory).load(symbol, interval), kwargs)
+
+
+def _load(prices, index, kwargs):
+    """
+    Create Analysis over price arrays
+    """
+    _set_data(pd.DataFrame(prices, index=index, columns=COLUMNS,
+                           copy=False), kwargs)
+
+
+def _set_data(data, kwargs):
+    """
+    Create Analysis over historical data
+    """
+    analysis = object.__new__(Analysis)
+    analysis.data = data
+    _worker['analysis'] = analysis
+    _worker['kwargs'] = kwargs
+
+
+def _evaluate(params):
+    """
+    Backtest signals for given parameters
+    """
+    analysis = _worker['analysis']
+    signals = analysis.get_signals(**params)
+    backtest = Backtest(analysis.data['close'], signals, **_worker['kwargs'])
+    return {**params, **backtest.summary()}
+
+
+def optimize(data, params=None, metric='sharpe', workers=None,
+             interval='day', **kwargs):
+    """
+    Search for indicator periods giving the best
+    backtest of the trading signals. Parameter sets
+    are evaluated on a process pool. Prices are
+    placed once in shared memory and every worker
+    reads them without copying.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Historical data with 'close',
+        'high' and 'low' columns
+    params : list of dict or None
+        Parameter sets from grid or sample,
+        defaults to the full grid
+    metric : str
+        Column of Backtest.summary to sort by
+    workers : int or None
+        Number of processes, defaults to the
+        number of CPUs. With 1 the search runs
+        in the current process.
+    interval : str
+        Interval of the data
+    **kwargs
+        Arguments of Backtest
+
+    Returns
+    -------
+    pandas.DataFrame
+        Parameters with backtest summary,
+        best first
+    """
+    kwargs.setdefault('periods_per_year', PERIODS_PER_YEAR[interval])
+    workers = workers or os.cpu_count()
+    prices = data[COLUMNS].to_numpy(dtype=float)
+    if workers == 1:
+        return _search(params, metric, workers, _load,
+                       (prices, data.index, kwargs))
+    memory = shared_memory.SharedMemory(create=True, size=prices.nbytes)
+    try:
+        shared = np.ndarray(prices.shape, dtype=float, buffer=memory.buf)
+        shared[:] = prices
+        del shared
+        return _search(params, metric, workers, _init_worker,
+                       (memory.name, prices.shape, data.index, kwargs))
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def optimize_store(store, symbol, interval='day', params=None,
+                   metric='sharpe', workers=None, **kwargs):
+    """
+    Search for indicator periods giving the best
+    backtest of the trading signals of bars in
+    a bar store, see optimize. Every worker
+    opens the memory-mapped bars itself, so
+    they are neither copied nor sent to it.
+
+    Parameters
+    ----------
+    store : BarStore
+        Store with the bars
+    symbol : str
+        Symbol to optimize
+    interval : str
+        Interval of the data
+    params : list of dict or None
+        Parameter sets from grid or sample,
+        defaults to the full grid
+    metric : str
+        Column of Backtest.summary to sort by
+    workers : int or None
+        Number of processes, defaults to the
+        number of CPUs
+    **kwargs
+        Arguments of Backtest
+
+    Returns
+    -------
+    pandas.DataFrame
+        Parameters with backtest summary,
+        best first
+    """
+    if symbol not in store.symbols(interval):
+        raise ValueError('Symbol not found')
+    kwargs.setdefault('periods_per_year', PERIODS_PER_YEAR[interval])
+    return _search(params, metric, workers or os.cpu_count(), _open_store,
+                   (store.directory, symbol, interval, kwargs))
+
+
+def _search(params, metric, workers, initializer, initargs):
+    """
+    Evaluate parameter sets in the current
+    process or on a process pool, whose
+    workers load the data with initializer
+    """
+    if params is None:
+        params = grid()
+    if workers == 1:
+        initializer(*initargs)
+        results = list(map(_evaluate, params))
+    else:
+        with ProcessPoolExecutor(workers, initializer=initializer,
+                                 initargs=initargs) as executor:
+            chunksize = max(1, len(params) // (workers * 4))
+            results = list(executor.map(_evaluate, params,
+                                        chunksize=chunksize))
+    results = pd.DataFrame(results)
+    return results.sort_values(metric, ascending=False, ignore_index=True)
@@ -0,0 +1,428 @@
+import numpy as np
+import pandas as pd
+from analysis import cached, get_score, score_to_signal
+import kernels
+from bars import COLUMNS, normalize
+from api import API
+
+
+def drop_empty(frames, errors):
+    """
+    Move symbols without data (unknown or
+    delisted symbols are returned by the API
+    as frames without columns) to the errors.
+    Frames of the API have a 'date' column,
+    normalized frames a 'date' index.
+
+    Parameters
+    ----------
+    frames : dict
+        Dataframes with historical data
+        keyed by symbol
+    errors : dict
+        Exceptions keyed by symbol
+
+    Returns
+    -------
+    tuple of dict
+        Frames with data and exceptions
+        keyed by symbol
+    """
+    errors = dict(errors)
+    valid = {}
+    for symbol, frame in frames.items():
+        if frame.empty or 'date' not in frame \
+                and frame.index.name != 'date':
+            errors[symbol] = ValueError('No historical data')
+        else:
+            valid[symbol] = frame
+    return valid, errors
+
+
+class Panel:
+    """
+    Technical analysis of many symbols at once.
+    Prices are kept in a wide layout (date x symbol)
+    for every field, so each indicator is computed
+    for all symbols in a single vectorized pass.
+    Symbols should share a trading calendar (e.g.
+    come from the same category), because missing
+    bars break the rolling windows.
+    """
+
+    def __init__(self, symbols, interval='day', api=None):
+        self.api = api or API()
+        frames, errors = self.api.get_historical_many(symbols, interval)
+        self._load(frames, errors)
+
+    @classmethod
+    def from_frames(cls, frames, errors=None):
+        """
+        Create panel from already downloaded
+        historical data
+
+        Parameters
+        ----------
+        frames : dict
+            Dataframes with historical data
+            keyed by symbol
+        errors : dict or None
+            Exceptions keyed by symbol
+
+        Returns
+        -------
+        Panel
+            Panel with computed signals
+        """
+        panel = object.__new__(cls)
+        panel.api = None
+        panel._load(frames, errors or {})
+        return panel
+
+    def _load(self, frames, errors):
+        """
+        Combine per-symbol dataframes into
+        wide frames and compute signals
+        """
+        frames, self.errors = drop_empty(frames, errors)
+        self._cache = {}
+        self.data = self.combine(frames)
+        self.symbols = list(self.data['close'].columns)
+        self.signals = self.get_signal()
+
+    @staticmethod
+    def combine(frames):
+        """
+        Combine per-symbol dataframes into
+        a single dataframe with (field, symbol)
+        columns indexed by date. Frames are
+        converted to the schema of
+        bars.normalize first, so dates of
+        every symbol are parsed and aligned.
+
+        Parameters
+        ----------
+        frames : dict
+            Dataframes with historical data
+            (from the API or normalized)
+            keyed by symbol
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe where data['close'] is
+            a wide (date x symbol) frame
+        """
+        data = pd.concat({
+            symbol: normalize(frame) if 'date' in frame else frame[COLUMNS]
+            for symbol, frame in frames.items()
+        }, axis=1).sort_index()
+        data = data.swaplevel(axis=1).sort_index(axis=1, level=0,
+                                                 sort_remaining=False)
+        return data.astype(float)
+
+    def _wide(self, values):
+        """
+        Wrap a (date x symbol) array of an
+        indicator in a wide frame
+        """
+        close = self.data['close']
+        return pd.DataFrame(values, index=close.index, columns=close.columns)
+
+    def _last_rows(self):
+        """
+        Get position of the last available
+        bar of every symbol
+        """
+        valid = self.data['close'].notna().to_numpy()
+        return len(valid) - 1 - np.argmax(valid[::-1], axis=0)
+
+    def _last(self, frame):
+        """
+        Get the value at the last available
+        bar of every symbol
+
+        Parameters
+        ----------
+        frame : pandas.DataFrame
+            Wide (date x symbol) frame
+
+        Returns
+        -------
+        pandas.Series
+            Last values keyed by symbol
+        """
+        rows = self._last_rows()
+        values = frame.to_numpy()[rows, np.arange(len(rows))]
+        return pd.Series(values, index=frame.columns)
+
+    def latest(self) -> pd.DataFrame:
+        """
+        Get date, closing price, values of the
+        indicators, score and signal at the last
+        available bar of every symbol
+
+        Returns
+        -------
+        pandas.DataFrame
+            Table with one row per symbol
+        """
+        macd = self.macd()
+        stoch = self.stochastic()
+        score = self.get_score()
+        return pd.DataFrame({
+            'date': self.data.index[self._last_rows()],
+            'close': self._last(self.data['close']),
+            'sma': self._last(self.sma()),
+            'ema': self._last(self.ema()),
+            'rsi': self._last(self.rsi()),
+            'macd': self._last(macd['MACD']),
+            'macd_signal': self._last(macd['Signal']),
+            'stochastic_k': self._last(stoch['%K']),
+            'stochastic_d': self._last(stoch['%D']),
+            'williams': self._last(self.williams()),
+            'score': score,
+            'signal': score_to_signal(score)
+        }, index=pd.Index(self.symbols, name='symbol'))
+
+    def get_score(self) -> pd.Series:
+        """
+        Get total score of the trading rules
+        described in Analysis.get_signal
+        for every symbol
+
+        Returns
+        -------
+        pandas.Series
+            Score keyed by symbol
+        """
+        # Scores of all bars tell whether the last one is in warm-up
+        return self._last(self.get_scores())
+
+    def get_signal(self) -> pd.Series:
+        """
+        Get signal for trading for every
+        symbol, see Analysis.get_signal
+
+        Returns
+        -------
+        pandas.Series
+            Signals keyed by symbol
+        """
+        score = self.get_score()
+        return pd.Series(score_to_signal(score), index=score.index)
+
+    def get_scores(self) -> pd.DataFrame:
+        """
+        Get score of the trading rules at
+        every bar of every symbol
+
+        Returns
+        -------
+        pandas.DataFrame
+            Wide (date x symbol) frame with scores
+        """
+        close = self.data['close']
+        macd = self.macd()
+        stoch = self.stochastic()
+        score = get_score(close, self.sma(), self.ema(), self.rsi(),
+                          macd['MACD'], macd['Signal'],
+                          stoch['%K'], stoch['%D'])
+        return pd.DataFrame(score, index=close.index, columns=close.columns)
+
+    def get_signals(self) -> pd.DataFrame:
+        """
+        Get signal for trading at every
+        bar of every symbol
+
+        Returns
+        -------
+        pandas.DataFrame
+            Wide (date x symbol) frame with signals
+        """
+        scores = self.get_scores()
+        return pd.DataFrame(score_to_signal(scores), index=scores.index,
+                            columns=scores.columns)
+
+    @cached
+    def sma(self, period: int = 10) -> pd.DataFrame:
+        """
+        Simple Moving Average (SMA) of every symbol
+
+        Parameters
+        ----------
+        period : int
+            Number of periods to calculate SMA
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with SMA
+        """
+        return self._wide(kernels.sma(self.data['close'], period))
+
+    @cached
+    def ema(self, period: int = 10) -> pd.DataFrame:
+        """
+        Exponential Moving Average (EMA) of every symbol
+
+        Parameters
+        ----------
+        period : int
+            Number of periods to calculate EMA
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with EMA
+        """
+        return self._wide(kernels.ema(self.data['close'], period))
+
+    @cached
+    def bollinger(self, period: int = 20, std: int = 2) -> pd.DataFrame:
+        """
+        Bollinger Bands of every symbol
+
+        Parameters
+        ----------
+        period : int
+            Number of periods to calculate Bollinger Bands
+        std : int
+            Number of standard deviations
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with 'upper', 'middle'
+            and 'lower' wide frames
+        """
+        sma = self.sma(period)
+        std_dev = self.data['close'].rolling(period).std()
+        return pd.concat({
+            'upper': sma + (std_dev * std),
+            'middle': sma,
+            'lower': sma - (std_dev * std)
+        }, axis=1)
+
+    @cached
+    def rsi(self, period: int = 14, method: str = 'sma') -> pd.DataFrame:
+        """
+        Relative Strength Index (RSI) of every symbol
+
+        Parameters
+        ----------
+        period : int
+            Number of periods to calculate RSI
+        method : str
+            Averaging of gains and losses:
+            'sma' or 'wilder'
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with RSI
+        """
+        return self._wide(kernels.rsi(self.data['close'], period, method))
+
+    @cached
+    def macd(self, signal_period: int = 9, fast_period: int = 12,
+             slow_period: int = 26) -> pd.DataFrame:
+        """
+        Moving Average Convergence Divergence
+        (MACD) of every symbol
+
+        Parameters
+        ----------
+        signal_period : int
+            Number of periods for signal EMA
+        fast_period : int
+            Number of periods for fast EMA
+        slow_period : int
+            Number of periods for slow EMA
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with 'MACD', 'Signal'
+            and 'Histogram' wide frames
+        """
+        values = kernels.macd(self.data['close'], signal_period,
+                              fast_period, slow_period)
+        return pd.concat({
+            name: self._wide(row)
+            for name, row in zip(['MACD', 'Signal', 'Histogram'], values)
+        }, axis=1)
+
+    @cached
+    def stochastic(self, period_k: int = 14, period_d: int = 3,
+                   period_s: int = 3) -> pd.DataFrame:
+        """
+        Stochastic Oscillator of every symbol
+
+        Parameters
+        ----------
+        period_k : int
+            Number of periods to calculate %K
+        period_d : int
+            Number of periods to calculate %D
+        period_s : int
+            Number of periods to calculate SMA
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with '%K' and '%D' wide frames
+        """
+        channel = self.donchian(period_k)
+        high, low = channel['upper'], channel['lower']
+        k = 100 * (self.data['close'] - low) / (high - low)
+        d = k.rolling(period_d).mean()
+        return pd.concat({
+            '%K': k,
+            '%D': d.rolling(period_s).mean()
+        }, axis=1)
+
+    @cached
+    def williams(self, period: int = 14) -> pd.DataFrame:
+        """
+        Williams %R of every symbol
+
+        Parameters
+        ----------
+        period : int
+            Number of periods to calculate Williams %R
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with Williams %R
+        """
+        channel = self.donchian(period)
+        highest_high, lowest_low = channel['upper'], channel['lower']
+        return 100 * (highest_high - self.data['close']) \
+            / (highest_high - lowest_low)
+
+    @cached
+    def donchian(self, period: int = 20) -> pd.DataFrame:
+        """
+        Donchian Channels of every symbol
+
+        Parameters
+        ----------
+        period : int
+            Number of periods to calculate Donchian Channels
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe with 'upper', 'middle'
+            and 'lower' wide frames
+        """
+        upper, lower = kernels.rolling_extrema(self.data['high'],
+                                               self.data['low'], period)
+        upper, lower = self._wide(upper), self._wide(lower)
+        return pd.concat({
+            'upper': upper,
+            'middle': (upper + lower) / 2,
+            'lower': lower
+        }, axis=1)
@@ -0,0 +1,228 @@
+from collections import OrderedDict, deque
+import time
+
+BUDGET = 256 * 2 ** 20
+MAX_AGE = 300
+NEIGHBORS = (1, 2, -1)
+RECENT = 5
+PRIORITY = -1
+
+
+class AnalysisCache:
+    """
+    Least recently used analyses keyed by
+    symbol and interval, evicted when their
+    total memory exceeds a budget or when
+    they get older than a given age
+
+    Parameters
+    ----------
+    budget : int
+        Maximum memory of stored analyses in bytes
+    max_age : float or None
+        Seconds after which an analysis
+        is outdated, never if None
+    """
+
+    def __init__(self, budget=BUDGET, max_age=MAX_AGE):
+        self.budget = budget
+        self.max_age = max_age
+        self.items = OrderedDict()
+        self.size = 0
+
+    def __contains__(self, key):
+        return self.get(key, touch=False) is not None
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, touch=True):
+        """
+        Get analysis of a given key
+
+        Parameters
+        ----------
+        key : tuple
+            Symbol and interval
+        touch : bool
+            Mark the analysis as recently used
+
+        Returns
+        -------
+        Analysis or None
+            Stored analysis or None if
+            missing or outdated
+        """
+        item = self.items.get(key)
+        if item is None:
+            return None
+        analysis, size, created = item
+        if self.max_age is not None \
+                and time.monotonic() - created > self.max_age:
+            self.pop(key)
+            return None
+        if touch:
+            self.items.move_to_end(key)
+        return analysis
+
+    def put(self, key, analysis):
+        """
+        Store analysis and evict the least
+        recently used ones above the budget.
+        The newest analysis is always kept.
+
+        Parameters
+        ----------
+        key : tuple
+            Symbol and interval
+        analysis : Analysis
+            Analysis to store
+        """
+        self.pop(key)
+        size = analysis.memory_usage()
+        self.items[key] = (analysis, size, time.monotonic())
+        self.size += size
+        while self.size > self.budget and len(self.items) > 1:
+            self.pop(next(iter(self.items)))
+
+    def pop(self, key):
+        """
+        Remove analysis of a given key
+        """
+        item = self.items.pop(key, None)
+        if item is not None:
+            self.size -= item[1]
+
+    def clear(self):
+        """
+        Remove all analyses
+        """
+        self.items.clear()
+        self.size = 0
+
+
+class Prefetcher:
+    """
+    Speculative loading of analyses that will
+    probably be viewed next: the symbols after
+    and before the current one in its list and
+    recently viewed symbols in the current
+    interval. Jobs run in the worker pool with
+    low priority, so requests of the user
+    leave the queue first.
+
+    Parameters
+    ----------
+    workers : WorkerPool
+        Pool running the jobs
+    cache : AnalysisCache
+        Cache filled with the results
+    load : callable
+        Function loading the analysis
+        of a symbol and interval
+    neighbors : tuple of int
+        Offsets of prefetched symbols
+        from the current one
+    recent : int
+        Number of recently viewed symbols
+    """
+
+    def __init__(self, workers, cache, load, neighbors=NEIGHBORS,
+                 recent=RECENT):
+        self.workers = workers
+        self.cache = cache
+        self.load = load
+        self.neighbors = neighbors
+        self.recent = deque(maxlen=recent)
+        self.keys = set()
+        workers.finished.connect(self._store)
+        workers.failed.connect(self._forget)
+
+    @staticmethod
+    def job(key):
+        """
+        Get key of the prefetch job
+        of a symbol and interval
+        """
+        return 'prefetch', *key
+
+    def is_pending(self, key):
+        """
+        Check whether the analysis of a symbol
+        and interval is being prefetched
+        """
+        return self.workers.is_pending(self.job(key))
+
+    def take(self, key):
+        """
+        Take over the prefetch of an analysis
+        requested by the user. A queued job is
+        dropped, so the request can run with
+        normal priority.
+
+        Parameters
+        ----------
+        key : tuple
+            Symbol and interval
+
+        Returns
+        -------
+        bool
+            True if the job is already running
+            and its result will be delivered
+        """
+        job = self.job(key)
+        self.workers.cancel(job, running=False)
+        if self.workers.is_pending(job):
+            return True
+        self.keys.discard(key)
+        return False
+
+    def viewed(self, symbols, index, interval):
+        """
+        Prefetch analyses around a viewed symbol.
+        Queued jobs no longer needed are dropped,
+        running ones are left to finish.
+
+        Parameters
+        ----------
+        symbols : list of str
+            Symbols of the current list
+        index : int
+            Index of the viewed symbol
+        interval : str
+            Interval of the data
+        """
+        symbol = symbols[index]
+        if symbol in self.recent:
+            self.recent.remove(symbol)
+        self.recent.appendleft(symbol)
+        wanted = [symbols[index + offset] for offset in self.neighbors
+                  if 0 <= index + offset < len(symbols)]
+        wanted += list(self.recent)
+        keys = [(s, interval) for s in dict.fromkeys(wanted) if s != symbol]
+        for key in self.keys - set(keys) - {(symbol, interval)}:
+            self.workers.cancel(self.job(key), running=False)
+        self.keys = {key for key in self.keys if self.is_pending(key)}
+        for key in keys:
+            if key in self.cache or self.is_pending(key):
+                continue
+            self.workers.submit(self.job(key), self.load, *key,
+                                priority=PRIORITY)
+            self.keys.add(key)
+
+    def _store(self, job, analysis):
+        """
+        Store the result of a prefetch job
+        """
+        if isinstance(job, tuple) and job[0] == 'prefetch':
+            self.keys.discard(job[1:])
+            self.cache.put(job[1:], analysis)
+
+    def _forget(self, job, error):
+        """
+        Ignore the error of a prefetch job,
+        the user request will report it
+        """
+        if isinstance(job, tuple) and job[0] == 'prefetch':
+            self.keys.discard(job[1:])
@@ -0,0 +1,77 @@
+from threading import Lock
+import time
+
+
+class RateLimiter:
+
+    def __init__(self, rate, period=60):
+        if rate <= 0 or period <= 0:
+            raise ValueError('Invalid rate')
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self.lock = Lock()
+
+    def _refill(self):
+        """
+        Add tokens accumulated since
+        the last update (lock must be held)
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens
+                          + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Take one token from the bucket, waiting
+        until it is available. Tokens are reserved
+        under the lock, so waiting threads are
+        served in the order they arrived.
+
+        Returns
+        -------
+        float
+            Time spent waiting in seconds
+        """
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            wait = -self.tokens / self.fill_rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self):
+        """
+        Take one token from the bucket
+        only if it is available now
+
+        Returns
+        -------
+        float
+            0 if the token was taken, otherwise
+            time until the next one in seconds
+        """
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.fill_rate
+
+    def pause(self, seconds):
+        """
+        Hold back all callers for a given
+        time, e.g. after the server responded
+        with 429 Too Many Requests
+
+        Parameters
+        ----------
+        seconds : float
+            Time to wait before the next request
+        """
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.fill_rate)
@@ -0,0 +1,123 @@
+from bars import DATE_FORMAT
+import numpy as np
+import pandas as pd
+
+STEPS = {
+    '1min': pd.Timedelta(minutes=1),
+    '5min': pd.Timedelta(minutes=5),
+    '15min': pd.Timedelta(minutes=15),
+    '30min': pd.Timedelta(minutes=30),
+    '1hour': pd.Timedelta(hours=1),
+    '4hour': pd.Timedelta(hours=4)
+}
+AGGREGATIONS = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum'
+}
+
+
+def session_offset(dates):
+    """
+    Get the most common time of the first
+    bar of a day, i.e. the session open
+    (00:00 for markets trading all day)
+
+    Parameters
+    ----------
+    dates : pandas.Series
+        Dates of the bars
+
+    Returns
+    -------
+    pandas.Timedelta
+        Time of the session open
+    """
+    days = dates.dt.normalize()
+    first = dates.groupby(days).min() - days.groupby(days).min()
+    return first.mode().iloc[0]
+
+
+def resample(data, interval, offset=None):
+    """
+    Build coarser bars from 1-minute bars.
+    Bars are aligned to the session open, e.g.
+    hourly stock bars start at 9:30, 10:30, ...
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        1-minute bars with 'date', 'open', 'high',
+        'low', 'close' and 'volume' columns
+    interval : str
+        Target interval from 1min to 4hour
+    offset : pandas.Timedelta or None
+        Time of the session open, detected
+        from the data if None
+
+    Returns
+    -------
+    pandas.DataFrame
+        Bars in the format of API.get_historical
+    """
+    if interval not in STEPS:
+        raise ValueError('Invalid interval')
+    if data.empty:
+        return data
+    dates = pd.to_datetime(data['date'])
+    if offset is None:
+        offset = session_offset(dates)
+    step = STEPS[interval]
+    days = dates.dt.normalize() + offset
+    starts = days + (dates - days) // step * step
+    bars = data[list(AGGREGATIONS)].groupby(starts.to_numpy(), sort=True) \
+        .agg(AGGREGATIONS)
+    bars.insert(0, 'date', bars.index.strftime(DATE_FORMAT))
+    return _order(bars)
+
+
+def update(bars, data, interval):
+    """
+    Merge new 1-minute bars into resampled bars.
+    Only bars from the start of the last resampled
+    bar are recomputed, so data has to contain
+    every 1-minute bar since that time.
+
+    Parameters
+    ----------
+    bars : pandas.DataFrame
+        Bars returned by resample
+    data : pandas.DataFrame
+        New 1-minute bars
+    interval : str
+        Interval of bars
+
+    Returns
+    -------
+    pandas.DataFrame
+        Updated bars
+    """
+    if bars.empty:
+        return resample(data, interval)
+    last = bars['date'].iloc[-1]
+    data = data[data['date'] >= last]
+    if data.empty:
+        return bars
+    offset = session_offset(pd.to_datetime(bars['date']))
+    new = resample(data, interval, offset)
+    bars = pd.concat([bars[bars['date'] < new['date'].iloc[0]], new])
+    return _order(bars)
+
+
+def _order(bars):
+    """
+    Index bars like API responses: oldest first
+    with index 0 at the newest bar. An integer
+    index is used, because arithmetic on
+    a reversed RangeIndex (used by the GUI
+    plots) is broken in pandas 1.5.
+    """
+    bars.index = np.arange(len(bars) - 1, -1, -1)
+    return bars
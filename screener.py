@@ -0,0 +1,171 @@
+from api import API, INTERVALS, POOL_SIZE
+from cache import Cache
+from panel import Panel, drop_empty
+from store import BarStore
+import pandas as pd
+import argparse
+import sys
+import csv
+import os
+
+CATEGORIES = ['stocks', 'forex', 'crypto', 'commodities']
+FORMATS = ['csv', 'json', 'parquet']
+
+
+def read_symbols(path):
+    """
+    Read symbols and names from CSV file
+
+    Parameters
+    ----------
+    path : str
+        Path to CSV file with symbol
+        and name in every row
+
+    Returns
+    -------
+    dict
+        Names keyed by symbol
+    """
+    with open(path, 'r') as f:
+        return {row[0]: row[1] if len(row) > 1 else row[0]
+                for row in csv.reader(f) if row}
+
+
+def screen(lists, interval='day', api=None, store=None):
+    """
+    Compute indicators and signals of every
+    symbol and rank them by score
+
+    Parameters
+    ----------
+    lists : dict
+        Names keyed by symbol for every list.
+        Symbols of a list are analyzed together,
+        so they should share a trading calendar.
+    interval : str
+        Interval of the data
+    api : API or None
+        API used to get the data
+    store : BarStore or None
+        Store to open the bars from as memory
+        maps, symbols missing from it are
+        downloaded with the API and saved
+
+    Returns
+    -------
+    tuple
+        Ranked table and exceptions keyed by symbol
+    """
+    api = api or API()
+    tables, errors = [], {}
+    for name, symbols in lists.items():
+        if store is None:
+            frames, failed = api.get_historical_many(list(symbols), interval)
+        else:
+            frames, failed = store.load_many(list(symbols), interval, api)
+        frames, failed = drop_empty(frames, failed)
+        errors.update(failed)
+        if not frames:
+            continue
+        table = Panel.from_frames(frames).latest()
+        table.insert(0, 'name', [symbols[s] for s in table.index])
+        table.insert(1, 'list', name)
+        tables.append(table)
+    if not tables:
+        return pd.DataFrame(), errors
+    table = pd.concat(tables).sort_values(['score', 'rsi'],
+                                          ascending=[False, True])
+    table.insert(0, 'rank', range(1, len(table) + 1))
+    return table, errors
+
+
+def write(table, path, output_format=None):
+    """
+    Write table to CSV, JSON or Parquet file
+
+    Parameters
+    ----------
+    table : pandas.DataFrame
+        Table to write
+    path : str
+        Path to the output file
+    output_format : str or None
+        Format of the file, guessed from
+        the extension if None
+    """
+    if output_format is None:
+        output_format = os.path.splitext(path)[1][1:].lower() or 'csv'
+    if output_format not in FORMATS:
+        raise ValueError('Invalid output format')
+    if output_format == 'csv':
+        table.to_csv(path)
+    elif output_format == 'json':
+        table.reset_index().to_json(path, orient='records', indent=2,
+                                    date_format='iso')
+    else:
+        table.to_parquet(path)
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description='Rank trading signals of many symbols without the GUI')
+    parser.add_argument('-c', '--category', nargs='+', choices=CATEGORIES,
+                        help='categories from the symbols directory '
+                             '(default: all)')
+    parser.add_argument('-f', '--file', nargs='+', default=[],
+                        help='CSV files with custom lists of symbols')
+    parser.add_argument('-s', '--symbols', nargs='+', default=[],
+                        help='symbols to analyze')
+    parser.add_argument('-i', '--interval', default='day', choices=INTERVALS)
+    parser.add_argument('-o', '--output', default='-',
+                        help='output file, "-" prints CSV (default)')
+    parser.add_argument('--format', choices=FORMATS,
+                        help='output format (default: file extension)')
+    parser.add_argument('-w', '--workers', type=int,
+                        help='number of concurrent requests')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='do not use the local cache of bars')
+    parser.add_argument('--max-age', type=float,
+                        help='days after which cached bars are downloaded '
+                             'again in full, e.g. to adjust splits '
+                             '(default: never)')
+    parser.add_argument('--store',
+                        help='directory of the memory-mapped bar store '
+                             'to read bars from')
+    parser.add_argument('--sync', action='store_true',
+                        help='update all symbols in the store first')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    lists = {path: read_symbols(path) for path in args.file}
+    if args.symbols:
+        lists['symbols'] = {symbol: symbol for symbol in args.symbols}
+    if args.category or not lists:
+        for category in args.category or CATEGORIES:
+            path = os.path.join('symbols', f'{category}.csv')
+            lists[category] = read_symbols(path)
+    max_age = None if args.max_age is None else args.max_age * 86400
+    cache = None if args.no_cache else Cache(max_age=max_age)
+    api = API(cache=cache, pool_size=args.workers or POOL_SIZE)
+    store = BarStore(args.store) if args.store else None
+    if store is not None and args.sync:
+        for symbols in lists.values():
+            store.sync(api, list(symbols), args.interval)
+    table, errors = screen(lists, args.interval, api, store)
+    for symbol, error in errors.items():
+        print(f'{symbol}: {error!r}', file=sys.stderr)
+    if args.output == '-':
+        table.to_csv(sys.stdout)
+    else:
+        write(table, args.output, args.format)
+    return 0 if len(table) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
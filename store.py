@@ -0,0 +1,229 @@
+from bars import PRICES, normalize
+import numpy as np
+import pandas as pd
+import tempfile
+import os
+
+STORE_DIR = 'store'
+SUFFIX = '.bars'
+ARRAYS = ['date', 'prices', 'volume']
+# Arrays start at multiples of the alignment of .npy data
+ALIGNMENT = 64
+
+
+class BarStore:
+    """
+    Columnar store of bars in the schema of
+    bars.normalize, kept as one file per symbol
+    and interval with the NumPy arrays of dates,
+    prices and volume. Files are opened as
+    read-only memory maps, so any number of
+    processes share one copy of the data in
+    the page cache instead of parsing it into
+    their own dataframes.
+    """
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+
+    def _path(self, symbol, interval):
+        """
+        Get path of the file of a given
+        symbol and interval
+        """
+        return os.path.join(self.directory, interval, symbol + SUFFIX)
+
+    def save(self, symbol, interval, bars):
+        """
+        Save bars of a given symbol and interval.
+        The file is written under a temporary name
+        and renamed over the previous one, so
+        readers never see a partially written
+        version. Already opened memory maps keep
+        the old file.
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol of the data
+        interval : str
+            Interval of the data
+        bars : pandas.DataFrame
+            Bars returned by bars.normalize
+        """
+        path = self._path(symbol, interval)
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        # Prices are stored as rows of a (column x time) array,
+        # the same layout pandas uses for a block of columns
+        arrays = [
+            bars.index.to_numpy(dtype='datetime64[ns]').view(np.int64),
+            np.ascontiguousarray(bars[PRICES].to_numpy().T),
+            bars['volume'].to_numpy(dtype=np.int64)
+        ]
+        handle, temp = tempfile.mkstemp(dir=folder, prefix=symbol + '.',
+                                        suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                for array in arrays:
+                    np.lib.format.write_array(f, array)
+                    f.write(bytes(-f.tell() % ALIGNMENT))
+            os.replace(temp, path)
+        except BaseException:
+            os.remove(temp)
+            raise
+
+    def arrays(self, symbol, interval):
+        """
+        Open arrays of a given symbol and
+        interval as read-only memory maps
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol of the data
+        interval : str
+            Interval of the data
+
+        Returns
+        -------
+        dict or None
+            Arrays 'date' (int64 nanoseconds),
+            'prices' (open, high, low and close
+            rows) and 'volume', None if not stored
+        """
+        try:
+            f = open(self._path(symbol, interval), 'rb')
+        except FileNotFoundError:
+            return None
+        # All arrays are mapped from one open file, so they belong
+        # to the same version even if the file is replaced meanwhile
+        arrays, offset = {}, 0
+        with f:
+            for name in ARRAYS:
+                f.seek(offset)
+                version = np.lib.format.read_magic(f)
+                read_header = np.lib.format.read_array_header_1_0 \
+                    if version == (1, 0) else \
+                    np.lib.format.read_array_header_2_0
+                shape, _, dtype = read_header(f)
+                offset = f.tell()
+                arrays[name] = np.memmap(f, dtype, 'r', offset, shape)
+                offset += arrays[name].nbytes
+                offset += -offset % ALIGNMENT
+        return arrays
+
+    def load(self, symbol, interval):
+        """
+        Load bars of a given symbol and interval
+        without copying them into memory
+
+        Parameters
+        ----------
+        symbol : str
+            Symbol of the data
+        interval : str
+            Interval of the data
+
+        Returns
+        -------
+        pandas.DataFrame or None
+            Read-only bars in the schema of
+            bars.normalize, None if not stored
+        """
+        arrays = self.arrays(symbol, interval)
+        if arrays is None:
+            return None
+        index = pd.DatetimeIndex(arrays['date'].view('datetime64[ns]'),
+                                 name='date')
+        prices = pd.DataFrame(arrays['prices'].T, index=index,
+                              columns=PRICES, copy=False)
+        volume = pd.DataFrame(arrays['volume'].reshape(-1, 1), index=index,
+                              columns=['volume'], copy=False)
+        # Concatenation without copy keeps both blocks memory-mapped
+        return pd.concat([prices, volume], axis=1, copy=False)
+
+    def symbols(self, interval):
+        """
+        List symbols stored for a given interval
+
+        Parameters
+        ----------
+        interval : str
+            Interval of the data
+
+        Returns
+        -------
+        list of str
+            Stored symbols
+        """
+        path = os.path.join(self.directory, interval)
+        if not os.path.isdir(path):
+            return []
+        return sorted(name[:-len(SUFFIX)] for name in os.listdir(path)
+                      if name.endswith(SUFFIX))
+
+    def sync(self, api, symbols, interval='day', float32=False):
+        """
+        Download bars for given symbols with
+        the API and save them to the store
+
+        Parameters
+        ----------
+        api : API
+            API used to get the data
+        symbols : list of str
+            Symbols to update
+        interval : str
+            Interval of the data
+        float32 : bool
+            Store prices as float32
+
+        Returns
+        -------
+        dict
+            Exceptions keyed by symbol
+        """
+        data, errors = api.get_historical_many(symbols, interval)
+        for symbol, frame in data.items():
+            if not frame.empty:
+                self.save(symbol, interval, normalize(frame, float32))
+        return errors
+
+    def load_many(self, symbols, interval='day', api=None):
+        """
+        Open bars of many symbols. Symbols
+        missing from the store are downloaded
+        with the API first, if it is given.
+
+        Parameters
+        ----------
+        symbols : list of str
+            Symbols to load
+        interval : str
+            Interval of the data
+        api : API or None
+            API used to get missing symbols
+
+        Returns
+        -------
+        tuple of dict
+            Read-only bars and exceptions
+            keyed by symbol
+        """
+        symbols = list(dict.fromkeys(symbols))
+        stored = set(self.symbols(interval))
+        missing = [symbol for symbol in symbols if symbol not in stored]
+        errors = {}
+        if api is not None and missing:
+            errors = self.sync(api, missing, interval)
+        frames = {}
+        for symbol in symbols:
+            if symbol in errors:
+                continue
+            bars = self.load(symbol, interval)
+            if bars is None:
+                errors[symbol] = ValueError('No historical data')
+            else:
+                frames[symbol] = bars
+        return frames, errors
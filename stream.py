@@ -0,0 +1,300 @@
+from collections import deque
+from analysis import get_score, score_to_signal
+import math
+
+NAN = float('nan')
+
+
+def _divide(a, b):
+    """
+    Divide like pandas does, returning
+    inf or nan instead of raising on zero
+    """
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return NAN
+        return math.copysign(math.inf, a)
+    return a / b
+
+
+class RollingMean:
+    """
+    Mean of the last n values updated in O(1).
+    The result is nan until the window is full
+    or while it contains a nan, like
+    pandas.Series.rolling(n).mean().
+    """
+
+    def __init__(self, period):
+        if period < 0:
+            raise ValueError('Invalid period')
+        self.period = period
+        self.values = deque()
+        self.total = 0.0
+        self.nans = 0
+        self.nonzero = 0
+
+    def push(self, value):
+        """
+        Add a value to the window
+
+        Parameters
+        ----------
+        value : float
+            New value
+
+        Returns
+        -------
+        float
+            Mean of the window
+        """
+        if self.period == 0:
+            return NAN
+        self.values.append(value)
+        self._add(value, 1)
+        if len(self.values) > self.period:
+            self._add(self.values.popleft(), -1)
+        if len(self.values) < self.period or self.nans:
+            return NAN
+        return self.total / self.period
+
+    def _add(self, value, sign):
+        """
+        Add or remove a value from the running sum
+        """
+        if math.isnan(value):
+            self.nans += sign
+        elif value != 0:
+            self.nonzero += sign
+            self.total += sign * value
+            if not self.nonzero:
+                # Remove rounding errors when all values are zero
+                self.total = 0.0
+
+
+class RollingExtremum:
+    """
+    Maximum or minimum of the last n values
+    using a monotonic deque, amortized O(1)
+    per update
+    """
+
+    def __init__(self, period, maximum=True):
+        if period < 0:
+            raise ValueError('Invalid period')
+        self.period = period
+        self.maximum = maximum
+        self.candidates = deque()
+        self.count = 0
+
+    def push(self, value):
+        """
+        Add a value to the window
+
+        Parameters
+        ----------
+        value : float
+            New value
+
+        Returns
+        -------
+        float
+            Extremum of the window
+        """
+        if self.period == 0:
+            return NAN
+        self.count += 1
+        candidates = self.candidates
+        if self.maximum:
+            while candidates and candidates[-1][1] <= value:
+                candidates.pop()
+        else:
+            while candidates and candidates[-1][1] >= value:
+                candidates.pop()
+        candidates.append((self.count, value))
+        if candidates[0][0] <= self.count - self.period:
+            candidates.popleft()
+        if self.count < self.period:
+            return NAN
+        return candidates[0][1]
+
+
+class ExponentialMean:
+    """
+    Exponential moving average updated in O(1),
+    like pandas.Series.ewm(span=n, adjust=False)
+    """
+
+    def __init__(self, span):
+        if span < 1:
+            raise ValueError('Invalid span')
+        self.alpha = 2 / (span + 1)
+        self.value = NAN
+
+    def push(self, value):
+        """
+        Add a value to the average
+
+        Parameters
+        ----------
+        value : float
+            New value
+
+        Returns
+        -------
+        float
+            Current average
+        """
+        if math.isnan(self.value):
+            self.value = value
+        elif not math.isnan(value):
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+class Stream:
+    """
+    Incremental version of Analysis for live data.
+    Every indicator keeps its rolling state, so
+    a new bar is processed in amortized O(1)
+    time instead of recomputing the history.
+    Values match the Analysis indicators with
+    the same periods.
+    """
+
+    def __init__(self, sma=10, ema=10, rsi=14, macd=(9, 12, 26),
+                 stochastic=(14, 3, 3), williams=14):
+        signal_period, fast_period, slow_period = macd
+        period_k, period_d, period_s = stochastic
+        self._sma = RollingMean(sma)
+        self._ema = ExponentialMean(ema)
+        self._gain = RollingMean(rsi)
+        self._loss = RollingMean(rsi)
+        self._fast = ExponentialMean(fast_period)
+        self._slow = ExponentialMean(slow_period)
+        self._signal = ExponentialMean(signal_period)
+        self._high_k = RollingExtremum(period_k)
+        self._low_k = RollingExtremum(period_k, maximum=False)
+        self._d = RollingMean(period_d)
+        self._s = RollingMean(period_s)
+        self._high_r = RollingExtremum(williams)
+        self._low_r = RollingExtremum(williams, maximum=False)
+        self.close = NAN
+        self.count = 0
+        self.values = {}
+        # Bars until all indicators are defined are neutral
+        self.warmup = True
+
+    @classmethod
+    def from_data(cls, data, **periods):
+        """
+        Create stream and feed it with
+        historical data
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Historical data with 'high', 'low'
+            and 'close' columns, oldest first
+        **periods
+            Periods of the indicators, see Stream
+
+        Returns
+        -------
+        Stream
+            Stream after the last bar of data
+        """
+        stream = cls(**periods)
+        for high, low, close in data[['high', 'low', 'close']].to_numpy(
+                dtype=float):
+            stream.update({'high': high, 'low': low, 'close': close})
+        return stream
+
+    def update(self, bar):
+        """
+        Process a new bar
+
+        Parameters
+        ----------
+        bar : dict or pandas.Series
+            Bar with 'high', 'low' and 'close'
+
+        Returns
+        -------
+        dict
+            Current values of the indicators
+        """
+        high = float(bar['high'])
+        low = float(bar['low'])
+        close = float(bar['close'])
+        if self.count:
+            gain = max(close - self.close, 0.0)
+            loss = max(self.close - close, 0.0)
+        else:
+            gain = loss = NAN
+        self.close = close
+        self.count += 1
+
+        fast = self._fast.push(close)
+        slow = self._slow.push(close)
+        macd = fast - slow
+        signal = self._signal.push(macd)
+
+        rs = _divide(self._gain.push(gain), self._loss.push(loss))
+        rsi = NAN if math.isnan(rs) else 100 - 100 / (1 + rs)
+
+        highest = self._high_k.push(high)
+        lowest = self._low_k.push(low)
+        k = 100 * _divide(close - lowest, highest - lowest)
+        d = self._s.push(self._d.push(k))
+
+        highest = self._high_r.push(high)
+        lowest = self._low_r.push(low)
+        williams = 100 * _divide(highest - close, highest - lowest)
+
+        sma = self._sma.push(close)
+        ema = self._ema.push(close)
+        if self.warmup:
+            self.warmup = any(map(math.isnan, [sma, ema, rsi, macd,
+                                               signal, k, d]))
+
+        self.values = {
+            'close': close,
+            'sma': sma,
+            'ema': ema,
+            'rsi': rsi,
+            'MACD': macd,
+            'Signal': signal,
+            'Histogram': macd - signal,
+            '%K': k,
+            '%D': d,
+            'williams': williams
+        }
+        return self.values
+
+    def get_score(self) -> int:
+        """
+        Get total score of the trading rules
+        for the last bar, see Analysis.get_signal
+
+        Returns
+        -------
+        int
+            Score from -6 to 6
+        """
+        v = self.values
+        return int(get_score(v['close'], v['sma'], v['ema'], v['rsi'],
+                             v['MACD'], v['Signal'], v['%K'], v['%D'],
+                             self.warmup))
+
+    def get_signal(self) -> str:
+        """
+        Get signal for trading for the last
+        bar, see Analysis.get_signal
+
+        Returns
+        -------
+        str
+            Signal for trading
+        """
+        return str(score_to_signal(self.get_score()))
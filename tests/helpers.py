@@ -0,0 +1,75 @@
+from bars import normalize
+from analysis import Analysis
+import numpy as np
+import pandas as pd
+import time
+
+# Qt application shared by the tests, kept alive once created
+app = None
+
+
+def make_data(length=100, seed=0, freq='D'):
+    """
+    Create random historical data in the
+    format of API.get_historical: oldest
+    bar first and index 0 at the newest bar
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(length).cumsum()
+    open_ = close + rng.standard_normal(length) / 10
+    dates = pd.date_range('2022-01-03', periods=length, freq=freq)
+    return pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d' if freq == 'D'
+                               else '%Y-%m-%d %H:%M:%S'),
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.random(length),
+        'low': np.minimum(open_, close) - rng.random(length),
+        'close': close,
+        'volume': rng.integers(1, 1000, length)
+    }, index=np.arange(length - 1, -1, -1))
+
+
+def make_bars(length=50, seed=0, float32=False):
+    """
+    Create random bars in the schema
+    of bars.normalize
+    """
+    return normalize(make_data(length, seed), float32)
+
+
+def make_analysis(data=None, symbol=None, length=100):
+    """
+    Create analysis of data without the API,
+    constant prices of given length if data
+    is None
+    """
+    if data is None:
+        data = pd.DataFrame({'close': [1.0] * length})
+    analysis = object.__new__(Analysis)
+    analysis.symbol = symbol
+    analysis.data = data
+    return analysis
+
+
+def get_app():
+    """
+    Get the Qt application needed by widgets
+    and signals, created on first use
+    """
+    global app
+    from PyQt5.QtWidgets import QApplication
+    if app is None:
+        app = QApplication.instance() or QApplication([])
+    return app
+
+
+def process(pool, timeout=5):
+    """
+    Deliver results of a worker pool
+    until all jobs are done
+    """
+    app = get_app()
+    end = time.monotonic() + timeout
+    while pool.pending() and time.monotonic() < end:
+        pool.wait(10)
+        app.processEvents()
@@ -101,6 +101,13 @@ def test_rsi():
         assert pytest.approx(r) == values[i]
     assert rsi[:5].isnull().all()
 
+    # Test for Wilder's smoothing
+    rsi = analysis.rsi(5, 'wilder')
+    values = [20.0, 36.0, 48.8, 59.04, 67.232]
+    for i, r in enumerate(rsi[5:10]):
+        assert pytest.approx(r) == values[i]
+    assert rsi[:5].isnull().all()
+
     # Test for extreme values
     rsi = analysis.rsi(1)
     assert (rsi[5:] == 100.0).all()
@@ -147,6 +154,40 @@ def test_macd():
     with pytest.raises(ValueError):
         analysis.macd(5, 10, 0)
 
+def test_atr():
+    """
+    Test average true range (ATR)
+    """
+    close = list(range(1, 21))
+    analysis.data = pd.DataFrame({
+        'high': [c + 1 for c in close],
+        'low': [c - 1 for c in close],
+        'close': close
+    })
+    atr = analysis.atr(5)
+    assert (atr[5:] == 2).all()
+    assert atr[:5].isnull().all()
+    with pytest.raises(ValueError):
+        analysis.atr(0)
+
+def test_adx():
+    """
+    Test average directional index (ADX)
+    """
+    close = list(range(1, 21))
+    analysis.data = pd.DataFrame({
+        'high': [c + 1 for c in close],
+        'low': [c - 1 for c in close],
+        'close': close
+    })
+    # Steady uptrend
+    adx = analysis.adx(5)
+    assert list(adx.columns) == ['+DI', '-DI', 'ADX']
+    assert (adx['+DI'][5:] == 50).all()
+    assert (adx['-DI'][5:] == 0).all()
+    assert (adx['ADX'][9:] == 100).all()
+    assert adx['ADX'][:9].isnull().all()
+
 def test_stochastic():
     """
     Test stochastic oscillator
@@ -202,3 +243,53 @@ def test_williams():
     # Test for ValueError
     with pytest.raises(ValueError):
         analysis.williams(-1)
+
+def test_cache():
+    """
+    Test memoization of indicators
+    """
+    analysis.data = pd.DataFrame(
+        {'close': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]}
+    )
+
+    # Test that equivalent calls share the result
+    sma = analysis.sma()
+    assert analysis.sma() is sma
+    assert analysis.sma(10) is sma
+    assert analysis.sma(period=10) is sma
+    assert analysis.sma(5) is not sma
+
+    # Test that new data clears the cache
+    analysis.data = pd.DataFrame(
+        {'close': [2, 3, 4, 5, 6, 7, 8, 9, 10, 11]}
+    )
+    assert analysis.sma()[9] == 6.5
+
+    # Test that modified data is used after clearing the cache
+    analysis.data.loc[9, 'close'] = 21
+    assert analysis.sma()[9] == 6.5
+    analysis.clear_cache()
+    assert analysis.sma()[9] == 7.5
+
+def test_flat_window():
+    """
+    Test signal when RSI and stochastic are
+    undefined after the warm-up
+    """
+    from stream import Stream
+    import numpy as np
+    close = np.r_[100 + np.arange(60.0), np.full(20, 159.0)]
+    spread = np.r_[np.ones(60), np.zeros(20)]
+    analysis.data = pd.DataFrame({'close': close, 'high': close + spread,
+                                  'low': close - spread})
+    assert np.isnan(analysis.rsi().iloc[-1])
+    assert np.isnan(analysis.stochastic()['%K'].iloc[-1])
+
+    # Undefined indicators do not vote, others still do
+    scores = analysis.get_scores()
+    assert (scores[:17] == 0).all()
+    assert (scores[-5:] == -2).all()
+    assert analysis.get_signal() == 'sell'
+    stream = Stream.from_data(analysis.data)
+    assert stream.get_score() == -2
+    assert stream.get_signal() == 'sell'
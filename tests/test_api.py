@@ -1,6 +1,9 @@
 import api as api_module
-from unittest.mock import patch
+from unittest.mock import Mock, patch
+from requests import HTTPError
 import pandas as pd
+import time
+import os
 import pytest
 
 def test_get_data():
@@ -9,7 +12,7 @@ def test_get_data():
     api = api_module.API()
 
     # Test case when output is 'pandas' and key is not None
-    with patch('requests.get') as mock_get:
+    with patch.object(api.session, 'get') as mock_get:
         mock_get.return_value.json.return_value = {
             'key1': {
                 'col1': [1, 2],
@@ -17,14 +20,15 @@ def test_get_data():
             }
         }
         df = api._get_data(url='URL', key='key1')
-        mock_get.assert_called_with('test_url/URL?apikey=test_key')
+        mock_get.assert_called_with('test_url/URL?apikey=test_key',
+                                    timeout=api_module.TIMEOUT)
         assert isinstance(df, pd.DataFrame)
         assert list(df.columns) == ['col1', 'col2']
         assert list(df.col1) == [1, 2]
         assert list(df.col2) == [3, 4]
 
     # Test case when output is 'pandas' and key is None
-    with patch('requests.get') as mock_get:
+    with patch.object(api.session, 'get') as mock_get:
         mock_get.return_value.json.return_value = {
             'key1': {
                 'col1': [1, 2],
@@ -32,14 +36,15 @@ def test_get_data():
             }
         }
         df = api._get_data(url='URL')
-        mock_get.assert_called_with('test_url/URL?apikey=test_key')
+        mock_get.assert_called_with('test_url/URL?apikey=test_key',
+                                    timeout=api_module.TIMEOUT)
         assert isinstance(df, pd.DataFrame)
         assert list(df.columns) == ['key1']
         assert list(df.key1) == [[1, 2], [3, 4]]
 
     # Test case when output is 'json' and key is not None
     api.output = 'json'
-    with patch('requests.get') as mock_get:
+    with patch.object(api.session, 'get') as mock_get:
         mock_get.return_value.json.return_value = {
             'key1': {
                 'col1': [1, 2],
@@ -47,7 +52,8 @@ def test_get_data():
             }
         }
         df = api._get_data(url='URL', key='key1')
-        mock_get.assert_called_with('test_url/URL?apikey=test_key')
+        mock_get.assert_called_with('test_url/URL?apikey=test_key',
+                                    timeout=api_module.TIMEOUT)
         assert isinstance(df, dict)
         assert list(df.keys()) == ['col1', 'col2']
         assert list(df['col1']) == [1, 2]
@@ -55,7 +61,7 @@ def test_get_data():
 
     # Test case when output is 'json' and key is None
     api.output = 'json'
-    with patch('requests.get') as mock_get:
+    with patch.object(api.session, 'get') as mock_get:
         mock_get.return_value.json.return_value = {
             'key1': {
                 'col1': [1, 2],
@@ -63,7 +69,8 @@ def test_get_data():
             }
         }
         df = api._get_data(url='URL')
-        mock_get.assert_called_with('test_url/URL?apikey=test_key')
+        mock_get.assert_called_with('test_url/URL?apikey=test_key',
+                                    timeout=api_module.TIMEOUT)
         assert isinstance(df, dict)
         assert list(df.keys()) == ['key1']
         assert list(df['key1']) == ['col1', 'col2']
@@ -74,6 +81,18 @@ def test_get_data():
     with pytest.raises(ValueError):
         api._get_data('v3/stock/list', 'symbol')
 
+    # Error payloads are not taken as missing rows
+    with patch.object(api.session, 'get') as mock_get:
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {'Error Message': 'Limit'}
+        with pytest.raises(ValueError, match='Limit'):
+            api._get_data('URL', 'historical')
+        mock_get.return_value.json.return_value = {}
+        assert api._get_data('URL', 'historical').empty
+        mock_get.return_value.json.return_value = None
+        with pytest.raises(ValueError):
+            api._get_data('URL', 'historical')
+
 def test_list_category():
     data = [
         {
@@ -166,3 +185,212 @@ def test_get_historical_capitalization():
     assert list(result.columns) == ['date', 'marketCap']
     assert list(result.date) == ['2022-01-01', '2022-01-02']
     assert list(result.marketCap) == [1000000, 1100000]
+
+def test_get_historical_cache(tmp_path):
+    from cache import Cache
+    api = api_module.API(cache=Cache(tmp_path))
+    calls = []
+
+    def get_data(url, key=None, **params):
+        calls.append(params)
+        if params:
+            data = {'date': ['2022-01-03', '2022-01-02'],
+                    'close': [130, 121]}
+        else:
+            data = {'date': ['2022-01-02', '2022-01-01'],
+                    'close': [120, 110]}
+        data = pd.DataFrame(data, columns=['date', 'open', 'high', 'low',
+                                           'close', 'volume', 'label'])
+        data[['open', 'high', 'low']] = data[['close'] * 3].to_numpy()
+        data['volume'] = 10
+        return data
+    api._get_data = get_data
+
+    # First call downloads the full history
+    result = api.get_historical('AAPL')
+    assert calls == [{}]
+    assert list(result.date) == ['2022-01-01', '2022-01-02']
+    assert list(result.index) == [1, 0]
+
+    # Second call only downloads bars since the last cached date
+    result = api.get_historical('AAPL')
+    assert calls[1] == {'from': '2022-01-02'}
+    assert list(result.date) == ['2022-01-01', '2022-01-02', '2022-01-03']
+    assert list(result.close) == [110, 121, 130]
+    assert list(result.index) == [2, 1, 0]
+    assert list(3 - result.index) == [1, 2, 3]
+    # Bars are cached in the compact schema
+    cached = Cache(tmp_path).load('AAPL', 'day')
+    assert len(cached) == 3
+    assert list(cached.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert str(cached.index[0].date()) == '2022-01-01'
+
+    # Full history is downloaded again on refresh or when expired
+    api.cache.max_age = 60
+    refreshed = api.cache.refreshed('AAPL', 'day')
+    assert time.time() - refreshed < 60
+    api.get_historical('AAPL')
+    assert calls[2] == {'from': '2022-01-03'}
+    assert api.cache.refreshed('AAPL', 'day') == refreshed
+    result = api.get_historical('AAPL', refresh=True)
+    assert calls[3] == {}
+    assert list(result.close) == [110, 120]
+    assert api.cache.refreshed('AAPL', 'day') > refreshed
+    with patch.object(time, 'time', return_value=refreshed + 3600):
+        assert api.cache.expired('AAPL', 'day')
+        api.get_historical('AAPL')
+    assert calls[4] == {}
+
+def test_session():
+    api = api_module.API(pool_size=4, timeout=(1, 2), retries=5)
+    adapter = api.session.get_adapter('https://financialmodelingprep.com')
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 5
+    assert api.session.headers['Accept-Encoding'] == 'gzip, deflate'
+    assert api.timeout == (1, 2)
+
+def test_get_historical_many():
+    api = api_module.API()
+
+    def get_historical(symbol, interval):
+        if symbol == 'FAIL':
+            raise KeyError(symbol)
+        return pd.DataFrame({'date': ['2022-01-01'], 'close': [len(symbol)]})
+    api.get_historical = get_historical
+
+    data, errors = api.get_historical_many(['AAPL', 'FAIL', 'MSFT', 'AAPL'])
+    assert list(data) == ['AAPL', 'MSFT']
+    assert list(data['AAPL'].close) == [4]
+    assert list(errors) == ['FAIL']
+    assert isinstance(errors['FAIL'], KeyError)
+
+    # Test case when interval is invalid
+    with pytest.raises(ValueError):
+        api.get_historical_many(['AAPL'], interval='invalid')
+
+def test_throttling():
+    api = api_module.API(retries=2)
+    throttled = Mock(status_code=429, headers={'Retry-After': '3'}, raw=None)
+    ok = Mock(status_code=200, content=b'{"historical": []}', raw=None)
+    ok.json.return_value = {'historical': []}
+    with patch.object(api.session, 'get', side_effect=[throttled, ok]), \
+            patch.object(api.limiter, 'pause') as mock_pause:
+        assert api._get_data('URL', 'historical').empty
+        mock_pause.assert_called_with(3.0)
+    assert api.stats == {'requests': 2, 'throttled': 1,
+                         'retried': 1, 'bytes': 18}
+
+    # Test case when retries are exhausted
+    throttled.raise_for_status.side_effect = HTTPError
+    with patch.object(api.session, 'get', return_value=throttled), \
+            patch.object(api.limiter, 'pause'):
+        with pytest.raises(HTTPError):
+            api._get_data('URL')
+    assert api.stats['throttled'] == 4
+
+def test_get_historical_resample():
+    api = api_module.API(resample=True)
+    dates = pd.date_range('2022-01-03', periods=120, freq='1min')
+    data = pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 10
+    })
+    intervals = []
+
+    def fetch(symbol, interval, start=None):
+        intervals.append(interval)
+        return data
+    api._fetch_historical = fetch
+    result = api.get_historical('AAPL', '1hour')
+    assert intervals == ['1min']
+    assert list(result.date) == ['2022-01-03 00:00:00', '2022-01-03 01:00:00']
+    assert list(result.volume) == [600, 600]
+
+    # Only bars since the last resampled one are aggregated again
+    dates = pd.date_range('2022-01-03', periods=150, freq='1min')
+    data = pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 10
+    })
+    import resample
+    with patch.object(resample, 'resample',
+                      wraps=resample.resample) as mock_resample:
+        result = api.get_historical('AAPL', '1hour')
+    assert len(mock_resample.call_args[0][0]) == 90
+    assert list(result.volume) == [600, 600, 300]
+    assert list(result.index) == [2, 1, 0]
+
+def test_get_updates():
+    api = api_module.API(resample=True)
+    dates = pd.date_range('2022-01-03 09:00', periods=120, freq='1min')
+    data = pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 10
+    })
+    calls = []
+
+    def fetch(symbol, interval, start=None):
+        calls.append((interval, start))
+        return data
+    api._fetch_historical = fetch
+
+    result = api.get_updates('AAPL', '1min', '2022-01-03 10:30:00')
+    assert calls == [('1min', '2022-01-03')]
+    assert list(result.date) == list(data.date.iloc[90:])
+    result = api.get_updates('AAPL', '1hour', '2022-01-03 10:00:00')
+    assert list(result.date) == ['2022-01-03 10:00:00']
+    assert list(result.volume) == [600]
+
+    # Updates are merged into bars resampled before
+    api.get_historical('AAPL', '1hour')
+    calls.clear()
+    data = data.iloc[30:]
+    result = api.get_updates('AAPL', '1hour', '2022-01-03 10:00:00')
+    assert calls == [('1min', '2022-01-03')]
+    assert list(result.date) == ['2022-01-03 10:00:00']
+    assert list(result.volume) == [600]
+    with pytest.raises(ValueError):
+        api.get_updates('AAPL', '2min', '2022-01-03')
+
+    # Only the recently used resampled bars are kept
+    api = api_module.API(resample=True, resampled=2)
+    api._fetch_historical = fetch
+    for symbol in ['AAPL', 'MSFT', 'AAPL', 'GOOG']:
+        api.get_historical(symbol, '1hour')
+    assert list(api._resampled) == [('AAPL', '1hour'), ('GOOG', '1hour')]
+    api.get_historical('AAPL', '1hour', refresh=True)
+    assert list(api._resampled) == [('GOOG', '1hour'), ('AAPL', '1hour')]
+
+def test_get_bars():
+    api = api_module.API()
+    api.get_historical = lambda symbol, interval: pd.DataFrame({
+        'date': ['2022-01-01', '2022-01-02'], 'open': [1, 2], 'high': [2, 3],
+        'low': [0, 1], 'close': [1.5, 2.5], 'volume': [10, 20],
+        'label': ['January 01, 22', 'January 02, 22']
+    })
+    bars = api.get_bars('AAPL', float32=True)
+    assert list(bars.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert str(bars.index[0].date()) == '2022-01-01'
+    assert bars.close.dtype == 'float32'
+
+def test_cache_save_threads(tmp_path):
+    from cache import Cache
+    from bars import normalize
+    from concurrent.futures import ThreadPoolExecutor
+    cache = Cache(tmp_path)
+    dates = pd.date_range('2000-01-01', periods=1000).astype(str)
+    frames = [normalize(pd.DataFrame({
+        'date': dates, 'open': i, 'high': i, 'low': i, 'close': i,
+        'volume': i})) for i in range(8)]
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda data: cache.save('AAPL', 'day', data),
+                          frames))
+    # One complete file is left, without temporary files
+    assert os.listdir(tmp_path / 'day') == ['AAPL.parquet']
+    assert cache.load('AAPL', 'day')['close'].nunique() == 1
+
+    # Temporary file is removed on errors
+    with patch('pyarrow.parquet.write_table', side_effect=OSError):
+        with pytest.raises(OSError):
+            cache.save('AAPL', 'day', frames[0])
+    assert os.listdir(tmp_path / 'day') == ['AAPL.parquet']
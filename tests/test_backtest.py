@@ -0,0 +1,105 @@
+from backtest import Backtest
+from analysis import Analysis
+import numpy as np
+import pandas as pd
+import pytest
+
+def test_backtest():
+    """
+    Test positions, returns and trades
+    """
+    close = pd.Series([10, 11, 12, 11, 10, 12],
+                      index=list('abcdef'), dtype=float)
+    signals = pd.Series(['neutral', 'buy', 'neutral',
+                         'sell', 'neutral', 'buy'], index=close.index)
+    backtest = Backtest(close, signals, fee=0.01, slippage=0)
+    assert list(backtest.positions) == [0, 1, 1, 0, 0, 1]
+    returns = [0, -0.01, 1 / 11, -1 / 12 - 0.01, 0, -0.01]
+    for result, expected in zip(backtest.returns, returns):
+        assert pytest.approx(result) == expected
+    assert pytest.approx(backtest.equity.iloc[-1]) \
+        == np.prod([1 + r for r in returns])
+    assert backtest.drawdown.max() == 0
+    assert backtest.drawdown.min() < 0
+
+    trades = backtest.trades()
+    assert list(trades.entry) == ['b', 'f']
+    assert list(trades.exit) == ['d', None]
+    assert pytest.approx(trades['return'][0]) == 0 - 0.02
+    assert pytest.approx(trades['return'][1]) == -0.01
+
+    summary = backtest.summary()
+    assert summary['trades'] == 2
+    assert summary['hit_rate'] == 0
+
+    # Test case when short selling is allowed
+    backtest = Backtest(close, signals, fee=0, slippage=0, short=True)
+    assert list(backtest.positions) == [0, 1, 1, -1, -1, 1]
+    trades = backtest.trades()
+    assert list(trades.direction) == ['long', 'short', 'long']
+    assert pytest.approx(trades['return'][1]) == -1 / 11
+
+def test_multiple_symbols():
+    """
+    Test backtest of many symbols at once
+    """
+    rng = np.random.default_rng(3)
+    close = pd.DataFrame(100 + rng.standard_normal((200, 3)).cumsum(axis=0),
+                         columns=['AAPL', 'MSFT', 'GOOG'])
+    signals = pd.DataFrame(rng.choice(['buy', 'sell', 'neutral'], (200, 3)),
+                           columns=close.columns)
+    backtest = Backtest(close, signals)
+    summary = backtest.summary()
+    assert list(summary.index) == ['AAPL', 'MSFT', 'GOOG']
+    for symbol in close:
+        single = Backtest(close[symbol], signals[symbol])
+        pd.testing.assert_series_equal(single.equity, backtest.equity[symbol],
+                                       check_names=False)
+        assert pytest.approx(single.summary()['sharpe']) \
+            == summary['sharpe'][symbol]
+        assert single.summary()['trades'] == summary['trades'][symbol]
+
+def test_from_analysis():
+    """
+    Test backtest of Analysis signals
+    """
+    rng = np.random.default_rng(4)
+    close = 100 + rng.standard_normal(100).cumsum()
+    analysis = object.__new__(Analysis)
+    analysis.data = pd.DataFrame({
+        'date': pd.date_range('2022-01-01', periods=100).astype(str),
+        'close': close, 'high': close + 1, 'low': close - 1
+    })
+    backtest = Backtest.from_analysis(analysis)
+    assert backtest.signals.iloc[-1] == analysis.get_signal()
+    assert backtest.close.index[0] == '2022-01-01'
+    assert len(backtest.equity) == 100
+
+def test_warm_up():
+    """
+    Test that no position is opened before
+    the indicators are complete
+    """
+    close = 100 + np.arange(100, dtype=float)
+    analysis = object.__new__(Analysis)
+    analysis.data = pd.DataFrame({'close': close, 'high': close + 1,
+                                  'low': close - 1})
+    # Stochastic %D is the last indicator to be complete
+    signals = analysis.get_signals()
+    assert (signals[:17] == 'neutral').all()
+    assert signals[17] == 'sell'
+    backtest = Backtest.from_analysis(analysis, short=True)
+    assert (backtest.positions[:17] == 0).all()
+    assert backtest.trades().entry.iloc[0] == 17
+
+def test_sharpe():
+    """
+    Test Sharpe ratio without a position
+    """
+    close = pd.Series([10, 11, 12, 11], dtype=float)
+    signals = pd.Series(['neutral'] * 4)
+    assert np.isnan(Backtest(close, signals).sharpe())
+    backtest = Backtest(pd.DataFrame({'A': close, 'B': close}),
+                        pd.DataFrame({'A': signals, 'B': ['buy'] * 4}))
+    sharpe = backtest.sharpe()
+    assert np.isnan(sharpe['A']) and sharpe['B'] > 0
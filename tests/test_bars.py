@@ -0,0 +1,44 @@
+from bars import normalize, denormalize
+import numpy as np
+import pandas as pd
+
+def test_normalize():
+    data = pd.DataFrame({
+        'date': ['2022-01-03 09:31:00', '2022-01-03 09:30:00'],
+        'open': [1, 2], 'high': [3, 4], 'low': [0, 1], 'close': [2, 3],
+        'volume': [100.4, np.nan],
+        'label': ['a', 'b'], 'vwap': [1.5, 2.5], 'changeOverTime': [0, 0]
+    })
+    bars = normalize(data)
+    assert list(bars.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert bars.index.name == 'date'
+    assert isinstance(bars.index, pd.DatetimeIndex)
+    assert list(bars.index.strftime('%H:%M')) == ['09:30', '09:31']
+    assert list(bars.close) == [3, 2]
+    assert list(bars.volume) == [0, 100]
+    assert bars.volume.dtype == np.int64
+    assert bars.close.dtype == np.float64
+
+    # Test case when prices are stored as float32
+    bars = normalize(data, float32=True)
+    assert (bars[['open', 'high', 'low', 'close']].dtypes == np.float32).all()
+
+    # Of repeated bars the last one is kept
+    data = pd.concat([data, data.iloc[[0]].assign(close=5)])
+    bars = normalize(data)
+    assert list(bars.close) == [3, 5]
+
+def test_denormalize():
+    data = pd.DataFrame({
+        'date': ['2022-01-04', '2022-01-03'],
+        'open': [1, 2], 'high': [3, 4], 'low': [0, 1], 'close': [2, 3],
+        'volume': [100, 200], 'label': ['a', 'b']
+    })
+    result = denormalize(normalize(data))
+    assert list(result.columns) == ['date', 'open', 'high', 'low',
+                                    'close', 'volume']
+    assert list(result.date) == ['2022-01-03', '2022-01-04']
+    assert list(result.index) == [1, 0]
+    assert list(result.close) == [3, 2]
+    result = denormalize(normalize(data), '1hour')
+    assert result.date.iloc[0] == '2022-01-03 00:00:00'
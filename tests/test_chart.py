@@ -0,0 +1,134 @@
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from unittest.mock import patch
+from chart import Chart
+from tests.helpers import make_data, make_analysis
+import pandas as pd
+
+def make_chart(length=60, bins=20):
+    """
+    Create chart with random data of an analysis
+    """
+    analysis = make_analysis(make_data(length, seed=3))
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    chart = Chart(figure)
+    chart.set_data(analysis.data, {
+        'sma': analysis.sma(),
+        'bollinger': analysis.bollinger(),
+        'rsi': analysis.rsi(),
+        'macd': analysis.macd()
+    }, bins)
+    return chart, analysis
+
+def test_set_data():
+    chart, analysis = make_chart()
+    assert chart.ax.get_xlim() == (41, 61)
+    # One more bar on the left continues the lines to the edge,
+    # the last bar is drawn separately
+    assert len(chart.bodies.get_paths()) == 20
+    assert len(chart.live[0].get_paths()) == 1
+    assert chart.ax.get_ylim()[1] > analysis.data.high.iloc[-20:].max()
+    x, y = chart.series['sma'][0].get_data()
+    assert len(x) == 21
+    assert x[-1] == 60.309
+    assert y[-1] == analysis.sma().iloc[-1]
+    assert chart._format_date(60) == analysis.data.date.iloc[-1]
+    assert chart._format_date(65) == ''
+
+def test_level():
+    chart, analysis = make_chart()
+    bars, values = chart.level(4)
+    data = analysis.data
+    assert len(bars) == 15
+    assert bars[1, 0] == data.open.iloc[4]
+    assert bars[1, 1] == data.high.iloc[4:8].max()
+    assert bars[1, 2] == data.low.iloc[4:8].min()
+    assert bars[1, 3] == data.close.iloc[7]
+    assert bars[1, 4] == data.volume.iloc[4:8].sum()
+    assert values['sma'][-1, 0] == analysis.sma().iloc[-1]
+
+def test_set_view():
+    chart, _ = make_chart(length=5000)
+    # Whole history is aggregated to fit the width of the axes
+    chart.set_view(0, 5000)
+    assert chart.ax.get_xlim() == (1, 5001)
+    width = chart.ax.get_window_extent().width
+    assert len(chart.bodies.get_paths()) <= width
+    assert max(chart.levels) > 1
+
+    # Zooming in shows single bars again
+    chart.set_view(100, 110)
+    assert len(chart.bodies.get_paths()) == 12
+    # View is kept inside the history and at least 10 bars wide
+    chart.set_view(4995, 6000)
+    assert chart.ax.get_xlim() == (3996, 5001)
+    chart.set_view(4995, 4996)
+    assert chart.ax.get_xlim() == (4991, 5001)
+
+def test_update():
+    chart, analysis = make_chart()
+    chart.canvas.draw()
+    chart.level(4)
+    data = analysis.data.iloc[-1:].copy()
+    data['close'] = data['high'] = data['high'] + 0.1
+    indicators = {
+        'sma': analysis.sma().iloc[-1:],
+        'bollinger': analysis.bollinger().iloc[-1:],
+        'rsi': analysis.rsi().iloc[-1:],
+        'macd': analysis.macd().iloc[-1:]
+    }
+
+    # Revision of the last bar blits its candle
+    with patch.object(chart.canvas, 'draw_idle') as mock_draw, \
+            patch.object(chart, 'blit') as mock_blit:
+        chart.update(data, indicators)
+        mock_draw.assert_not_called()
+        mock_blit.assert_called_once()
+    assert len(chart.bars) == 60
+    assert chart.bars[-1, 3] == data.close.iloc[0]
+    assert chart.level(4)[0][-1, 3] == data.close.iloc[0]
+    assert chart.level(4)[0][-1, 1] == chart.bars[56:, 1].max()
+    path = chart.live[0].get_paths()[0]
+    assert path.vertices[:, 1].max() == data.close.iloc[0]
+
+    # Revision beyond the y-axis redraws the figure
+    data['high'] += 1000
+    with patch.object(chart.canvas, 'draw_idle') as mock_draw:
+        chart.update(data, indicators)
+        mock_draw.assert_called_once()
+    assert chart.ax.get_ylim()[1] > data.high.iloc[0]
+
+    # New bars move the view when it shows the latest bars
+    new = data.copy()
+    new['date'] = ['2022-03-04']
+    chart.update(pd.concat([data, new]), {
+        name: pd.concat([values, values])
+        for name, values in indicators.items()})
+    assert len(chart.bars) == 61
+    assert chart.ax.get_xlim() == (42, 62)
+    assert chart._format_date(61) == '2022-03-04'
+
+def test_set_visible():
+    chart, _ = make_chart()
+    chart.canvas.draw()
+    assert chart.background is not None
+
+    # Price indicators are blitted without a full redraw
+    with patch.object(chart.canvas, 'draw_idle') as mock_draw, \
+            patch.object(chart, 'blit') as mock_blit:
+        chart.set_visible(['bollinger'])
+        mock_draw.assert_not_called()
+        mock_blit.assert_called_once()
+    assert chart.series['sma'][0].get_visible()
+    assert len(chart.legends) == 1
+
+    # Showing the right y-axis redraws the figure
+    with patch.object(chart.canvas, 'draw_idle') as mock_draw:
+        chart.set_visible(['rsi', 'macd'])
+        mock_draw.assert_called_once()
+    assert chart.ax_oscillators.get_visible()
+    assert not chart.ax_macd.get_visible()
+    assert not chart.series['sma'][0].get_visible()
+    chart.canvas.draw()
+    chart.blit()
@@ -0,0 +1,198 @@
+from kernels import (rolling_max, rolling_extrema, rolling_sum, sma, ema,
+                     ewm, wilder, macd, rsi, atr, adx, _ewm_loop)
+from tests.helpers import make_data
+import numpy as np
+import pandas as pd
+import pytest
+
+def test_rolling_max():
+    """
+    Test rolling maximum against pandas
+    """
+    rng = np.random.default_rng(2)
+    values = rng.standard_normal(103)
+    values[40] = np.nan
+    for period in [1, 2, 5, 14, 50, 103]:
+        expected = pd.Series(values).rolling(period).max().to_numpy()
+        np.testing.assert_array_equal(rolling_max(values, period), expected)
+
+    # Test for 2-D arrays
+    values = rng.standard_normal((30, 4))
+    expected = pd.DataFrame(values).rolling(7).max().to_numpy()
+    np.testing.assert_array_equal(rolling_max(values, 7), expected)
+
+    # Test for extreme values
+    assert np.isnan(rolling_max([1, 2, 3], 4)).all()
+    assert np.isnan(rolling_max([1, 2, 3], 0)).all()
+
+    # Test for ValueError
+    with pytest.raises(ValueError):
+        rolling_max([1, 2, 3], -1)
+
+def test_rolling_extrema():
+    """
+    Test highest high and lowest low
+    """
+    high = [2, 5, 3, 4, 1, 6]
+    low = [1, 3, 0, 2, 0.5, 4]
+    highest, lowest = rolling_extrema(high, low, 3)
+    np.testing.assert_array_equal(highest[2:], [5, 5, 4, 6])
+    np.testing.assert_array_equal(lowest[2:], [0, 0, 0, 0.5])
+    assert np.isnan(highest[:2]).all() and np.isnan(lowest[:2]).all()
+
+def wilder_loop(values, period):
+    """
+    Reference of Wilder's smoothing:
+    mean of the first window, then
+    recursive average
+    """
+    result = np.full(len(values), np.nan)
+    result[period - 1] = np.mean(values[:period])
+    for i in range(period, len(values)):
+        result[i] = result[i - 1] + (values[i] - result[i - 1]) / period
+    return result
+
+def test_sma():
+    """
+    Test rolling sum and simple moving average
+    against pandas
+    """
+    rng = np.random.default_rng(5)
+    values = rng.standard_normal(250)
+    for period in [1, 2, 7, 14, 16, 100, 250]:
+        expected = pd.Series(values).rolling(period).mean().to_numpy()
+        np.testing.assert_allclose(sma(values, period), expected)
+    # Windows with missing values are missing
+    values[[30, 100]] = np.nan
+    expected = pd.Series(values).rolling(10).sum().to_numpy()
+    np.testing.assert_allclose(rolling_sum(values, 10), expected)
+    assert np.isnan(sma(values, 0)).all()
+    assert np.isnan(sma([1, 2], 3)).all()
+    with pytest.raises(ValueError):
+        sma(values, -1)
+
+def test_ema():
+    """
+    Test exponential moving averages
+    against pandas and the sequential loop
+    """
+    rng = np.random.default_rng(6)
+    values = rng.standard_normal(1000).cumsum()
+    for period in [1, 5, 12, 26, 200]:
+        expected = pd.Series(values).ewm(span=period, adjust=False).mean()
+        np.testing.assert_allclose(ema(values, period), expected)
+    # Missing values are skipped
+    values[:3] = np.nan
+    values[[50, 51, 400]] = np.nan
+    expected = pd.Series(values).ewm(alpha=0.1, adjust=False,
+                                     ignore_na=True).mean()
+    np.testing.assert_allclose(ewm(values, 0.1), expected)
+    # Loop compiled with numba (if installed)
+    out = np.empty(len(values))
+    _ewm_loop(values, 0.1, out)
+    np.testing.assert_allclose(out, expected)
+    with pytest.raises(ValueError):
+        ema(values, 0)
+    with pytest.raises(ValueError):
+        ewm(values, 1.5)
+
+def test_wilder():
+    """
+    Test Wilder's smoothing, ATR and
+    preallocated outputs
+    """
+    high, low, close = make_data(300)[['high', 'low', 'close']].to_numpy().T
+    np.testing.assert_allclose(wilder(close, 14), wilder_loop(close, 14))
+    # Output may be the input
+    values = close.copy()
+    assert wilder(values, 14, out=values) is values
+    np.testing.assert_allclose(values, wilder_loop(close, 14))
+    with pytest.raises(ValueError):
+        wilder(close, 14, out=np.empty(3))
+
+    ranges = np.maximum(high[1:], close[:-1]) - np.minimum(low[1:], close[:-1])
+    expected = np.r_[np.nan, wilder_loop(ranges, 14)]
+    out = np.empty(len(close))
+    assert atr(high, low, close, 14, out=out) is out
+    np.testing.assert_allclose(out, expected)
+
+def test_rsi():
+    """
+    Test RSI with simple and Wilder's
+    averages
+    """
+    close = make_data(300)['close'].to_numpy()
+    delta = np.diff(close)
+    gain, loss = np.maximum(delta, 0), np.maximum(-delta, 0)
+    for method, smooth in [('sma', lambda v: sma(v, 14)),
+                           ('wilder', lambda v: wilder_loop(v, 14))]:
+        expected = 100 - 100 / (1 + smooth(gain) / smooth(loss))
+        np.testing.assert_allclose(rsi(close, 14, method)[1:], expected)
+        assert np.isnan(rsi(close, 14, method)[:14]).all()
+    with pytest.raises(ValueError):
+        rsi(close, 14, 'ema')
+
+def test_macd():
+    """
+    Test MACD against pandas
+    """
+    close = make_data(300)['close'].to_numpy()
+    series = pd.Series(close)
+    diff = (series.ewm(span=12, adjust=False).mean()
+            - series.ewm(span=26, adjust=False).mean())
+    signal = diff.ewm(span=9, adjust=False).mean()
+    values = macd(close)
+    assert values.shape == (3, len(close))
+    np.testing.assert_allclose(values[0], diff)
+    np.testing.assert_allclose(values[1], signal)
+    np.testing.assert_allclose(values[2], diff - signal, atol=1e-10)
+
+def test_adx():
+    """
+    Test ADX against Wilder's definition
+    """
+    high, low, close = make_data(300)[['high', 'low', 'close']].to_numpy().T
+    period = 14
+    up, down = np.diff(high), -np.diff(low)
+    plus = np.where((up > down) & (up > 0), up, 0)
+    minus = np.where((down > up) & (down > 0), down, 0)
+    ranges = np.maximum(high[1:], close[:-1]) - np.minimum(low[1:], close[:-1])
+    tr = wilder_loop(ranges, period)
+    plus_di = 100 * wilder_loop(plus, period) / tr
+    minus_di = 100 * wilder_loop(minus, period) / tr
+    dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    index = np.full(len(dx), np.nan)
+    index[period - 1:] = wilder_loop(dx[period - 1:], period)
+
+    values = adx(high, low, close, period)
+    np.testing.assert_allclose(values[0, 1:], plus_di)
+    np.testing.assert_allclose(values[1, 1:], minus_di)
+    np.testing.assert_allclose(values[2, 1:], index)
+    assert np.isnan(values[2, :2 * period - 1]).all()
+    assert not np.isnan(values[2, 2 * period - 1:]).any()
+    # Flat prices have no direction
+    flat = np.ones(40)
+    assert (adx(flat, flat, flat, 5)[:, 10:] == 0).all()
+
+def test_columns():
+    """
+    Test that kernels of 2-D arrays work
+    on every column separately
+    """
+    data = make_data(200)
+    close = data[['open', 'close', 'high']].to_numpy()
+    close[:30, 0] = np.nan
+    close[[5, 100], 2] = np.nan
+    original = close.copy()
+    for kernel in [lambda v: ema(v, 10), lambda v: wilder(v, 14),
+                   lambda v: rsi(v, 14), lambda v: rsi(v, 14, 'wilder'),
+                   lambda v: sma(v, 10)]:
+        result = kernel(close)
+        for j in range(close.shape[1]):
+            np.testing.assert_allclose(result[:, j], kernel(close[:, j]))
+    values = macd(close)
+    assert values.shape == (3, 200, 3)
+    for j in range(close.shape[1]):
+        np.testing.assert_allclose(values[:, :, j], macd(close[:, j]),
+                                   atol=1e-10)
+    np.testing.assert_array_equal(close, original)
@@ -0,0 +1,74 @@
+from live import LiveFeed, Scheduler, poll_period, DELAY
+from tests.helpers import make_data, make_analysis
+import numpy as np
+import pandas as pd
+import pytest
+
+def test_apply():
+    data = make_data(1200, seed=2, freq='1min')
+    # The last bar is incomplete
+    partial = data.iloc[:-2].copy()
+    partial.loc[partial.index[-1], ['high', 'close']] += 0.5
+    analysis = make_analysis(partial)
+    feed = LiveFeed(analysis)
+    assert feed.since == data['date'].iloc[-3]
+
+    # Revision of the last bar and two new bars
+    bars, indicators = feed.apply(data.iloc[-3:])
+    assert list(bars['date']) == list(data['date'].iloc[-3:])
+    pd.testing.assert_frame_equal(analysis.data[list(data.columns)],
+                                  data, check_dtype=False)
+    expected = make_analysis(data)
+    for name, values in indicators.items():
+        assert np.allclose(values, getattr(expected, name)().iloc[-3:],
+                           equal_nan=True), name
+    assert analysis.signal == make_analysis(data).get_signal()
+
+    # Nothing changed
+    assert feed.apply(data.iloc[-1:]) is None
+    assert feed.apply(data.iloc[:0]) is None
+
+    # Revision after new bars
+    revised = data.iloc[-1:].copy()
+    revised['close'] -= 1
+    bars, indicators = feed.apply(revised)
+    assert len(bars) == 1 and len(analysis.data) == len(data)
+    data.loc[data.index[-1], 'close'] -= 1
+    expected = make_analysis(data)
+    for name, values in indicators.items():
+        assert np.allclose(values, getattr(expected, name)().iloc[-1:],
+                           equal_nan=True), name
+
+def test_short_history():
+    data = make_data(5, seed=2, freq='1min')
+    analysis = make_analysis(data.iloc[:3].copy())
+    bars, indicators = LiveFeed(analysis).apply(data.iloc[2:])
+    assert len(bars) == 3
+    assert indicators['bollinger'].isna().all().all()
+
+def test_poll_period():
+    assert poll_period('1min') == 60
+    assert poll_period('day') == 300
+    with pytest.raises(ValueError):
+        poll_period('2min')
+
+def test_scheduler():
+    now = [1000.0]
+    scheduler = Scheduler(clock=lambda: now[0])
+    scheduler.add('A', 60)
+    scheduler.add('B', 60)
+    assert 'A' in scheduler and len(scheduler) == 2
+    # Polls follow the end of the bar, keys are spread
+    assert scheduler.times['A'] == 1020 + DELAY
+    assert 1020 + DELAY < scheduler.times['B'] <= 1020 + DELAY + 30
+    assert scheduler.due() == []
+
+    now[0] = 1020 + DELAY
+    assert scheduler.due() == ['A']
+    assert scheduler.times['A'] == 1080 + DELAY
+    now[0] = 1200
+    assert sorted(scheduler.due()) == ['A', 'B']
+    assert scheduler.due() == []
+
+    scheduler.remove('A')
+    assert 'A' not in scheduler and len(scheduler) == 1
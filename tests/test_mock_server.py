@@ -0,0 +1,92 @@
+from mock_server import MockServer, make_bars
+from requests import HTTPError
+from cache import Cache
+import api as api_module
+import json
+import pytest
+
+def make_api(server, **kwargs):
+    api_module.API_KEY = 'test_key'
+    return api_module.API(base_url=server.url, rate_limit=None, **kwargs)
+
+def test_make_bars():
+    data = make_bars('AAPL', '1hour', bars=10, end='2022-01-03 12:30')
+    assert len(data) == 10
+    assert data.date.iloc[0] == '2022-01-03 12:00:00'
+    assert data.date.is_monotonic_decreasing
+    assert (data.high >= data[['open', 'close']].max(axis=1)).all()
+    assert make_bars('AAPL', 'day', 10).equals(make_bars('AAPL', 'day', 10))
+    assert not make_bars('MSFT', 'day', 10).equals(make_bars('AAPL', 'day', 10))
+
+def test_get_historical(tmp_path):
+    with MockServer(bars=50, end='2022-01-31') as server:
+        api = make_api(server, cache=Cache(tmp_path))
+        data = api.get_historical('AAPL')
+        assert len(data) == 50
+        assert data.date.iloc[-1] == '2022-01-31'
+        assert data.date.is_monotonic_increasing
+
+        # Cached bars are updated from the last cached day
+        data = api.get_historical('AAPL')
+        assert len(data) == 50
+        assert server.stats['requests'] == 2
+
+        data = api.get_historical('AAPL', '5min')
+        assert len(data) == 50
+        assert api.list_category('stocks').symbol.iloc[0] == 'AAPL'
+        assert len(api.get_historical_capitalization('AAPL')) == 50
+        # Bytes are counted as received, i.e. compressed
+        assert api.stats['bytes'] == server.stats['bytes']
+
+def test_failures():
+    with MockServer(error_rate=1) as server:
+        api = make_api(server, retries=1, backoff=0)
+        data, errors = api.get_historical_many(['AAPL', 'MSFT'])
+        assert not data
+        assert list(errors) == ['AAPL', 'MSFT']
+        assert isinstance(errors['AAPL'], HTTPError)
+        assert server.stats['errors'] == 4
+
+    # Test case when API key is invalid
+    with MockServer(api_key='other') as server:
+        status, _, body = server.respond('v3/stock/list', {'apikey': 'key'})
+        assert status == 401
+        assert 'Error Message' in json.loads(body)
+        with pytest.raises(HTTPError):
+            make_api(server).get_historical('AAPL')
+        data, errors = make_api(server).get_historical_many(['AAPL'])
+        assert not data
+        assert isinstance(errors['AAPL'], HTTPError)
+
+    # Test for ValueError
+    with pytest.raises(ValueError):
+        MockServer(error_rate=2).stop()
+
+def test_throttling():
+    with MockServer(rate_limit=2) as server:
+        assert server.respond('v3/stock/list', {})[0] == 200
+        assert server.respond('v3/stock/list', {})[0] == 200
+        status, headers, _ = server.respond('v3/stock/list', {})
+        assert status == 429
+        assert int(headers['Retry-After']) > 0
+
+        api = make_api(server, retries=0)
+        with pytest.raises(HTTPError):
+            api.get_historical('AAPL')
+        assert api.stats['throttled'] == 1
+        assert server.stats['throttled'] == 2
+
+def test_recorded(tmp_path):
+    path = tmp_path / 'v3' / 'historical-price-full'
+    path.mkdir(parents=True)
+    historical = [{'date': f'2022-01-0{i}', 'open': i, 'high': i, 'low': i,
+                   'close': i, 'volume': i} for i in range(5, 0, -1)]
+    (path / 'AAPL.json').write_text(json.dumps(
+        {'symbol': 'AAPL', 'historical': historical}))
+    with MockServer(data=str(tmp_path)) as server:
+        api = make_api(server)
+        assert list(api.get_historical('AAPL').close) == [1, 2, 3, 4, 5]
+        data = api._fetch_historical('AAPL', 'day', '2022-01-04')
+        assert list(data.close) == [4, 5]
+        # Symbols not recorded are synthetic
+        assert len(api.get_historical('MSFT')) == 1000
@@ -0,0 +1,52 @@
+from optimize import grid, sample, optimize, optimize_store
+from store import BarStore
+from bars import normalize
+from tests.helpers import make_data
+from backtest import Backtest
+from analysis import Analysis
+import pandas as pd
+import pytest
+
+SPACE = {'sma': [5, 10], 'rsi': [7, 14], 'macd': [(9, 12, 26)]}
+
+def test_grid():
+    """
+    Test combinations of parameters
+    """
+    params = grid(SPACE)
+    assert len(params) == 4
+    assert params[0] == {'sma': 5, 'rsi': 7, 'macd': (9, 12, 26)}
+    assert len(sample(SPACE, 3, seed=1)) == 3
+    assert len(sample(SPACE, 10)) == 4
+    assert sample(SPACE, 3, seed=1) == sample(SPACE, 3, seed=1)
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_optimize(workers):
+    """
+    Test search in the current process and on a process pool
+    """
+    data = make_data(300)
+    results = optimize(data, grid(SPACE), workers=workers)
+    assert len(results) == 4
+    assert results['sharpe'].is_monotonic_decreasing
+    best = results.iloc[0]
+    analysis = object.__new__(Analysis)
+    analysis.data = data
+    signals = analysis.get_signals(sma=best['sma'], rsi=best['rsi'])
+    expected = Backtest(data['close'], signals).summary()
+    assert pytest.approx(best['sharpe']) == expected['sharpe']
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_optimize_store(tmp_path, workers):
+    """
+    Test search over memory-mapped bars of the store
+    """
+    data = make_data(300)
+    store = BarStore(tmp_path)
+    store.save('AAPL', 'day', normalize(data))
+    results = optimize_store(store, 'AAPL', params=grid(SPACE),
+                             workers=workers)
+    expected = optimize(data, grid(SPACE), workers=1)
+    pd.testing.assert_frame_equal(results, expected)
+    with pytest.raises(ValueError):
+        optimize_store(store, 'MSFT')
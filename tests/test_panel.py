@@ -0,0 +1,103 @@
+from analysis import Analysis
+from panel import Panel
+from bars import COLUMNS, normalize
+import numpy as np
+import pandas as pd
+import pytest
+
+def make_frames(symbols, length=60, seed=0):
+    """
+    Create random historical data for given symbols
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2022-01-01', periods=length).strftime('%Y-%m-%d')
+    frames = {}
+    for symbol in symbols:
+        close = 100 + rng.standard_normal(length).cumsum()
+        frames[symbol] = pd.DataFrame({
+            'date': dates,
+            'open': close + rng.standard_normal(length),
+            'high': close + 2,
+            'low': close - 2,
+            'close': close,
+            'volume': rng.integers(1000, 2000, length)
+        })
+    return frames
+
+def test_indicators():
+    """
+    Test that panel indicators match single symbol analysis
+    """
+    frames = make_frames(['AAPL', 'MSFT', 'GOOG'])
+    panel = Panel.from_frames(frames)
+    assert panel.symbols == ['AAPL', 'MSFT', 'GOOG']
+    for symbol, frame in frames.items():
+        analysis = object.__new__(Analysis)
+        analysis.data = frame
+        for name in ['sma', 'ema', 'rsi', 'williams']:
+            expected = getattr(analysis, name)().to_numpy()
+            result = getattr(panel, name)()[symbol].to_numpy()
+            np.testing.assert_allclose(result, expected)
+        for name in ['bollinger', 'macd', 'stochastic', 'donchian']:
+            expected = getattr(analysis, name)()
+            result = getattr(panel, name)()
+            for column in expected:
+                np.testing.assert_allclose(result[column][symbol].to_numpy(),
+                                           expected[column].to_numpy())
+        assert panel.signals[symbol] == analysis.get_signal()
+
+def test_last():
+    """
+    Test signals of symbols with a shorter history
+    """
+    frames = make_frames(['AAPL', 'MSFT'])
+    frames['MSFT'] = frames['MSFT'].iloc[:-5]
+    panel = Panel.from_frames(frames)
+    analysis = object.__new__(Analysis)
+    analysis.data = frames['MSFT']
+    assert panel.signals['MSFT'] == analysis.get_signal()
+    assert pytest.approx(panel._last(panel.sma())['MSFT']) \
+        == analysis.sma().iloc[-1]
+
+def test_combine():
+    """
+    Test combining frames of the API
+    and normalized frames
+    """
+    frames = make_frames(['AAPL', 'MSFT'], length=5)
+    frames['AAPL']['label'] = 'extra column'
+    frames['MSFT'] = normalize(frames['MSFT'].iloc[1:])
+    data = Panel.combine(frames)
+    assert isinstance(data.index, pd.DatetimeIndex)
+    assert set(data.columns.levels[0]) == set(COLUMNS)
+    assert data['close']['MSFT'].isna().tolist() == [True] + [False] * 4
+    np.testing.assert_array_equal(data['close']['AAPL'],
+                                  frames['AAPL']['close'])
+
+    # Repeated bars do not break the alignment of symbols
+    frames['AAPL'] = pd.concat([frames['AAPL'], frames['AAPL'].iloc[[-1]]])
+    data = Panel.combine(frames)
+    assert len(data) == 5
+
+def test_short_history():
+    """
+    Test indicators of a symbol listed later
+    """
+    frames = make_frames(['AAPL', 'MSFT'], length=80)
+    frames['MSFT'] = frames['MSFT'].iloc[20:]
+    panel = Panel.from_frames(frames)
+    analysis = object.__new__(Analysis)
+    analysis.data = frames['MSFT']
+    for name in ['sma', 'ema', 'rsi']:
+        result = getattr(panel, name)()['MSFT']
+        assert result[:20].isna().all()
+        np.testing.assert_allclose(result[20:],
+                                   getattr(analysis, name)().to_numpy())
+    np.testing.assert_allclose(panel.macd()['Signal']['MSFT'][20:],
+                               analysis.macd()['Signal'].to_numpy())
+    result = panel.rsi(method='wilder')['MSFT']
+    assert result[:20].isna().all()
+    np.testing.assert_allclose(result[20:],
+                               analysis.rsi(method='wilder').to_numpy())
+    with pytest.raises(ValueError):
+        panel.rsi(method='ema')
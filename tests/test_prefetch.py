@@ -0,0 +1,78 @@
+from prefetch import AnalysisCache, Prefetcher
+from workers import WorkerPool
+from tests.helpers import make_analysis, get_app, process
+from unittest.mock import patch
+from threading import Event
+import time
+
+get_app()
+
+def test_memory_usage():
+    analysis = make_analysis(symbol='AAPL')
+    size = analysis.memory_usage()
+    assert size >= 800
+    analysis.sma()
+    assert analysis.memory_usage() >= size + 800
+
+def test_cache():
+    size = make_analysis(symbol='A').memory_usage()
+    cache = AnalysisCache(budget=2 * size)
+    cache.put(('A', 'day'), make_analysis(symbol='A'))
+    cache.put(('B', 'day'), make_analysis(symbol='B'))
+    assert cache.get(('A', 'day')).symbol == 'A'
+
+    # Least recently used analysis is evicted
+    cache.put(('C', 'day'), make_analysis(symbol='C'))
+    assert ('B', 'day') not in cache
+    assert list(cache.items) == [('A', 'day'), ('C', 'day')]
+    assert cache.size == 2 * size
+
+    # Newest analysis is kept even above the budget
+    cache.put(('D', 'day'), make_analysis(symbol='D', length=1000))
+    assert list(cache.items) == [('D', 'day')]
+
+    # Outdated analysis is removed
+    cache.max_age = 10
+    with patch('time.monotonic', return_value=time.monotonic() + 11):
+        assert cache.get(('D', 'day')) is None
+    assert len(cache) == 0 and cache.size == 0
+
+    cache.put(('A', 'day'), make_analysis(symbol='A'))
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
+
+def test_prefetcher():
+    pool = WorkerPool(1)
+    cache = AnalysisCache()
+    started, release = Event(), Event()
+    loaded = []
+
+    def load(symbol, interval):
+        if symbol == 'B':
+            started.set()
+            release.wait(5)
+        loaded.append(symbol)
+        return make_analysis(symbol=symbol)
+    prefetcher = Prefetcher(pool, cache, load, neighbors=(1, -1), recent=2)
+    symbols = ['A', 'B', 'C', 'D', 'E']
+    prefetcher.viewed(symbols, 0, 'day')
+    started.wait(5)
+    prefetcher.viewed(symbols, 2, 'day')
+    assert prefetcher.keys == {('B', 'day'), ('D', 'day'), ('A', 'day')}
+
+    # Queued job of a symbol no longer near is dropped
+    prefetcher.viewed(symbols, 4, 'day')
+    assert ('A', 'day') not in prefetcher.keys
+    # Running job is taken over by the user request
+    assert prefetcher.take(('B', 'day'))
+    assert not prefetcher.take(('D', 'day'))
+    release.set()
+    process(pool)
+    assert sorted(loaded) == ['B', 'C']
+    assert set(cache.items) == {('B', 'day'), ('C', 'day')}
+    assert not prefetcher.keys
+
+    # Prefetched analyses are not loaded again
+    prefetcher.viewed(symbols, 2, 'day')
+    process(pool)
+    assert sorted(loaded) == ['B', 'C', 'D', 'E']
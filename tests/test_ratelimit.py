@@ -0,0 +1,40 @@
+from ratelimit import RateLimiter
+from unittest.mock import patch
+import pytest
+
+def test_acquire():
+    limiter = RateLimiter(2, period=1)
+
+    # Test case when bucket is full
+    with patch('time.sleep') as mock_sleep:
+        assert limiter.acquire() == 0
+        assert limiter.acquire() == 0
+        mock_sleep.assert_not_called()
+
+    # Test case when bucket is empty
+    with patch('time.sleep') as mock_sleep:
+        wait = limiter.acquire()
+        assert 0 < wait <= 0.5
+        mock_sleep.assert_called_with(wait)
+
+    # Test for ValueError
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+def test_pause():
+    limiter = RateLimiter(10, period=1)
+    limiter.pause(2)
+    with patch('time.sleep') as mock_sleep:
+        wait = limiter.acquire()
+        assert pytest.approx(wait, abs=0.01) == 2.1
+        mock_sleep.assert_called_with(wait)
+
+def test_try_acquire():
+    limiter = RateLimiter(2, period=1)
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+
+    # Test case when bucket is empty
+    wait = limiter.try_acquire()
+    assert 0 < wait <= 0.5
+    assert limiter.tokens < 1
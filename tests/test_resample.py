@@ -0,0 +1,68 @@
+from resample import resample, update, session_offset
+import pandas as pd
+import pytest
+
+def make_minutes(start, periods):
+    """
+    Create 1-minute bars where close is the minute number
+    """
+    dates = pd.date_range(start, periods=periods, freq='1min')
+    values = range(periods)
+    return pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'open': values,
+        'high': [v + 1 for v in values],
+        'low': [v - 1 for v in values],
+        'close': values,
+        'volume': [10] * periods
+    })
+
+def test_resample():
+    """
+    Test aggregation and session alignment
+    """
+    data = pd.concat([make_minutes('2022-01-03 09:30', 390),
+                      make_minutes('2022-01-04 09:30', 390)],
+                     ignore_index=True)
+    assert session_offset(pd.to_datetime(data['date'])) \
+        == pd.Timedelta('9h30min')
+
+    bars = resample(data, '1hour')
+    assert len(bars) == 14
+    assert list(bars['date'].iloc[:3]) == ['2022-01-03 09:30:00',
+                                      '2022-01-03 10:30:00',
+                                      '2022-01-03 11:30:00']
+    first = bars.iloc[0]
+    assert (first.open, first.high, first.low, first.close, first.volume) \
+        == (0, 60, -1, 59, 600)
+    last = bars.iloc[6]
+    assert last['date'] == '2022-01-03 15:30:00'
+    assert (last.close, last.volume) == (389, 300)
+    assert list(bars.index[:2]) == [13, 12]
+
+    bars = resample(data, '4hour')
+    assert list(bars['date']) == ['2022-01-03 09:30:00',
+                                  '2022-01-03 13:30:00',
+                                  '2022-01-04 09:30:00',
+                                  '2022-01-04 13:30:00']
+
+    # Test for ValueError
+    with pytest.raises(ValueError):
+        resample(data, 'day')
+
+def test_update():
+    """
+    Test incremental update of resampled bars
+    """
+    data = make_minutes('2022-01-03 00:00', 100)
+    expected = resample(data, '15min')
+    bars = update(resample(data[:50], '15min'), data[45:], '15min')
+    pd.testing.assert_frame_equal(bars, expected)
+    assert bars is update(bars, data[:10], '15min')
+
+def test_index():
+    """
+    Test that the index supports arithmetic used by the GUI
+    """
+    bars = resample(make_minutes('2022-01-03 00:00', 30), '5min')
+    assert list(5 - bars.index) == [0, 1, 2, 3, 4, 5]
@@ -0,0 +1,75 @@
+from tests.test_panel import make_frames
+from store import BarStore
+from bars import normalize
+import screener
+import pandas as pd
+import json
+
+class FakeAPI:
+    def get_historical_many(self, symbols, interval):
+        frames = make_frames([s for s in symbols
+                              if s not in ['FAIL', 'EMPTY']])
+        errors = {'FAIL': KeyError('FAIL')} if 'FAIL' in symbols else {}
+        # Unknown symbols have no columns
+        if 'EMPTY' in symbols:
+            frames['EMPTY'] = pd.DataFrame()
+        return frames, errors
+
+def test_screen():
+    lists = {
+        'stocks': {'AAPL': 'Apple', 'MSFT': 'Microsoft', 'FAIL': 'Fail'},
+        'crypto': {'BTCUSD': 'Bitcoin'}
+    }
+    table, errors = screener.screen(lists, api=FakeAPI())
+    assert list(errors) == ['FAIL']
+    assert sorted(table.index) == ['AAPL', 'BTCUSD', 'MSFT']
+    assert list(table['rank']) == [1, 2, 3]
+    assert table['score'].is_monotonic_decreasing
+    assert table.loc['BTCUSD', 'name'] == 'Bitcoin'
+    assert table.loc['AAPL', 'list'] == 'stocks'
+    assert set(table['signal']) <= {'buy', 'sell', 'neutral'}
+
+def test_screen_empty():
+    lists = {
+        'stocks': {'AAPL': 'Apple', 'EMPTY': 'Delisted'},
+        'delisted': {'EMPTY': 'Delisted'}
+    }
+    table, errors = screener.screen(lists, api=FakeAPI())
+    assert list(errors) == ['EMPTY']
+    assert isinstance(errors['EMPTY'], ValueError)
+    assert list(table.index) == ['AAPL']
+
+def test_screen_store(tmp_path):
+    lists = {'stocks': {'AAPL': 'Apple', 'MSFT': 'Microsoft', 'FAIL': 'Fail'}}
+    store = BarStore(tmp_path)
+    store.save('AAPL', 'day', normalize(make_frames(['AAPL'])['AAPL']))
+    api = FakeAPI()
+    calls = []
+    get_historical_many = api.get_historical_many
+    api.get_historical_many = lambda symbols, interval: \
+        calls.append(symbols) or get_historical_many(symbols, interval)
+    table, errors = screener.screen(lists, api=api, store=store)
+    # Only symbols missing from the store are downloaded
+    assert calls == [['MSFT', 'FAIL']]
+    assert store.symbols('day') == ['AAPL', 'MSFT']
+    assert list(errors) == ['FAIL']
+    expected, _ = screener.screen({'stocks': {'AAPL': 'Apple'}},
+                                  api=FakeAPI())
+    pd.testing.assert_series_equal(table.loc['AAPL'].drop('rank'),
+                                   expected.loc['AAPL'].drop('rank'))
+
+def test_write(tmp_path):
+    table = pd.DataFrame({'rank': [1], 'score': [3]},
+                         index=pd.Index(['AAPL'], name='symbol'))
+    screener.write(table, tmp_path / 'out.json')
+    with open(tmp_path / 'out.json') as f:
+        assert json.load(f) == [{'symbol': 'AAPL', 'rank': 1, 'score': 3}]
+    screener.write(table, str(tmp_path / 'out.csv'))
+    assert pd.read_csv(tmp_path / 'out.csv', index_col=0).equals(table)
+    screener.write(table, str(tmp_path / 'out.parquet'))
+    assert pd.read_parquet(tmp_path / 'out.parquet').equals(table)
+
+def test_read_symbols(tmp_path):
+    path = tmp_path / 'list.csv'
+    path.write_text('AAPL,Apple\nMSFT\n')
+    assert screener.read_symbols(path) == {'AAPL': 'Apple', 'MSFT': 'MSFT'}
@@ -0,0 +1,96 @@
+from store import BarStore
+from tests.helpers import make_bars
+from analysis import Analysis
+from concurrent.futures import ThreadPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+def is_mapped(array):
+    """
+    Check whether array is a view of a memory map
+    """
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+@pytest.mark.parametrize('float32', [False, True])
+def test_save_load(tmp_path, float32):
+    store = BarStore(tmp_path)
+    bars = make_bars(float32=float32)
+    assert store.load('AAPL', 'day') is None
+    store.save('AAPL', 'day', bars)
+    loaded = store.load('AAPL', 'day')
+    pd.testing.assert_frame_equal(loaded, bars)
+
+    # Test that data is memory-mapped and read-only
+    assert isinstance(store.arrays('AAPL', 'day')['prices'], np.memmap)
+    assert is_mapped(loaded['close'].to_numpy())
+    assert is_mapped(loaded['volume'].to_numpy())
+    with pytest.raises(ValueError):
+        loaded['close'].to_numpy()[0] = 0
+
+    # Test that saving replaces previous data
+    store.save('AAPL', 'day', bars.iloc[:10])
+    assert len(store.load('AAPL', 'day')) == 10
+    assert len(loaded) == 50
+    assert store.symbols('day') == ['AAPL']
+
+def test_sync(tmp_path):
+    class FakeAPI:
+        def get_historical_many(self, symbols, interval):
+            frame = make_bars().reset_index()
+            frame['date'] = frame['date'].astype(str)
+            return {'AAPL': frame}, {'FAIL': KeyError('FAIL')}
+    store = BarStore(tmp_path)
+    errors = store.sync(FakeAPI(), ['AAPL', 'FAIL'])
+    assert list(errors) == ['FAIL']
+    assert store.symbols('day') == ['AAPL']
+    pd.testing.assert_frame_equal(store.load('AAPL', 'day'), make_bars())
+
+def test_replace(tmp_path):
+    store = BarStore(tmp_path)
+    bars = make_bars()
+    # Writers in threads of one process use their own temporary files
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda n: store.save('AAPL', 'day', bars.iloc[:n]),
+                          [10, 20, 30, 40] * 4))
+    assert os.listdir(tmp_path / 'day') == ['AAPL.bars']
+    assert len(store.load('AAPL', 'day')) in [10, 20, 30, 40]
+
+    # Arrays opened before a save belong to one version
+    arrays = store.arrays('AAPL', 'day')
+    store.save('AAPL', 'day', bars)
+    assert len(arrays['date']) == arrays['prices'].shape[1] \
+        == len(arrays['volume'])
+    assert len(store.arrays('AAPL', 'day')['date']) == 50
+
+def test_load_many(tmp_path):
+    class FakeAPI:
+        def get_historical_many(self, symbols, interval):
+            assert symbols == ['MSFT']
+            frame = make_bars().reset_index()
+            frame['date'] = frame['date'].astype(str)
+            return {'MSFT': frame}, {}
+    store = BarStore(tmp_path)
+    store.save('AAPL', 'day', make_bars())
+    frames, errors = store.load_many(['AAPL', 'MSFT'], 'day', FakeAPI())
+    assert list(frames) == ['AAPL', 'MSFT'] and not errors
+    frames, errors = store.load_many(['AAPL', 'GOOG'])
+    assert list(frames) == ['AAPL'] and list(errors) == ['GOOG']
+
+def test_analysis(tmp_path):
+    store = BarStore(tmp_path)
+    bars = make_bars(100)
+    store.save('AAPL', 'day', bars)
+    analysis = Analysis.from_store(store, 'AAPL')
+    assert is_mapped(analysis.data['close'].to_numpy())
+    expected = object.__new__(Analysis)
+    expected.data = bars
+    assert analysis.signal == expected.get_signal()
+    pd.testing.assert_frame_equal(analysis.macd(), expected.macd())
+    with pytest.raises(ValueError):
+        Analysis.from_store(store, 'MSFT')
@@ -0,0 +1,61 @@
+from analysis import Analysis
+from stream import Stream, RollingMean, RollingExtremum
+from tests.helpers import make_data
+import pandas as pd
+import pytest
+
+def test_rolling():
+    """
+    Test rolling windows against pandas
+    """
+    values = pd.Series([3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5, 8], dtype=float)
+    mean, maximum = RollingMean(4), RollingExtremum(4)
+    minimum = RollingExtremum(4, maximum=False)
+    result = [(mean.push(v), maximum.push(v), minimum.push(v))
+              for v in values]
+    result = pd.DataFrame(result, columns=['mean', 'max', 'min'])
+    expected = values.rolling(4)
+    pd.testing.assert_series_equal(result['mean'], expected.mean(),
+                                   check_names=False)
+    pd.testing.assert_series_equal(result['max'], expected.max(),
+                                   check_names=False)
+    pd.testing.assert_series_equal(result['min'], expected.min(),
+                                   check_names=False)
+
+    # Test for ValueError
+    with pytest.raises(ValueError):
+        RollingMean(-1)
+
+def test_stream():
+    """
+    Test that streamed indicators match Analysis
+    """
+    data = make_data(80)
+    analysis = object.__new__(Analysis)
+    analysis.data = data
+    stream = Stream()
+    macd, stoch = analysis.macd(), analysis.stochastic()
+    expected = {
+        'sma': analysis.sma(), 'ema': analysis.ema(), 'rsi': analysis.rsi(),
+        'MACD': macd['MACD'], 'Signal': macd['Signal'],
+        'Histogram': macd['Histogram'], '%K': stoch['%K'],
+        '%D': stoch['%D'], 'williams': analysis.williams()
+    }
+    for i, (_, bar) in enumerate(data.iterrows()):
+        values = stream.update(bar)
+        for name, series in expected.items():
+            assert values[name] == pytest.approx(series.iloc[i], nan_ok=True)
+        analysis.data = data.iloc[:i + 1]
+        assert stream.get_signal() == analysis.get_signal()
+
+def test_from_data():
+    """
+    Test stream created from historical data
+    """
+    data = make_data(80)
+    stream = Stream.from_data(data, sma=5, rsi=7)
+    analysis = object.__new__(Analysis)
+    analysis.data = data
+    assert stream.values['sma'] == pytest.approx(analysis.sma(5).iloc[-1])
+    assert stream.values['rsi'] == pytest.approx(analysis.rsi(7).iloc[-1])
+    assert stream.count == len(data)
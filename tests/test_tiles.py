@@ -0,0 +1,48 @@
+from tiles import TileCache, TileRenderer, render_tile, fingerprint
+from concurrent.futures import ThreadPoolExecutor
+from tests.helpers import make_data
+import numpy as np
+
+def test_render():
+    data = make_data()
+    renderer = TileRenderer((200, 100))
+    image = renderer.render(data, bars=50)
+    assert image.shape == (100, 200, 4)
+    # Candles are drawn over the background
+    assert len(np.unique(image.reshape(-1, 4), axis=0)) > 2
+    assert len(renderer.candles[0].get_paths()) == 50
+    assert renderer.ax.get_ylim()[1] > data.high.iloc[-50:].max()
+    # Renderer is reused
+    assert np.array_equal(renderer.render(data, bars=50), image)
+    assert not np.array_equal(renderer.render(data.iloc[:-1], bars=50),
+                              image)
+
+def test_render_threads():
+    data = make_data()
+    expected = TileRenderer().render(data)
+    with ThreadPoolExecutor(4) as executor:
+        images = list(executor.map(render_tile, [data] * 8))
+    assert all(np.array_equal(image, expected) for image in images)
+
+def test_fingerprint():
+    data = make_data()
+    version = fingerprint(data)
+    assert fingerprint(data.copy()) == version
+    revised = data.copy()
+    revised.loc[revised.index[-1], 'close'] += 1
+    assert fingerprint(revised) != version
+    assert fingerprint(data.iloc[:-1]) != version
+    assert fingerprint(data.iloc[:0]) == (0,)
+
+def test_cache():
+    cache = TileCache(max_tiles=2)
+    cache.put('A', 1, 'image A')
+    cache.put('B', 1, 'image B')
+    assert cache.get('A', 1) == 'image A'
+    assert cache.get('A', 2) is None
+    assert cache.get('A') == 'image A'
+    # Least recently used tile is evicted
+    cache.put('C', 1, 'image C')
+    assert len(cache) == 2
+    assert cache.get('B') is None
+    assert cache.get('A') == 'image A'
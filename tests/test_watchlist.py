@@ -0,0 +1,75 @@
+from unittest.mock import patch
+from watchlist import Watchlist
+from workers import WorkerPool
+from tiles import fingerprint
+from live import LiveFeed
+from tests.helpers import make_data, get_app, process
+import threading
+
+get_app()
+
+class FakeAPI:
+    """
+    API returning random data and
+    counting downloads
+    """
+
+    def __init__(self):
+        self.data = make_data(200)
+        self.calls = []
+
+    def get_historical(self, symbol, interval):
+        self.calls.append(symbol)
+        if symbol == 'BAD':
+            raise ValueError('Invalid symbol')
+        return self.data.iloc[:-1].copy()
+
+    def get_updates(self, symbol, interval, since):
+        return self.data[self.data['date'] >= since]
+
+def test_watchlist():
+    api = FakeAPI()
+    pool = WorkerPool(2)
+    watchlist = Watchlist(api, pool)
+    threads = []
+
+    def make_feed(analysis):
+        threads.append(threading.current_thread())
+        return LiveFeed(analysis)
+    # Live feeds are built in the workers, not in the GUI thread
+    with patch('watchlist.LiveFeed', side_effect=make_feed):
+        watchlist.set_symbols(['A', 'B', 'BAD'], ['a', 'b', 'bad'], 'day')
+        process(pool)
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+    key = ('A', 'day')
+    assert set(watchlist.analyses) == {key, ('B', 'day')}
+    assert len(watchlist.cache) == 2
+    assert not watchlist.tiles[key].image.pixmap().isNull()
+    assert watchlist.tiles[key].signal.text() in ['BUY', 'SELL', 'NEUTRAL']
+    assert watchlist.tiles[('BAD', 'day')].price.text() == 'Error'
+    assert len(watchlist.scheduler) == 2
+    assert watchlist.feeds[key].analysis is watchlist.analyses[key]
+
+    # Polled bars update the analysis and render the tile again
+    with patch.object(watchlist.scheduler, 'due', return_value=[key]):
+        watchlist.poll()
+    process(pool)
+    assert len(watchlist.analyses[key].data) == len(api.data)
+    assert watchlist.cache.get(key, fingerprint(api.data)) is not None
+
+    # Tiles are not rendered again if the data is the same
+    with patch.object(pool, 'submit') as mock_submit:
+        watchlist.render(key)
+        mock_submit.assert_not_called()
+
+    # Cached images are shown before the analyses are loaded
+    watchlist.set_symbols(['A'], ['a'], 'day')
+    assert len(watchlist.tiles) == 1 and len(watchlist.scheduler) == 0
+    assert not watchlist.tiles[key].image.pixmap().isNull()
+    process(pool)
+    selected = []
+    watchlist.selected.connect(selected.append)
+    watchlist.tiles[key].clicked.emit('A')
+    assert selected == ['A']
+    pool.shutdown()
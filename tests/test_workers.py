@@ -0,0 +1,62 @@
+from workers import WorkerPool
+from tests.helpers import get_app, process
+from threading import Event
+import time
+
+app = get_app()
+
+def collect(pool):
+    """
+    Connect signals of the pool to lists of results
+    """
+    results, errors = [], []
+    pool.finished.connect(lambda key, result: results.append((key, result)))
+    pool.failed.connect(lambda key, error: errors.append((key, error)))
+    return results, errors
+
+def test_submit():
+    pool = WorkerPool(2)
+    results, errors = collect(pool)
+    pool.submit('a', sum, [1, 2])
+    pool.submit('b', divmod, 1, 0)
+    process(pool)
+    assert results == [('a', 3)]
+    assert errors[0][0] == 'b'
+    assert isinstance(errors[0][1], ZeroDivisionError)
+
+def test_cancel():
+    pool = WorkerPool(1)
+    results, _ = collect(pool)
+    started, release = Event(), Event()
+
+    def blocking(value):
+        started.set()
+        release.wait(5)
+        return value
+
+    # Running job is replaced, queued job is removed
+    pool.submit('symbol', blocking, 'old')
+    started.wait(5)
+    queued = pool.submit('symbol', str.upper, 'queued')
+    pool.submit('symbol', str.upper, 'new')
+    assert queued not in pool.jobs
+    release.set()
+    process(pool)
+    assert results == [('symbol', 'NEW')]
+
+    # Cancelled key delivers nothing
+    pool.submit('symbol', str.upper, 'cancelled')
+    pool.cancel('symbol')
+    process(pool)
+    assert results == [('symbol', 'NEW')]
+    assert pool.pending() == 0
+
+def test_shutdown():
+    pool = WorkerPool(1)
+    results, _ = collect(pool)
+    pool.submit('a', time.sleep, 0.05)
+    pool.submit('b', str.upper, 'queued')
+    pool.shutdown()
+    app.processEvents()
+    assert results == []
+    assert not pool.current
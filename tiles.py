@@ -0,0 +1,184 @@
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from collections import OrderedDict
+from chart import COLUMNS, add_candles, draw_candles
+import numpy as np
+import threading
+
+SIZE = (240, 120)
+DPI = 100
+BARS = 60
+MAX_TILES = 256
+BACKGROUND = '#131722'
+
+_local = threading.local()
+
+
+class TileRenderer:
+    """
+    Renders compact candlestick charts to
+    images with the Agg backend, without pyplot
+    or the GUI, so it can run in worker threads.
+    The figure is created once and only its data
+    is replaced, so a renderer must not be shared
+    between threads (see render_tile). Tiles have
+    no text: fonts are the least thread-safe part
+    of matplotlib and labels are cheaper in Qt.
+
+    Parameters
+    ----------
+    size : tuple of int
+        Width and height in pixels
+    dpi : float
+        Resolution of the figure
+    """
+
+    def __init__(self, size=SIZE, dpi=DPI):
+        width, height = size
+        self.figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi,
+                             facecolor=BACKGROUND)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_axes([0, 0, 1, 1])
+        self.ax.set_axis_off()
+        self.candles = add_candles(self.ax)
+
+    def render(self, data, bars=BARS):
+        """
+        Render the latest bars
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Historical data, oldest first
+        bars : int
+            Number of the latest bars to show
+
+        Returns
+        -------
+        numpy.ndarray
+            RGBA image of shape (height, width, 4)
+        """
+        values = data[COLUMNS].to_numpy(dtype=float)[-bars:]
+        volume = np.nanmax(values[:, 4]) if len(values) else 0
+        draw_candles(self.candles, values, 0, scale=max(volume, 0))
+        prices = values[:, 1:3][np.isfinite(values[:, 1:3])]
+        if len(prices):
+            lowest, highest = prices.min(), prices.max()
+            margin = 0.05 * (highest - lowest) or 0.05 * abs(highest) or 1
+            self.ax.set_ylim(lowest - margin, highest + margin)
+        self.ax.set_xlim(0.5, bars + 1.5)
+        self.canvas.draw()
+        return np.array(self.canvas.buffer_rgba())
+
+
+def render_tile(data, size=SIZE, bars=BARS):
+    """
+    Render the latest bars with a renderer
+    of the current thread
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Historical data, oldest first
+    size : tuple of int
+        Width and height in pixels
+    bars : int
+        Number of the latest bars to show
+
+    Returns
+    -------
+    numpy.ndarray
+        RGBA image of shape (height, width, 4)
+    """
+    renderers = _local.__dict__.setdefault('renderers', {})
+    if size not in renderers:
+        renderers[size] = TileRenderer(size)
+    return renderers[size].render(data, bars)
+
+
+def fingerprint(data):
+    """
+    Get a value that changes with the bars
+    shown on a tile: new bars change the
+    number of bars and revisions change
+    the last one
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Historical data, oldest first
+
+    Returns
+    -------
+    tuple
+        Number of bars, date and values
+        of the last bar
+    """
+    if data.empty:
+        return 0,
+    last = data.iloc[-1]
+    return (len(data), last['date'],
+            *last[COLUMNS].to_numpy(dtype=float).tolist())
+
+
+class TileCache:
+    """
+    Least recently used tile images keyed by
+    symbol and interval, stored with the
+    fingerprint of the data they show
+
+    Parameters
+    ----------
+    max_tiles : int
+        Maximum number of stored images
+    """
+
+    def __init__(self, max_tiles=MAX_TILES):
+        self.max_tiles = max_tiles
+        self.items = OrderedDict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, version=None):
+        """
+        Get image of a given key
+
+        Parameters
+        ----------
+        key : tuple
+            Symbol and interval
+        version : tuple or None
+            Fingerprint of the current data,
+            any image is returned if None
+
+        Returns
+        -------
+        numpy.ndarray or None
+            Stored image or None if missing
+            or rendered from other data
+        """
+        item = self.items.get(key)
+        if item is None or version is not None and item[0] != version:
+            return None
+        self.items.move_to_end(key)
+        return item[1]
+
+    def put(self, key, version, image):
+        """
+        Store image and evict the least
+        recently used ones above the limit
+
+        Parameters
+        ----------
+        key : tuple
+            Symbol and interval
+        version : tuple
+            Fingerprint of the rendered data
+        image : numpy.ndarray
+            Rendered image
+        """
+        self.items.pop(key, None)
+        self.items[key] = (version, image)
+        while len(self.items) > self.max_tiles:
+            self.items.popitem(last=False)
@@ -1,23 +1,45 @@
-from matplotlib import ticker, pyplot as plt
+from matplotlib import pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt5.QtWidgets import (QApplication, QWidget, QHBoxLayout, QCheckBox,
                              QVBoxLayout, QSpacerItem, QPushButton, QComboBox,
-                             QSizePolicy, QLabel, QSpinBox)
+                             QSizePolicy, QLabel, QSpinBox, QMessageBox)
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
-from threading import Thread
+from PyQt5.QtCore import Qt, QTimer
 from analysis import Analysis
-from api import API
+from chart import Chart
+from workers import WorkerPool
+from prefetch import AnalysisCache, Prefetcher
+from live import LiveFeed, Scheduler, poll_period
+from watchlist import Watchlist, SIGNAL_COLORS
+from cache import Cache
+from api import API, INTERVALS
 import sys
 import csv
 
+# Milliseconds between checks of scheduled live polls
+TICK = 1000
+
 
 class Application(QWidget):
     def __init__(self):
         super().__init__()
-        self.api = API()
+        self.api = API(cache=Cache())
         self.analysis = None
         self.bins = 50
+        self.workers = WorkerPool(parent=self)
+        self.workers.finished.connect(self.show_analysis)
+        self.workers.failed.connect(self.show_error)
+        # Recently viewed and prefetched analyses
+        self.analyses = AnalysisCache()
+        self.prefetcher = Prefetcher(self.workers, self.analyses,
+                                     self._analyze)
+        self.wanted = None
+        # Live data of the shown analysis
+        self.feed = None
+        self.scheduler = Scheduler()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+        self.watchlist = None
         self.symbols = {
             'stocks': [],
             'forex': [],
@@ -89,8 +111,21 @@ class Application(QWidget):
         # Symbol selection
         self.symbol = QComboBox()
         self.symbol.setEnabled(False)
+        self.symbol.currentIndexChanged.connect(self.cancel_analysis)
         self.menu.addWidget(self.symbol)
 
+        # Interval selection
+        self.interval = QComboBox()
+        self.interval.addItems(INTERVALS)
+        self.interval.setCurrentText('day')
+        self.interval.currentTextChanged.connect(self.cancel_analysis)
+        self.menu.addWidget(self.interval)
+
+        # Intraday bars built from 1-minute bars, which cover less time
+        self.resample = QCheckBox('Resample 1min bars')
+        self.resample.stateChanged.connect(self.update_resample)
+        self.menu.addWidget(self.resample)
+
         # Checkboxes for indicators
         self.label_indicators = QLabel("Choose indicators:")
         font.setPointSize(10)
@@ -116,6 +151,17 @@ class Application(QWidget):
         self.button.clicked.connect(self.analyze)
         self.menu.addWidget(self.button)
 
+        # Live updates of the shown analysis
+        self.live = QCheckBox('Live')
+        self.live.stateChanged.connect(self.update_live)
+        self.menu.addWidget(self.live)
+
+        # Button for the watchlist of the category
+        self.button_watchlist = QPushButton()
+        self.button_watchlist.setText("Watchlist")
+        self.button_watchlist.clicked.connect(self.show_watchlist)
+        self.menu.addWidget(self.button_watchlist)
+
         spacerItem = QSpacerItem(20, 40,
                                  QSizePolicy.Minimum,
                                  QSizePolicy.Expanding)
@@ -147,10 +193,20 @@ class Application(QWidget):
         plt.rcParams['figure.facecolor'] = '#131722'
         self.figure = plt.figure()
         self.canvas = FigureCanvas(self.figure)
+        self.chart = Chart(self.figure)
         self.layout.addWidget(self.canvas)
 
         self.setLayout(self.layout)
 
+    def closeEvent(self, event):
+        """
+        Stop background jobs before
+        the window is closed.
+        """
+        self.timer.stop()
+        self.workers.shutdown()
+        super().closeEvent(event)
+
     def update_symbols(self):
         """
         Update the names list
@@ -168,12 +224,8 @@ class Application(QWidget):
         color when the signal is changed.
         """
         self.signal_label.setText(signal.upper())
-        if signal == 'buy':
-            self.signal.setStyleSheet("background-color: #66ff66")
-        elif signal == 'sell':
-            self.signal.setStyleSheet("background-color: #ff6666")
-        else:
-            self.signal.setStyleSheet("background-color: #6666ff")
+        color = SIGNAL_COLORS.get(signal, SIGNAL_COLORS['neutral'])
+        self.signal.setStyleSheet(f"background-color: {color}")
         self.label_prediction.show()
         self.signal.show()
 
@@ -201,6 +253,17 @@ class Application(QWidget):
             self.indicators['rsi'].setEnabled(True)
             self.indicators['stochastic'].setEnabled(True)
             self.indicators['williams'].setEnabled(True)
+        self.chart.set_visible(self.selected_indicators())
+
+    def update_resample(self):
+        """
+        Switch between intraday bars of the API
+        and bars resampled from 1-minute ones.
+        Analyses loaded before are dropped.
+        """
+        self.cancel_analysis()
+        self.api.resample = self.resample.isChecked()
+        self.analyses.clear()
 
     def update_bins(self):
         """
@@ -208,259 +271,208 @@ class Application(QWidget):
         for the histogram.
         """
         self.bins = self.bins_spinbox.value()
+        if self.analysis is not None:
+            self.chart.show_last(self.bins)
 
     def analyze(self):
         """
         Analyze the data for the selected
-        symbol. Display the results in
-        the output table widget and plot
-        the candlestick chart.
-        """
-        thread = Thread(target=self._analyze)
-        thread.start()
-
-    def _analyze(self):
-        """
-        Start the analysis in a separate
-        thread. This is done to prevent
-        the GUI from freezing.
+        symbol in the worker pool. Only the
+        result of the latest request is shown,
+        older ones are cancelled. Analyses of
+        recently viewed and neighboring symbols
+        are kept, so they are shown at once.
         """
         index = self.symbol.currentIndex()
         category = self.category.currentText().lower()
         symbol = self.symbols[category][index]
-        self.analysis = Analysis(symbol)
-        self.draw_plot(self.analysis.data.iloc[-self.bins:])
-        self.update_signal(self.analysis.signal)
+        interval = self.interval.currentText()
+        self.wanted = (symbol, interval)
+        self.workers.cancel('analysis')
+        analysis = self.analyses.get(self.wanted)
+        if analysis is not None:
+            self.show_analysis('analysis', analysis)
+        elif not self.prefetcher.take(self.wanted):
+            self.workers.submit('analysis', self._analyze, symbol, interval)
+        self.prefetcher.viewed(self.symbols[category], index, interval)
 
-    def draw_plot(self, data):
+    def _analyze(self, symbol, interval):
         """
-        Draw the candlestick chart
-        on the canvas.
-
-        Parameters
-        ----------
-        data : pandas.DataFrame
-            The data to plot.
+        Download the data and compute the
+        indicators. Runs in a worker thread,
+        so it must not touch any widgets.
         """
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.set_facecolor('#131722')
-        ax.tick_params(axis='x', colors='#F0F0F0')
-        ax.tick_params(axis='y', colors='#F0F0F0')
-        ax.grid(color='#F0F0F0', linestyle='--', linewidth=0.5)
-        ax.set_xticks(range(0, len(data)))
-        ax.set_xticklabels(data['date'])
-        ax.set_xlim([1, len(data.index) + 1])
-        ax.grid(True, color='#38414E', linewidth=0.5)
-        ax.set_axisbelow(True)
-        ax.xaxis.set_major_locator(ticker.MaxNLocator(nbins=10))
-        ax.yaxis.set_major_locator(ticker.MaxNLocator(nbins=20))
-        self.plot_candles(ax, data)
-        self.plot_indicators(ax)
-        self.figure.tight_layout()
-        self.canvas.draw()
+        analysis = Analysis(symbol, interval, api=self.api)
+        # Fill the cache of indicators used by the chart
+        for name in self.indicators:
+            getattr(analysis, name)()
+        return analysis
 
-    @staticmethod
-    def plot_candles(ax, data):
+    def _is_wanted(self, job):
         """
-        Plot the candlesticks on the given
-        axes using provided data.
-
-        Parameters
-        ----------
-        ax : matplotlib.axes.Axes
-            The axes to plot on.
-        data : pandas.DataFrame
-            The data to plot.
+        Check whether a job loads
+        the requested analysis.
         """
-        highest = data['high'].max()
-        lowest = data['low'].min()
-        max_volume = data['volume'].max()
-        values = data[['open', 'high', 'close', 'low', 'volume']].values
-        for i, (o, h, c, l, v) in enumerate(values):
-            color = '#2BA59A' if c >= o else '#EF5350'
-
-            # Plot candle body
-            ax.add_patch(plt.Rectangle((i + 1, o), 0.618,
-                                       (c - o), color=color))
-
-            # Plot high and low
-            ax.add_line(plt.Line2D([i + 1.309, i + 1.309],
-                                   [l, h], color=color, linewidth=1))
-
-            # Plot volume
-            ax.axvspan(i + 0.809, i + 1.809,
-                       ymax=(v / max_volume / 6.18),
-                       facecolor=color, alpha=0.5)
-        if lowest - 0.05 * (highest - lowest) < 0:
-            ax.set_ylim(0.0, highest + 0.05 * (highest - lowest))
-        else:
-            ax.set_ylim(lowest - 0.05 * (highest - lowest),
-                        highest + 0.05 * (highest - lowest))
+        return job == 'analysis' \
+            or job[0] == 'prefetch' and job[1:] == self.wanted
 
-    def plot_indicators(self, ax):
+    def show_analysis(self, job, analysis):
         """
-        Plot indicators on the
-        candlestick chart.
-
-        Parameters
-        ----------
-        ax : matplotlib.axes.Axes
-            The axes to plot on.
-        """
-        sma = self.indicators['sma'].isChecked()
-        ema = self.indicators['ema'].isChecked()
-        bollinger = self.indicators['bollinger'].isChecked()
-        rsi = self.indicators['rsi'].isChecked()
-        macd = self.indicators['macd'].isChecked()
-        stochastic = self.indicators['stochastic'].isChecked()
-        williams = self.indicators['williams'].isChecked()
-
-        if sma and not bollinger:
-            self.plot_sma(ax)
-        if ema:
-            self.plot_ema(ax)
-        if bollinger:
-            self.plot_bollinger(ax)
-
-        # Plot indicators with a second y-axis
-        if rsi or stochastic or williams:
-            ax2 = ax.twinx()
-            ax2.set_ylim([0, 100])
-            ax2.set_yticks([0, 20, 40, 60, 80, 100])
-            ax2.set_yticklabels(['0', '20', '40', '60', '80', '100'])
-            ax2.tick_params(axis='y', colors='#F0F0F0')
-            ax2.set_axisbelow(True)
-            if rsi:
-                self.plot_rsi(ax2)
-            if stochastic:
-                self.plot_stochastic(ax2)
-            if williams:
-                self.plot_williams(ax2)
-            ax2.legend(loc='lower left')
-        elif macd:
-            ax2 = ax.twinx()
-            ax2.tick_params(axis='y', colors='#F0F0F0')
-            ax2.set_axisbelow(True)
-            self.plot_macd(ax2)
-            ax2.legend(loc='lower left')
-
-        # Add legend on the first y-axis
-        if sma or ema or bollinger:
-            ax.legend(loc='upper left')
-
-    def plot_sma(self, ax):
-        """
-        Plot simple moving average
-        on the candlestick chart.
-
-        Parameters
-        ----------
-        ax : matplotlib.axes.Axes
-            The axes to plot on.
+        Display the results of the analysis
+        and plot the candlestick chart.
         """
+        if job[0] == 'live':
+            return self.show_updates(job, analysis)
+        if not self._is_wanted(job):
+            return
+        self.wanted = None
+        self.analyses.put((analysis.symbol, analysis.interval), analysis)
+        self.stop_live()
+        self.analysis = analysis
+        self.draw_plot(analysis.data)
+        self.update_signal(analysis.signal)
+        self.start_live()
 
-        sma = self.analysis.sma().iloc[-self.bins - 1:]
-        ax.plot(self.bins - sma.index + 0.309,
-                sma, color='#F9A825', label='SMA')
-
-    def plot_ema(self, ax):
+    def show_error(self, job, error):
         """
-        Plot exponential moving average
-        on the candlestick chart.
-
-        Parameters
-        ----------
-        ax : matplotlib.axes.Axes
-            The axes to plot on.
+        Display the error of the analysis.
+        Failed live polls are repeated
+        at the next poll.
         """
-        ema = self.analysis.ema().iloc[-self.bins - 1:]
-        ax.plot(self.bins - ema.index + 0.309,
-                ema, color='#42A5F5', label='EMA')
+        if job[0] == 'live' or not self._is_wanted(job):
+            return
+        self.wanted = None
+        QMessageBox.warning(self, "Error", f"Analysis failed: {error}")
 
-    def plot_bollinger(self, ax):
+    def cancel_analysis(self):
         """
-        Plot Bollinger Bands on the
-        candlestick chart.
-
-        Parameters
-        ----------
-        ax : matplotlib.axes.Axes
-            The axes to plot on.
+        Cancel the pending analysis when
+        the symbol or interval is changed.
         """
-        bb = self.analysis.bollinger().iloc[-self.bins - 1:]
-        ax.plot(self.bins - bb.index + 0.309,
-                bb['upper'], color='#66BB6A', label='Bollinger Bands')
-        ax.fill_between(self.bins - bb.index + 0.309,
-                        bb['lower'], bb['upper'],
-                        color='#66BB6A', alpha=0.2)
-        ax.plot(self.bins - bb.index + 0.309,
-                bb['lower'], color='#66BB6A')
-        self.plot_sma(ax)
+        self.wanted = None
+        self.workers.cancel('analysis')
 
-    def plot_rsi(self, ax):
+    def update_live(self):
         """
-        Plot relative strength index
-        on the candlestick chart.
-
-        Parameters
-        ----------
-        ax : matplotlib.axes.Axes
-            The axes to plot on.
+        Start or stop live updates
+        when the checkbox is changed.
         """
-        rsi = self.analysis.rsi().iloc[-self.bins - 1:]
-        ax.plot(self.bins - rsi.index + 0.309,
-                rsi, color='#9C27B0', label='RSI')
+        if self.live.isChecked():
+            self.start_live()
+        else:
+            self.stop_live()
+
+    def start_live(self):
+        """
+        Poll new bars of the shown analysis
+        if live updates are enabled.
+        """
+        analysis = self.analysis
+        if not self.live.isChecked() or analysis is None \
+                or self.feed is not None or analysis.data.empty:
+            return
+        self.feed = LiveFeed(analysis)
+        key = (analysis.symbol, analysis.interval)
+        self.scheduler.add(key, poll_period(analysis.interval))
+        self.timer.start(TICK)
+
+    def stop_live(self):
+        """
+        Stop polling the shown analysis.
+        """
+        if self.feed is None:
+            return
+        key = (self.analysis.symbol, self.analysis.interval)
+        self.scheduler.remove(key)
+        self.workers.cancel(('live', *key))
+        self.feed = None
+        self.timer.stop()
+
+    def poll(self):
+        """
+        Download bars since the last one
+        for analyses due to be polled.
+        """
+        for key in self.scheduler.due():
+            job = ('live', *key)
+            if self.feed is None or self.workers.is_pending(job):
+                continue
+            self.workers.submit(job, self.api.get_updates, *key,
+                                self.feed.since)
+
+    def show_updates(self, job, bars):
+        """
+        Merge polled bars into the shown
+        analysis and redraw the changed
+        part of the chart.
+        """
+        analysis = self.analysis
+        if self.feed is None \
+                or job[1:] != (analysis.symbol, analysis.interval):
+            return
+        changes = self.feed.apply(bars)
+        if changes is None:
+            return
+        self.chart.update(*changes)
+        self.update_signal(analysis.signal)
+
+    def show_watchlist(self):
+        """
+        Open the watchlist of all symbols
+        of the selected category.
+        """
+        if self.watchlist is None:
+            self.watchlist = Watchlist(self.api, self.workers, parent=self)
+            self.watchlist.setWindowFlags(Qt.Window)
+            self.watchlist.selected.connect(self.select_symbol)
+        category = self.category.currentText().lower()
+        self.watchlist.set_symbols(self.symbols[category],
+                                   self.names[category],
+                                   self.interval.currentText())
+        self.watchlist.show()
+        self.watchlist.raise_()
 
-    def plot_macd(self, ax):
+    def select_symbol(self, symbol):
         """
-        Plot moving average convergence
-        divergence on the candlestick chart.
-
-        Parameters
-        ----------
-        ax : matplotlib.axes.Axes
-            The axes to plot on.
+        Analyze a symbol of the selected
+        category, e.g. clicked in the watchlist.
         """
-        macd = self.analysis.macd().iloc[-self.bins - 1:]
-        ax.plot(self.bins - macd.index + 0.309,
-                macd['MACD'], color='#F44336', label='MACD')
-        ax.plot(self.bins - macd.index + 0.309,
-                macd['Signal'], color='#4CAF50', label='Signal')
-        ax.bar(self.bins - macd.index + 0.309,
-               macd['Histogram'], color='#F44336',
-               alpha=0.2, width=0.618,
-               align='center', label='Histogram')
+        category = self.category.currentText().lower()
+        if symbol in self.symbols[category]:
+            self.symbol.setCurrentIndex(self.symbols[category].index(symbol))
+            self.analyze()
 
-    def plot_stochastic(self, ax):
+    def selected_indicators(self):
         """
-        Plot stochastic oscillator
-        on the candlestick chart.
-
-        Parameters
-        ----------
-        ax : matplotlib.axes.Axes
-            The axes to plot on.
+        Get names of the checked indicators.
         """
-        stochastic = self.analysis.stochastic().iloc[-self.bins - 1:]
-        ax.plot(self.bins - stochastic.index + 0.309,
-                stochastic['%K'], color='#0094FF', label='Stochastic %K')
-        ax.plot(self.bins - stochastic.index + 0.309,
-                stochastic['%D'], color='#FF6A00', label='Stochastic %D')
+        return [name for name, checkbox in self.indicators.items()
+                if checkbox.isChecked()]
 
-    def plot_williams(self, ax):
+    def draw_plot(self, data):
         """
-        Plot Williams %R
-        on the candlestick chart.
+        Draw the candlestick chart on the
+        canvas. The whole history can be
+        browsed, the latest bars are shown
+        first.
 
         Parameters
         ----------
-        ax : matplotlib.axes.Axes
-            The axes to plot on.
+        data : pandas.DataFrame
+            The data to plot.
         """
-        williams = self.analysis.williams().iloc[-self.bins - 1:]
-        ax.plot(self.bins - williams.index + 0.309,
-                williams, color='#F44336', label='Williams %R')
+        analysis = self.analysis
+        self.chart.set_data(data, {
+            'sma': analysis.sma(),
+            'ema': analysis.ema(),
+            'bollinger': analysis.bollinger(),
+            'rsi': analysis.rsi(),
+            'macd': analysis.macd(),
+            'stochastic': analysis.stochastic(),
+            'williams': analysis.williams()
+        }, self.bins)
+        self.chart.set_visible(self.selected_indicators())
+        self.figure.tight_layout()
 
 def main():
     app = QApplication(sys.argv)
@@ -0,0 +1,279 @@
+from PyQt5.QtWidgets import (QWidget, QGridLayout, QHBoxLayout, QVBoxLayout,
+                             QLabel, QScrollArea, QFrame)
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from analysis import Analysis
+from live import LiveFeed, Scheduler, poll_period
+from tiles import TileCache, render_tile, fingerprint, BARS
+import numpy as np
+
+COLUMNS = 4
+# Jobs of the watchlist leave the queue after requests of the user
+PRIORITY = -1
+TICK = 1000
+SIGNAL_COLORS = {
+    'buy': '#66ff66',
+    'sell': '#ff6666',
+    'neutral': '#6666ff'
+}
+
+
+def to_pixmap(image):
+    """
+    Convert RGBA image to QPixmap
+    (in the GUI thread)
+    """
+    height, width = image.shape[:2]
+    image = np.ascontiguousarray(image)
+    return QPixmap.fromImage(QImage(image.data, width, height, 4 * width,
+                                    QImage.Format_RGBA8888))
+
+
+class Tile(QFrame):
+    """
+    Tile of a symbol: name, last close,
+    change and signal over a chart image
+    """
+    clicked = pyqtSignal(str)
+
+    def __init__(self, symbol, name, parent=None):
+        super().__init__(parent)
+        self.symbol = symbol
+        self.setStyleSheet('background-color: #131722; color: #F0F0F0')
+        self.setCursor(Qt.PointingHandCursor)
+        self.setToolTip(name)
+        self.name = QLabel(symbol)
+        self.price = QLabel()
+        self.price.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.signal = QLabel()
+        self.signal.setAlignment(Qt.AlignCenter)
+        self.signal.setFixedWidth(60)
+        self.image = QLabel()
+        self.image.setAlignment(Qt.AlignCenter)
+        header = QHBoxLayout()
+        header.addWidget(self.name)
+        header.addWidget(self.price)
+        header.addWidget(self.signal)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.addLayout(header)
+        layout.addWidget(self.image)
+
+    def set_analysis(self, analysis):
+        """
+        Show the last close, its change
+        and the signal of an analysis
+        """
+        close = analysis.data['close'].to_numpy(dtype=float)
+        if len(close) > 1 and close[-2]:
+            change = 100 * (close[-1] / close[-2] - 1)
+            self.price.setText(f'{close[-1]:.2f} ({change:+.2f}%)')
+        elif len(close):
+            self.price.setText(f'{close[-1]:.2f}')
+        signal = analysis.signal
+        self.signal.setText(signal.upper())
+        self.signal.setStyleSheet(
+            'color: #000000; background-color: '
+            + SIGNAL_COLORS.get(signal, SIGNAL_COLORS['neutral']))
+
+    def set_image(self, image):
+        """
+        Show the chart image
+        """
+        self.image.setPixmap(to_pixmap(image))
+
+    def mousePressEvent(self, event):
+        self.clicked.emit(self.symbol)
+        super().mousePressEvent(event)
+
+
+class Watchlist(QWidget):
+    """
+    Grid of small charts of many symbols with
+    their signals. Analyses are loaded, polled
+    for new bars and rendered to images in the
+    worker pool, the GUI thread only shows the
+    images. Images are cached with the
+    fingerprint of their data and rendered
+    again only when it changes.
+
+    Parameters
+    ----------
+    api : API
+        API to load the data with
+    workers : WorkerPool
+        Pool running the jobs
+    parent : QWidget or None
+        Parent of the widget
+    """
+    selected = pyqtSignal(str)
+
+    def __init__(self, api, workers, parent=None):
+        super().__init__(parent)
+        self.api = api
+        self.workers = workers
+        self.cache = TileCache()
+        self.interval = None
+        self.tiles = {}
+        self.analyses = {}
+        self.feeds = {}
+        self.scheduler = Scheduler()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+        workers.finished.connect(self._finished)
+        workers.failed.connect(self._failed)
+
+        self.setWindowTitle('Watchlist')
+        self.resize(4 * 260, 600)
+        self.grid = QGridLayout()
+        content = QWidget()
+        content.setLayout(self.grid)
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(content)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(scroll)
+
+    @staticmethod
+    def job(kind, key):
+        """
+        Get key of a job of the watchlist:
+        'load', 'poll' or 'render'
+        """
+        return 'watchlist', kind, *key
+
+    def set_symbols(self, symbols, names, interval):
+        """
+        Show tiles of given symbols. Cached
+        images are shown at once, until the
+        analyses are loaded.
+
+        Parameters
+        ----------
+        symbols : list of str
+            Symbols to show
+        names : list of str
+            Names of the symbols
+        interval : str
+            Interval of the data
+        """
+        self.clear()
+        self.interval = interval
+        for i, (symbol, name) in enumerate(zip(symbols, names)):
+            key = (symbol, interval)
+            tile = Tile(symbol, name)
+            tile.clicked.connect(self.selected)
+            self.grid.addWidget(tile, i // COLUMNS, i % COLUMNS)
+            self.tiles[key] = tile
+            image = self.cache.get(key)
+            if image is not None:
+                tile.set_image(image)
+            self.workers.submit(self.job('load', key), self._load, symbol,
+                                interval, self.api, priority=PRIORITY)
+        if self.isVisible():
+            self.timer.start(TICK)
+
+    def clear(self):
+        """
+        Remove all tiles and cancel their jobs
+        """
+        for key, tile in self.tiles.items():
+            for kind in ['load', 'poll', 'render']:
+                self.workers.cancel(self.job(kind, key))
+            self.scheduler.remove(key)
+            self.grid.removeWidget(tile)
+            tile.deleteLater()
+        self.tiles, self.analyses, self.feeds = {}, {}, {}
+        self.timer.stop()
+
+    def poll(self):
+        """
+        Download bars since the last one
+        for analyses due to be polled
+        """
+        for key in self.scheduler.due():
+            job = self.job('poll', key)
+            if key not in self.feeds or self.workers.is_pending(job):
+                continue
+            self.workers.submit(job, self.api.get_updates, *key,
+                                self.feeds[key].since, priority=PRIORITY)
+
+    def render(self, key):
+        """
+        Show the image of an analysis, render
+        it in the pool if its data changed
+        """
+        data = self.analyses[key].data
+        version = fingerprint(data)
+        image = self.cache.get(key, version)
+        if image is not None:
+            self.tiles[key].set_image(image)
+            return
+        # Only the shown bars are copied to the worker
+        self.workers.submit(self.job('render', key), self._render,
+                            data.iloc[-BARS:].copy(), version,
+                            priority=PRIORITY)
+
+    @staticmethod
+    def _load(symbol, interval, api):
+        """
+        Load the analysis of a tile and its live
+        feed in a worker thread, as replaying
+        the warm-up bars of the feed would
+        block the GUI
+        """
+        analysis = Analysis(symbol, interval, api=api)
+        feed = None if analysis.data.empty else LiveFeed(analysis)
+        return analysis, feed
+
+    @staticmethod
+    def _render(data, version):
+        """
+        Render a tile in a worker thread
+        """
+        return version, render_tile(data)
+
+    def _finished(self, job, result):
+        """
+        Handle the result of a job
+        """
+        if not isinstance(job, tuple) or job[0] != 'watchlist':
+            return
+        kind, key = job[1], job[2:]
+        if key not in self.tiles:
+            return
+        if kind == 'load':
+            self.analyses[key], feed = result
+            if feed is not None:
+                self.feeds[key] = feed
+                self.scheduler.add(key, poll_period(key[1]))
+        elif kind == 'poll':
+            if self.feeds[key].apply(result) is None:
+                return
+        else:
+            version, image = result
+            self.cache.put(key, version, image)
+            self.tiles[key].set_image(image)
+            return
+        self.tiles[key].set_analysis(self.analyses[key])
+        self.render(key)
+
+    def _failed(self, job, error):
+        """
+        Show the error of loading a tile,
+        failed polls are repeated at the next poll
+        """
+        if isinstance(job, tuple) and job[:2] == ('watchlist', 'load') \
+                and job[2:] in self.tiles:
+            self.tiles[job[2:]].price.setText('Error')
+            self.tiles[job[2:]].setToolTip(str(error))
+
+    def showEvent(self, event):
+        if self.tiles:
+            self.timer.start(TICK)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
@@ -0,0 +1,178 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from itertools import count
+
+WORKERS = 4
+
+
+class Job(QRunnable):
+    """
+    Function call run by WorkerPool
+    """
+
+    def __init__(self, pool, key, number, function, args, kwargs):
+        super().__init__()
+        # Jobs are owned by the pool until their result is delivered
+        self.setAutoDelete(False)
+        self.pool = pool
+        self.key = key
+        self.number = number
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+
+    def run(self):
+        if self.cancelled:
+            self.pool._done.emit(self.number, None, False)
+            return
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            self.pool._done.emit(self.number, e, False)
+        else:
+            self.pool._done.emit(self.number, result, True)
+
+
+class WorkerPool(QObject):
+    """
+    Bounded pool of threads running functions
+    outside the GUI thread. Jobs are grouped by
+    a key and only the newest job of a key is
+    current: older jobs waiting in the queue are
+    dropped and results of the running ones are
+    discarded. Results of current jobs are
+    delivered by the finished and failed signals
+    in the thread of the pool (the GUI thread).
+
+    Parameters
+    ----------
+    workers : int
+        Maximum number of threads
+    parent : QObject or None
+        Parent of the pool
+    """
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, object)
+    # Emitted from worker threads, queued to the thread of the pool
+    _done = pyqtSignal(int, object, bool)
+
+    def __init__(self, workers=WORKERS, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(workers)
+        self.jobs = {}
+        self.current = {}
+        self.numbers = count()
+        self._done.connect(self._deliver)
+
+    def submit(self, key, function, *args, priority=0, **kwargs):
+        """
+        Run a function in the pool, making
+        it the current job of a given key
+
+        Parameters
+        ----------
+        key : hashable
+            Key of the job, e.g. 'analysis'
+        function : callable
+            Function to run
+        *args, **kwargs
+            Arguments of the function
+        priority : int
+            Jobs with higher priority leave
+            the queue first
+
+        Returns
+        -------
+        int
+            Number of the job
+        """
+        self.cancel(key)
+        number = next(self.numbers)
+        job = Job(self, key, number, function, args, kwargs)
+        self.jobs[number] = job
+        self.current[key] = number
+        self.pool.start(job, priority)
+        return number
+
+    def cancel(self, key, running=True):
+        """
+        Cancel the current job of a given key.
+        A job waiting in the queue is removed,
+        the result of a running one is ignored.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of the job
+        running : bool
+            Cancel the job also if it is
+            already running
+        """
+        number = self.current.get(key)
+        if number is None:
+            return
+        job = self.jobs[number]
+        if self.pool.tryTake(job):
+            del self.jobs[number]
+        elif not running:
+            return
+        job.cancelled = True
+        del self.current[key]
+
+    def is_current(self, key, number):
+        """
+        Check whether a job is the
+        current one of its key
+        """
+        return self.current.get(key) == number
+
+    def is_pending(self, key):
+        """
+        Check whether a key has a job
+        with result not delivered yet
+        """
+        return key in self.current
+
+    def pending(self):
+        """
+        Get number of jobs not delivered yet
+        """
+        return len(self.jobs)
+
+    def wait(self, msecs=-1):
+        """
+        Wait for running jobs to finish
+
+        Returns
+        -------
+        bool
+            True if all jobs finished
+        """
+        return self.pool.waitForDone(msecs)
+
+    def shutdown(self):
+        """
+        Drop queued jobs and wait for the
+        running ones, e.g. before closing
+        the application
+        """
+        self.pool.clear()
+        for job in self.jobs.values():
+            job.cancelled = True
+        self.current.clear()
+        self.pool.waitForDone()
+
+    def _deliver(self, number, result, success):
+        """
+        Emit the result of a job if it is
+        still current (runs in the pool thread)
+        """
+        job = self.jobs.pop(number, None)
+        if job is None or not self.is_current(job.key, number):
+            return
+        del self.current[job.key]
+        if success:
+            self.finished.emit(job.key, result)
+        else:
+            self.failed.emit(job.key, result)